@@ -0,0 +1,64 @@
+# benchmarks/bench_bitacora.py
+"""
+Per-call logging cost on the request thread.
+
+Compares the old setup (basicConfig to a file, f-string message) with the
+queue handler from core.bitacora (%-arguments rendered on the caller,
+JSON encoded and written by the listener thread), plus a burst of identical errors that the rate limit drops.
+
+    python -m benchmarks.bench_bitacora
+"""
+
+import logging
+import os
+import queue
+import tempfile
+
+from core.bitacora import FiltroRepeticiones, FormateadorJSON, ManejadorCola
+from benchmarks.comun import imprimir_tabla, medir
+
+REPETICIONES = 20_000
+
+
+def _logger(nombre: str, manejador: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(f"bench.{nombre}")
+    logger.handlers[:] = [manejador]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def main():
+    directorio = tempfile.mkdtemp(prefix="nudamu-log-")
+    filas = []
+
+    archivo = logging.FileHandler(os.path.join(directorio, "sincrono.log"), encoding="utf-8")
+    archivo.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    sincrono = _logger("sincrono", archivo)
+    usuario = "a1b2c3d4"
+    stats = medir(lambda: sincrono.info(f"Processing input for user: {usuario}"), repeticiones=REPETICIONES)
+    filas.append({"configuracion": "basicConfig + f-string", **stats})
+
+    cola = queue.SimpleQueue()
+    manejador = ManejadorCola(cola)
+    manejador.addFilter(FiltroRepeticiones())
+    asincrono = _logger("cola", manejador)
+    stats = medir(lambda: asincrono.info("Processing input for user: %s", usuario), repeticiones=REPETICIONES)
+    filas.append({"configuracion": "cola (solo encolar)", **stats})
+
+    # What the listener thread pays per record, off the request path
+    destino = logging.FileHandler(os.path.join(directorio, "json.log"), encoding="utf-8")
+    destino.setFormatter(FormateadorJSON())
+    stats = medir(lambda: destino.handle(cola.get()), repeticiones=min(REPETICIONES, cola.qsize()), calentamiento=0)
+    filas.append({"configuracion": "oyente: JSON + escritura", **stats})
+
+    stats = medir(lambda: asincrono.error("Decryption failed: %s", "bad tag"), repeticiones=REPETICIONES)
+    filas.append({"configuracion": "error repetido (limitado)", **stats, "encolados": cola.qsize()})
+
+    archivo.close()
+    destino.close()
+    imprimir_tabla(filas)
+
+
+if __name__ == "__main__":
+    main()
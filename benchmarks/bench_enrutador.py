@@ -0,0 +1,52 @@
+# benchmarks/bench_enrutador.py
+"""
+Per-call cost of `///<mode>` dispatch as modes are added.
+
+Compares the old per-pattern `re.match` loop with EnrutadorComandos.
+
+    python -m benchmarks.bench_enrutador
+"""
+
+import re
+
+from core.enrutador import EnrutadorComandos, Modo, RegistroModos
+from benchmarks.comun import imprimir_tabla, medir
+
+MODOS = (5, 50, 500)
+
+
+def _registro(n: int) -> RegistroModos:
+    registro = RegistroModos()
+    registro._plugins_cargados = True  # Measure dispatch only, no plugin discovery
+    for i in range(n):
+        registro.registrar(Modo(f"modo{chr(97 + i % 26)}{i}", str))
+    return registro
+
+
+def main():
+    filas = []
+    for n in MODOS:
+        registro = _registro(n)
+        nombres = list(registro.modos())
+        # Worst case for the loop: the last registered mode
+        texto = f"///{nombres[-1]} un texto cualquiera"
+        comandos = {rf"^///{nombre}": (nombre, len(nombre) + 3) for nombre in nombres}
+
+        def lineal():
+            for pattern, (modo, length) in comandos.items():
+                if re.match(pattern, texto, re.IGNORECASE):
+                    return (modo, length)
+            return None
+
+        enrutador = EnrutadorComandos(registro)
+        filas.append({
+            "modos": n,
+            "regex_loop_us": medir(lineal, repeticiones=500)["p50_us"],
+            "enrutador_us": medir(lambda: enrutador.detectar(texto), repeticiones=20_000)["p50_us"],
+            "texto_libre_us": medir(lambda: enrutador.detectar("hola mundo"), repeticiones=20_000)["p50_us"],
+        })
+    imprimir_tabla(filas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/bench_etica.py
+"""
+EticaNuDaMu rule matching cost as the number of dilemmas grows.
+
+Compares the compiled Aho-Corasick matcher with the old linear `in` scan,
+and cold compile against snapshot load.
+
+    python -m benchmarks.bench_etica
+"""
+
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import core.utils.instantanea as instantanea
+from core.reglas import FORMATO_PAQUETE, RepositorioEtico
+from benchmarks.comun import imprimir_tabla, medir
+
+TAMANOS = (100, 1_000, 10_000, 50_000)
+TEXTO = ("Hoy me pregunto si está bien callar lo que siento cuando mi familia espera otra cosa, "
+         "y si eso sería una forma de mentir aunque no diga nada falso.")
+
+
+def _tema(rng: random.Random) -> str:
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(6, 12)))
+
+
+def escribir_paquete(directorio: str, n: int, semilla: int = 0):
+    rng = random.Random(semilla)
+    dilemas = {}
+    while len(dilemas) < n:
+        dilemas[_tema(rng)] = {"es": "es", "zh": "zh", "en": "en", "philosophy": "p"}
+    # The real keyword goes last, so a linear scan pays for every rule
+    dilemas["mentir"] = {"es": "es", "zh": "zh", "en": "en", "philosophy": "p"}
+    paquete = {"formato": FORMATO_PAQUETE, "nombre": "sintetico", "version": "1",
+               "dilemas": dilemas, "principios": {"en": ["p"]}}
+    with open(os.path.join(directorio, "sintetico.json"), "w", encoding="utf-8") as f:
+        json.dump(paquete, f)
+
+
+def main():
+    filas = []
+    cache = tempfile.mkdtemp(prefix="nudamu-cache-")
+    instantanea.DIRECTORIO_CACHE = cache
+    try:
+        for n in TAMANOS:
+            directorio = tempfile.mkdtemp(prefix="nudamu-etica-")
+            try:
+                escribir_paquete(directorio, n)
+                inicio = time.perf_counter()
+                repo = RepositorioEtico(directorio)
+                frio_ms = (time.perf_counter() - inicio) * 1e3
+                inicio = time.perf_counter()
+                RepositorioEtico(directorio)
+                caliente_ms = (time.perf_counter() - inicio) * 1e3
+
+                reglas = repo.reglas
+                texto = TEXTO.lower()
+                compilado = medir(lambda: reglas.buscar(texto), repeticiones=2000)
+                lineal = medir(lambda: next((d for d in reglas.dilemas if d in texto), None),
+                               repeticiones=max(20, 20_000 // n))
+                filas.append({
+                    "reglas": n,
+                    "compilar_ms": round(frio_ms, 1),
+                    "snapshot_ms": round(caliente_ms, 1),
+                    "automata_us": compilado["p50_us"],
+                    "lineal_us": lineal["p50_us"],
+                })
+            finally:
+                shutil.rmtree(directorio, ignore_errors=True)
+    finally:
+        shutil.rmtree(cache, ignore_errors=True)
+    imprimir_tabla(filas)
+
+
+if __name__ == "__main__":
+    main()
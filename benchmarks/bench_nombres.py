@@ -0,0 +1,75 @@
+# benchmarks/bench_nombres.py
+"""
+Load and lookup cost of the sacred-name catalog at 100k+ names.
+
+    python -m benchmarks.bench_nombres [n]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import core.utils.instantanea as instantanea
+from core.simbolos.nombres import cargar_catalogo, leer_tsv
+from benchmarks.comun import imprimir_tabla, medir
+
+ELEMENTOS = ("agua", "metal", "fuego", "madera", "tierra", "aire")
+
+
+def escribir_tsv(ruta: str, n: int, semilla: int = 0):
+    rng = random.Random(semilla)
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write("caracter\tidioma\tpronunciacion\telementos\tprofundidad\tzh\tes\ten\n")
+        for i in range(n):
+            idioma = rng.choice(("zh", "es"))
+            caracter = f"{chr(0x4E00 + i % 20000)}{i}" if idioma == "zh" else f"Nombre{i}"
+            elementos = ",".join(rng.sample(ELEMENTOS, 2))
+            f.write(f"{caracter}\t{idioma}\tzh:pin{i};es:pron{i}\t{elementos}\tNivel {i % 10}"
+                    f"\t意义{i}\tsignificado {i}\tmeaning {i}\n")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    directorio = tempfile.mkdtemp(prefix="nudamu-nombres-")
+    instantanea.DIRECTORIO_CACHE = os.path.join(directorio, "cache")
+    ruta = os.path.join(directorio, "nombres.tsv")
+    try:
+        escribir_tsv(ruta, n)
+        inicio = time.perf_counter()
+        cargar_catalogo(ruta)
+        construir_ms = (time.perf_counter() - inicio) * 1e3
+        inicio = time.perf_counter()
+        catalogo = cargar_catalogo(ruta)
+        snapshot_ms = (time.perf_counter() - inicio) * 1e3
+
+        objetivo = f"Nombre{n - 1}" if catalogo.obtener(f"Nombre{n - 1}") else next(iter(catalogo.caracteres()))
+        # The old layout: per-language lists of dicts scanned linearly
+        listas = {}
+        for nombre in leer_tsv(ruta):
+            listas.setdefault(nombre.idioma, []).append({"caracter": nombre.caracter, "elementos": nombre.elementos})
+
+        def lineal():
+            for lang in listas.values():
+                for nom in lang:
+                    if nom["caracter"] == objetivo:
+                        return nom["elementos"]
+            return []
+
+        imprimir_tabla([{
+            "nombres": len(catalogo),
+            "construir_ms": round(construir_ms, 1),
+            "snapshot_ms": round(snapshot_ms, 1),
+            "caracter_us": medir(lambda: catalogo.obtener(objetivo), repeticiones=20_000)["p50_us"],
+            "elemento_us": medir(lambda: catalogo.por_elemento.get("agua"), repeticiones=20_000)["p50_us"],
+            "pronunciacion_us": medir(lambda: catalogo.buscar_pronunciacion("pin7"), repeticiones=20_000)["p50_us"],
+            "lineal_us": medir(lineal, repeticiones=20)["p50_us"],
+        }])
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_traduccion.py
+"""
+Translation cache hit rate and throughput, without the network.
+
+A StubBackend with simulated per-batch latency stands in for the remote
+service; a second Traductor over the same SQLite file plays the role of
+another worker process.
+
+    python -m benchmarks.bench_traduccion
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from core.simbolos.traduccion import CacheSQLite, StubBackend, TablaFrasesBackend, Traductor
+from benchmarks.comun import imprimir_tabla
+
+FRASES = [f"frase de respuesta número {i}" for i in range(500)]
+LOTES = 200
+TAMANO_LOTE = 20
+
+
+def _carga(semilla: int):
+    rng = random.Random(semilla)
+    # Skewed reuse, like a fixed response catalog: a few phrases dominate
+    return [[FRASES[min(int(rng.paretovariate(1.2)) - 1, len(FRASES) - 1)] for _ in range(TAMANO_LOTE)]
+            for _ in range(LOTES)]
+
+
+def _ejecutar(nombre: str, traductor: Traductor, carga):
+    inicio = time.perf_counter()
+    for lote in carga:
+        traductor.translate_many(lote, "zh-cn")
+    duracion = time.perf_counter() - inicio
+    return {"escenario": nombre, "textos_s": round(LOTES * TAMANO_LOTE / duracion, 1),
+            "backend_llamadas": traductor.backend.llamadas if hasattr(traductor.backend, "llamadas") else "-",
+            **traductor.estadisticas()}
+
+
+def main():
+    directorio = tempfile.mkdtemp(prefix="nudamu-traduccion-")
+    ruta = os.path.join(directorio, "cache.sqlite")
+    try:
+        filas = [
+            _ejecutar("sin cache", Traductor(StubBackend(latencia_s=0.005)), _carga(1)),
+            _ejecutar("cache fria", Traductor(StubBackend(latencia_s=0.005), CacheSQLite(ruta)), _carga(1)),
+            # Same file, new instance: what another worker process sees
+            _ejecutar("otro proceso", Traductor(StubBackend(latencia_s=0.005), CacheSQLite(ruta)), _carga(2)),
+        ]
+        tabla = TablaFrasesBackend(entradas=[{"es": f, "zh": f"zh:{f}"} for f in FRASES])
+        filas.append(_ejecutar("tabla offline", Traductor(tabla), _carga(3)))
+        imprimir_tabla(filas)
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
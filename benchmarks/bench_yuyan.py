@@ -0,0 +1,90 @@
+# benchmarks/bench_yuyan.py
+"""
+Accuracy and throughput of core.yuyan against langdetect.
+
+    python -m benchmarks.bench_yuyan
+"""
+
+from core.yuyan import identificar
+from benchmarks.comun import imprimir_tabla, rendimiento
+
+# Labelled sample messages in the shape NuDaMu actually receives. None of
+# them comes from the seed text of the n-gram profiles in core.yuyan; the
+# short and mixed ones exercise the fallback to the accent heuristic.
+MUESTRAS = [
+    ("es", "Me siento triste y no sé por qué"),
+    ("es", "¿Cuál es el propósito de mi vida?"),
+    ("es", "Perdí a mi perro y lo extraño mucho"),
+    ("es", "no puedo dormir por las noches"),
+    ("es", "mi hermana vive lejos de aqui"),
+    ("es", "ayer fuimos al mercado a comprar fruta"),
+    ("es", "nadie me llama desde hace semanas"),
+    ("es", "quiero aprender a tocar la guitarra"),
+    ("es", "echo de menos a mi abuela"),
+    ("es", "el trabajo me tiene agotado esta semana"),
+    ("es", "tengo hambre"),
+    ("es", "vale gracias"),
+    ("es", "hola"),
+    ("en", "I lost my dog and I miss him a lot"),
+    ("en", "What is the purpose of my life?"),
+    ("en", "I can't sleep at night"),
+    ("en", "my sister lives far away"),
+    ("en", "yesterday we went to the market"),
+    ("en", "nobody has called me in weeks"),
+    ("en", "I want to learn to play guitar"),
+    ("en", "work has exhausted me this week"),
+    ("en", "see you tomorrow"),
+    ("en", "help me please"),
+    ("en", "I am fine, gracias"),
+    ("en", "yes"),
+    ("en", "no"),
+    ("zh", "我很难过，不知道为什么"),
+    ("zh", "今天我害怕将要发生的事情"),
+    ("zh", "我的人生目的是什么？"),
+    ("zh", "我想说谎，但有什么阻止了我"),
+    ("zh", "当我停止寻找时，平静就来了"),
+    ("zh", "我对发生的一切感到困惑"),
+    ("zh", "谢谢你听我说"),
+    ("zh", "我是谁"),
+]
+
+
+def _langdetect():
+    try:
+        from langdetect import DetectorFactory, detect  # type: ignore
+    except ImportError:
+        return None
+    DetectorFactory.seed = 0
+
+    def _detectar(texto: str) -> str:
+        try:
+            return detect(texto).split("-")[0]
+        except Exception:
+            return "desconocido"
+    return _detectar
+
+
+def evaluar(nombre: str, detector, repeticiones: int = 50):
+    aciertos = sum(1 for esperado, texto in MUESTRAS if detector(texto) == esperado)
+    return {
+        "detector": nombre,
+        "precision": f"{aciertos / len(MUESTRAS):.1%}",
+        "msgs_s": rendimiento(detector, [t for _, t in MUESTRAS] * repeticiones),
+    }
+
+
+def main():
+    filas = []
+    # Uncached: measures the real per-message cost of the histogram + n-gram path
+    filas.append(evaluar("yuyan", lambda t: identificar.__wrapped__(t).codigo))
+    filas.append(evaluar("yuyan (cache)", lambda t: identificar(t).codigo))
+    langdetect = _langdetect()
+    if langdetect:
+        filas.append(evaluar("langdetect", langdetect, repeticiones=2))
+    else:
+        print("langdetect not installed; skipping comparison")
+    imprimir_tabla(filas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+# benchmarks/carga.py
+"""
+Concurrent-user load generator and soak test.
+
+Simulates N users, each with its own usuario_id, sending a mix of `///`
+commands and free text either in-process (LuoHeCentral / NuDaMuEngine) or
+over HTTP against `nudamu serve`. Every window it reports throughput,
+p50/p99 latency, error rate, RSS (of this process, so of the engine only
+in-process) and memory-file size. At the end it checks
+whether latency grew with history (last windows vs first) and exits 1 when
+the slowdown exceeds --max-degradacion.
+
+    python -m benchmarks.carga --usuarios 20 --duracion 60
+    python -m benchmarks.carga --motor central --memoria --duracion 3600 --intervalo 60
+    python -m benchmarks.carga --url http://127.0.0.1:8000 --usuarios 50
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from benchmarks.comun import imprimir_tabla
+
+CLAVE_PRUEBA = "0123456789abcdef"
+COMANDOS = ["///sombra", "///espejo", "///guia", "///loto", "///eter"]
+TEMAS = [
+    "hoy me siento {e} porque {m}",
+    "no sé si debería {a}, ¿qué opinas?",
+    "I feel {e} since {m}",
+    "mi familia dice que {m} y me siento {e}",
+    "¿está bien {a} si nadie se entera?",
+]
+RELLENO = {
+    "e": ["feliz", "triste", "ansioso", "tranquilo", "enojado", "confundido", "afraid", "happy"],
+    "m": ["perdí mi trabajo", "vi a un viejo amigo", "el futuro me preocupa", "todo cambió de golpe"],
+    "a": ["mentir", "robar", "callar lo que siento", "perdonar", "irme lejos"],
+}
+
+
+def mensaje(rng: random.Random, proporcion_comandos: float = 0.3) -> str:
+    """One message from the mix: `///` commands (with or without text) or free text."""
+    if rng.random() < proporcion_comandos:
+        comando = rng.choice(COMANDOS)
+        return comando if rng.random() < 0.5 else f"{comando} {rng.choice(RELLENO['m'])}"
+    return rng.choice(TEMAS).format(**{k: rng.choice(v) for k, v in RELLENO.items()})
+
+
+def rss_mib() -> float:
+    try:
+        with open("/proc/self/status", "r") as f:
+            for linea in f:
+                if linea.startswith("VmRSS:"):
+                    return round(int(linea.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class MotorConMemoria:
+    """LuoHeCentral does not persist; this stores each message like NuDaMuEngine does."""
+
+    def __init__(self, motor, memoria):
+        self.motor = motor
+        self.memoria = memoria
+
+    def procesar(self, texto: str, usuario_id: str, rng: Optional[random.Random] = None) -> str:
+        respuesta = self.motor.procesar(texto, usuario_id, rng)
+        self.memoria.guardar(usuario_id, texto, etiqueta="carga")
+        return respuesta
+
+
+class ClienteHTTP:
+    """One keep-alive connection per simulated user."""
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        partes = urlsplit(url)
+        self.host, self.puerto = partes.hostname, partes.port or 80
+        self.timeout = timeout
+        self.conexion: Optional[http.client.HTTPConnection] = None
+
+    def procesar(self, texto: str, usuario_id: str, rng: Optional[random.Random] = None) -> str:
+        if self.conexion is None:
+            self.conexion = http.client.HTTPConnection(self.host, self.puerto, timeout=self.timeout)
+        cuerpo = json.dumps({"texto": texto, "usuario_id": usuario_id})
+        try:
+            self.conexion.request("POST", "/procesar", cuerpo, {"Content-Type": "application/json"})
+            respuesta = self.conexion.getresponse()
+            datos = respuesta.read()
+        except (OSError, http.client.HTTPException):
+            self.conexion.close()
+            self.conexion = None
+            raise
+        if respuesta.status != 200:
+            raise RuntimeError(f"HTTP {respuesta.status}")
+        return json.loads(datos)["respuesta"]
+
+
+class Ventana:
+    """Samples of one reporting window."""
+
+    def __init__(self):
+        self.latencias: List[float] = []
+        self.errores: Counter = Counter()
+        self.lock = threading.Lock()
+
+    def registrar(self, segundos: float):
+        with self.lock:
+            self.latencias.append(segundos)
+
+    def fallo(self, tipo: str):
+        with self.lock:
+            self.errores[tipo] += 1
+
+
+def _percentil(ordenadas: List[float], q: float) -> float:
+    return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * q))] if ordenadas else 0.0
+
+
+class Carga:
+    def __init__(self, crear_cliente, usuarios: int, pausa_s: float = 0.0, semilla: int = 0,
+                 archivo_memoria: Optional[str] = None, proporcion_comandos: float = 0.3):
+        self.crear_cliente = crear_cliente
+        self.usuarios = usuarios
+        self.pausa_s = pausa_s
+        self.semilla = semilla
+        self.archivo_memoria = archivo_memoria
+        self.proporcion_comandos = proporcion_comandos
+        self.ventana = Ventana()
+        self.filas: List[Dict[str, Any]] = []
+        self.total = 0
+        self.tipos_error: Counter = Counter()
+        self._parar = threading.Event()
+
+    def _usuario(self, indice: int):
+        rng = random.Random(self.semilla * 100_003 + indice)
+        cliente = self.crear_cliente()
+        usuario_id = f"carga-{indice:04d}"
+        while not self._parar.is_set():
+            texto = mensaje(rng, self.proporcion_comandos)
+            inicio = time.perf_counter()
+            try:
+                cliente.procesar(texto, usuario_id, random.Random(rng.random()))
+                self.ventana.registrar(time.perf_counter() - inicio)
+            except Exception as e:
+                self.ventana.fallo(type(e).__name__)
+            if self.pausa_s:
+                self._parar.wait(rng.expovariate(1 / self.pausa_s))
+
+    def _cerrar_ventana(self, transcurrido: float, segundos: float):
+        ventana, self.ventana = self.ventana, Ventana()
+        with ventana.lock:
+            latencias = sorted(ventana.latencias)
+            errores = sum(ventana.errores.values())
+            self.tipos_error.update(ventana.errores)
+        n = len(latencias) + errores
+        self.total += n
+        tamano = os.path.getsize(self.archivo_memoria) if self.archivo_memoria and os.path.exists(self.archivo_memoria) else 0
+        fila = {
+            "t_s": round(transcurrido),
+            "peticiones": self.total,
+            "pet_s": round(n / segundos, 1) if segundos else 0.0,
+            "p50_ms": round(_percentil(latencias, 0.50) * 1e3, 2),
+            "p99_ms": round(_percentil(latencias, 0.99) * 1e3, 2),
+            "errores_pct": round(100 * errores / n, 2) if n else 0.0,
+            "rss_mib": rss_mib(),
+            "memoria_mib": round(tamano / 2 ** 20, 2),
+        }
+        self.filas.append(fila)
+        return fila
+
+    def ejecutar(self, duracion_s: float, intervalo_s: float, mostrar=None) -> List[Dict[str, Any]]:
+        hilos = [threading.Thread(target=self._usuario, args=(i,), daemon=True, name=f"usuario-{i}")
+                 for i in range(self.usuarios)]
+        inicio = time.monotonic()
+        for hilo in hilos:
+            hilo.start()
+        anterior = inicio
+        try:
+            while not self._parar.is_set():
+                restante = duracion_s - (time.monotonic() - inicio)
+                time.sleep(max(0.0, min(intervalo_s, restante)))
+                if restante <= intervalo_s:
+                    # Last window: let in-flight requests finish so they are counted
+                    self._detener(hilos)
+                ahora = time.monotonic()
+                fila = self._cerrar_ventana(ahora - inicio, ahora - anterior)
+                anterior = ahora
+                if mostrar:
+                    mostrar(fila)
+        finally:
+            self._detener(hilos)
+        return self.filas
+
+    def _detener(self, hilos: List[threading.Thread]):
+        self._parar.set()
+        for hilo in hilos:
+            hilo.join(timeout=10)
+
+
+def degradacion(filas: List[Dict[str, Any]], fraccion: float = 0.25) -> Dict[str, float]:
+    """
+    Compare median p50 of the last windows with the first ones (a quarter each
+    by default; the very first window is skipped as warm-up), plus the
+    least-squares slope of p50 against requests served so far.
+    """
+    utiles = [f for f in filas[1:] if f["p50_ms"] > 0] or [f for f in filas if f["p50_ms"] > 0]
+    if len(utiles) < 2:
+        return {"ratio": 1.0, "pendiente_ms_por_1k": 0.0}
+    k = max(1, int(len(utiles) * fraccion))
+    mediana = lambda valores: sorted(valores)[len(valores) // 2]
+    primero = mediana([f["p50_ms"] for f in utiles[:k]])
+    ultimo = mediana([f["p50_ms"] for f in utiles[-k:]])
+    xs = [f["peticiones"] / 1000 for f in utiles]
+    ys = [f["p50_ms"] for f in utiles]
+    media_x, media_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    varianza = sum((x - media_x) ** 2 for x in xs)
+    pendiente = sum((x - media_x) * (y - media_y) for x, y in zip(xs, ys)) / varianza if varianza else 0.0
+    return {"ratio": round(ultimo / primero, 3) if primero else 1.0, "pendiente_ms_por_1k": round(pendiente, 4)}
+
+
+def _fabrica_cliente(args, directorio: str):
+    """Returns (client factory, memory file to watch)."""
+    if args.url:
+        return (lambda: ClienteHTTP(args.url)), args.archivo_memoria
+    archivo = args.archivo_memoria or os.path.join(directorio, "secure_memoria.json")
+    if args.motor == "engine":
+        os.environ.setdefault("NUDAMU_CRYPTO_KEY", CLAVE_PRUEBA)
+        from core.engine import NuDaMuEngine
+        motor = NuDaMuEngine()
+        motor.memoria.storage_file = archivo
+    else:
+        from core.luohe_central import LuoHeCentral
+        motor = LuoHeCentral()
+        if args.memoria:
+            from memoria_secure.memoria import MemoriaSagrada
+            memoria = MemoriaSagrada(os.getenv("NUDAMU_CRYPTO_KEY", CLAVE_PRUEBA))
+            memoria.storage_file = archivo
+            motor = MotorConMemoria(motor, memoria)
+        else:
+            archivo = None
+    # One shared engine, warmed before the clock starts, as in the server
+    motor.procesar("calentamiento", "calentamiento", random.Random(0))
+    return (lambda: motor), archivo
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.carga", description=__doc__.split("\n\n")[1])
+    parser.add_argument("--usuarios", type=int, default=10, help="Concurrent simulated users")
+    parser.add_argument("--duracion", type=float, default=30.0, help="Run time in seconds")
+    parser.add_argument("--intervalo", type=float, default=5.0, help="Reporting window in seconds")
+    parser.add_argument("--pausa", type=float, default=0.0, help="Mean think time between a user's messages (s)")
+    parser.add_argument("--motor", choices=["central", "engine"], default="central", help="In-process target")
+    parser.add_argument("--memoria", action="store_true", help="With --motor central, also store every message")
+    parser.add_argument("--url", help="Target a running server instead (e.g. http://127.0.0.1:8000)")
+    parser.add_argument("--archivo-memoria", help="Memory file whose growth is reported")
+    parser.add_argument("--comandos", type=float, default=0.3, help="Share of `///` commands in the mix")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--max-degradacion", type=float, default=2.0,
+                        help="Fail when late p50 exceeds early p50 by this factor")
+    parser.add_argument("--salida", help="Write windows and summary as JSON")
+    args = parser.parse_args(argv)
+
+    directorio = tempfile.mkdtemp(prefix="nudamu-carga-")
+    try:
+        crear_cliente, archivo = _fabrica_cliente(args, directorio)
+        carga = Carga(crear_cliente, args.usuarios, args.pausa, args.semilla, archivo, args.comandos)
+        columnas_impresas = []
+
+        def mostrar(fila):
+            if not columnas_impresas:
+                print("  ".join(f"{c:>12}" for c in fila))
+                columnas_impresas.append(True)
+            print("  ".join(f"{v:>12}" for v in fila.values()), flush=True)
+
+        filas = carga.ejecutar(args.duracion, args.intervalo, mostrar)
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    total = sum(f["pet_s"] * args.intervalo for f in filas)
+    resumen = {
+        "usuarios": args.usuarios,
+        "objetivo": args.url or args.motor,
+        "peticiones": filas[-1]["peticiones"] if filas else 0,
+        "pet_s_media": round(total / (args.intervalo * len(filas)), 1) if filas else 0.0,
+        "errores_pct_max": max((f["errores_pct"] for f in filas), default=0.0),
+        "rss_crecimiento_mib": round(filas[-1]["rss_mib"] - filas[0]["rss_mib"], 1) if filas else 0.0,
+        "memoria_final_mib": filas[-1]["memoria_mib"] if filas else 0.0,
+        **degradacion(filas),
+    }
+    tipos_error = dict(carga.tipos_error.most_common())
+    print()
+    imprimir_tabla([resumen])
+    if tipos_error:
+        print(f"errors by type: {tipos_error}", file=sys.stderr)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"ventanas": filas, "resumen": resumen, "errores": tipos_error}, f, ensure_ascii=False, indent=2)
+    if resumen["ratio"] > args.max_degradacion:
+        print(f"Latency degraded {resumen['ratio']}x as history grew "
+              f"(limit {args.max_degradacion}x)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
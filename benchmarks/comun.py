@@ -0,0 +1,47 @@
+# benchmarks/comun.py
+
+import statistics
+import time
+from typing import Any, Callable, Dict, Iterable
+
+
+def medir(funcion: Callable[[], Any], repeticiones: int = 1000, calentamiento: int = 10) -> Dict[str, float]:
+    """
+    Time `funcion` over `repeticiones` calls and return latency stats in microseconds.
+    """
+    for _ in range(calentamiento):
+        funcion()
+    muestras = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        muestras.append((time.perf_counter() - inicio) * 1e6)
+    muestras.sort()
+    return {
+        "n": repeticiones,
+        "media_us": round(statistics.fmean(muestras), 3),
+        "p50_us": round(muestras[len(muestras) // 2], 3),
+        "p99_us": round(muestras[min(len(muestras) - 1, int(len(muestras) * 0.99))], 3),
+        "ops_s": round(1e6 / statistics.fmean(muestras), 1) if muestras else 0.0,
+    }
+
+
+def rendimiento(funcion: Callable[[Any], Any], entradas: Iterable[Any]) -> float:
+    """Items per second for `funcion` applied to every entry once."""
+    entradas = list(entradas)
+    inicio = time.perf_counter()
+    for entrada in entradas:
+        funcion(entrada)
+    duracion = time.perf_counter() - inicio
+    return round(len(entradas) / duracion, 1) if duracion else float("inf")
+
+
+def imprimir_tabla(filas: Iterable[Dict[str, Any]]):
+    filas = list(filas)
+    if not filas:
+        return
+    columnas = list(filas[0].keys())
+    anchos = {c: max(len(str(c)), *(len(str(f.get(c, ""))) for f in filas)) for c in columnas}
+    print("  ".join(str(c).ljust(anchos[c]) for c in columnas))
+    for fila in filas:
+        print("  ".join(str(fila.get(c, "")).ljust(anchos[c]) for c in columnas))
@@ -0,0 +1,306 @@
+# benchmarks/suite.py
+"""
+Benchmark suite with regression gates.
+
+Measures per-message latency of LuoHeCentral/NuDaMuEngine.procesar, analyzer
+throughput, MemoriaSagrada.guardar/recuperar cost as the store grows, and cold
+import time. Results are written as JSON; compared against a baseline, the run
+fails (exit 1) when a metric is worse than its threshold in umbrales.json.
+
+    python -m benchmarks.suite --guardar-base          # record benchmarks/base.json
+    python -m benchmarks.suite                         # compare against it
+    python -m benchmarks.suite --completo --solo memoria --salida memoria.json
+
+Metric names ending in `_s` are rates (higher is better); everything else is a
+latency or duration (lower is better).
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.comun import imprimir_tabla, medir, rendimiento
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(DIRECTORIO)
+RUTA_BASE = os.path.join(DIRECTORIO, "base.json")
+RUTA_UMBRALES = os.path.join(DIRECTORIO, "umbrales.json")
+CLAVE_PRUEBA = "0123456789abcdef"
+
+MENSAJES = [
+    "hola, hoy me siento muy feliz con mi familia",
+    "estoy triste y no sé qué hacer con mi vida",
+    "quiero robar algo pero sé que está mal",
+    "I am afraid of the future and of losing my job",
+    "我今天很开心，因为见到了朋友",
+    "¿debería mentir para proteger a alguien?",
+    "///sombra tengo miedo de fallar",
+    "///loto",
+]
+
+CASOS: Dict[str, Callable[[bool], Dict[str, float]]] = {}
+
+
+def caso(nombre: str):
+    def registrar(funcion):
+        CASOS[nombre] = funcion
+        return funcion
+    return registrar
+
+
+def _latencias(prefijo: str, funcion: Callable[[], object], repeticiones: int) -> Dict[str, float]:
+    stats = medir(funcion, repeticiones=repeticiones, calentamiento=len(MENSAJES))
+    return {f"{prefijo}.p50_us": stats["p50_us"], f"{prefijo}.p99_us": stats["p99_us"],
+            f"{prefijo}.ops_s": stats["ops_s"]}
+
+
+def _ciclo_mensajes() -> Callable[[], str]:
+    indice = iter(range(10 ** 12))
+    return lambda: MENSAJES[next(indice) % len(MENSAJES)]
+
+
+@caso("central")
+def caso_central(completo: bool) -> Dict[str, float]:
+    from core.luohe_central import LuoHeCentral
+    central = LuoHeCentral()
+    siguiente = _ciclo_mensajes()
+    rng = random.Random(0)
+    metricas = _latencias("central.procesar", lambda: central.procesar(siguiente(), "bench", rng),
+                          5000 if completo else 1000)
+    # Time to the first streamed section (the generator is dropped right after it)
+    metricas.update(_latencias("central.primera_seccion",
+                               lambda: next(central.procesar_stream(siguiente(), "bench", rng)),
+                               5000 if completo else 1000))
+    return metricas
+
+
+@caso("engine")
+def caso_engine(completo: bool) -> Dict[str, float]:
+    os.environ.setdefault("NUDAMU_CRYPTO_KEY", CLAVE_PRUEBA)
+    from core.engine import NuDaMuEngine
+    motor = NuDaMuEngine()
+    # Every call appends to the store, so it starts empty for comparable numbers
+    motor.memoria.storage_file = os.path.join(os.getcwd(), "engine_memoria.json")
+    siguiente = _ciclo_mensajes()
+    rng = random.Random(0)
+    return _latencias("engine.procesar", lambda: motor.procesar(siguiente(), "bench", rng),
+                      500 if completo else 100)
+
+
+@caso("analizadores")
+def caso_analizadores(completo: bool) -> Dict[str, float]:
+    from core.qinggan import AnalizadorEmocional
+    from core.daode import EticaNuDaMu
+    from core.documento import preparar
+    emociones = AnalizadorEmocional()
+    etica = EticaNuDaMu()
+    rng = random.Random(0)
+    entradas = MENSAJES * (500 if completo else 100)
+    # Analyzers receive the message's shared Documento, as in the pipeline
+    documentos = [preparar(t) for t in MENSAJES] * (500 if completo else 100)
+    for documento in documentos[:len(MENSAJES)]:
+        emociones.analizar(documento)
+        etica.evaluar(documento, rng=rng)
+    return {
+        # Texts come from the shared catalog, so building an analyzer should cost next to nothing
+        "analizadores.emocional.instancia_us": medir(AnalizadorEmocional, repeticiones=2000)["p50_us"],
+        "analizadores.documento.mensajes_s": rendimiento(preparar, entradas),
+        "analizadores.emocional.mensajes_s": rendimiento(emociones.analizar, documentos),
+        "analizadores.etica.mensajes_s": rendimiento(lambda d: etica.evaluar(d, rng=rng), documentos),
+    }
+
+
+def _prellenar(memoria, n: int, usuario: str, propios: int = 10):
+    """Write a store of `n` records directly (one shared ciphertext) with `propios` for `usuario`."""
+    cifrado = memoria.cifrar("mensaje de relleno para el benchmark")
+    paso = max(1, n // propios)
+    fragmentos: List[list] = [[] for _ in range(memoria.fragmentos)]
+    for i in range(n):
+        usuario_id = usuario if i % paso == 0 else f"u{i}"
+        fragmentos[memoria.fragmento(usuario_id)].append(
+            {"usuario_id": usuario_id, "etiqueta": "neutral", "mensaje_cifrado": cifrado})
+    for indice, registros in enumerate(fragmentos):
+        with open(memoria.archivo_fragmento(indice), "w", encoding="utf-8") as f:
+            json.dump(registros, f, ensure_ascii=False, indent=4)
+
+
+def _etiqueta_tamano(n: int) -> str:
+    return f"{n // 1_000_000}m" if n >= 1_000_000 else f"{n // 1000}k"
+
+
+@caso("memoria")
+def caso_memoria(completo: bool) -> Dict[str, float]:
+    from memoria_secure.fragmentos import ruta_fragmento
+    from memoria_secure.memoria import MemoriaSagrada
+    metricas = {}
+    for n in ((1_000, 10_000, 100_000, 1_000_000) if completo else (1_000, 10_000)):
+        # Unsharded store (the historical layout) and a 16-shard one
+        for fragmentos, sufijo in ((1, ""), (16, "_f16")):
+            memoria = MemoriaSagrada(CLAVE_PRUEBA, fragmentos=fragmentos)
+            memoria.storage_file = os.path.join(os.getcwd(), f"memoria_{n}.json")
+            _prellenar(memoria, n, "objetivo")
+            repeticiones = 20 if n <= 10_000 else 3 if n <= 100_000 else 1
+            guardar = medir(lambda: memoria.guardar("objetivo", "nuevo recuerdo", etiqueta="alegria"),
+                            repeticiones=repeticiones, calentamiento=0)
+            recuperar = medir(lambda: memoria.recuperar("objetivo"), repeticiones=repeticiones, calentamiento=0)
+            similares = medir(lambda: memoria.recall_similar("objetivo", "recuerdo feliz"),
+                              repeticiones=repeticiones, calentamiento=0)
+            tamano = _etiqueta_tamano(n)
+            metricas[f"memoria.guardar_{tamano}{sufijo}_ms"] = round(guardar["p50_us"] / 1e3, 3)
+            metricas[f"memoria.recuperar_{tamano}{sufijo}_ms"] = round(recuperar["p50_us"] / 1e3, 3)
+            metricas[f"memoria.similares_{tamano}{sufijo}_ms"] = round(similares["p50_us"] / 1e3, 3)
+            for indice in range(memoria.fragmentos):
+                os.remove(memoria.archivo_fragmento(indice))
+                vectores = ruta_fragmento(memoria.vectores.archivo, indice, memoria.fragmentos)
+                if os.path.exists(vectores):
+                    os.remove(vectores)
+    return metricas
+
+
+def _tiempo_proceso(codigo: str, repeticiones: int) -> float:
+    entorno = dict(os.environ, PYTHONPATH=RAIZ, NUDAMU_CRYPTO_KEY=os.getenv("NUDAMU_CRYPTO_KEY", CLAVE_PRUEBA))
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, "-c", codigo], check=True, env=entorno,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1e3
+
+
+@caso("importacion")
+def caso_importacion(completo: bool) -> Dict[str, float]:
+    repeticiones = 5 if completo else 3
+    interprete = _tiempo_proceso("pass", repeticiones)
+    metricas = {}
+    for modulo in ("core.luohe_central", "core.servidor", "core.engine"):
+        try:
+            total = _tiempo_proceso(f"import {modulo}", repeticiones)
+        except subprocess.CalledProcessError:
+            continue  # Optional dependencies missing on this host
+        # Best of N fresh interpreters, minus the bare interpreter start-up
+        metricas[f"importacion.{modulo}_ms"] = round(total - interprete, 1)
+    return metricas
+
+
+def ejecutar(nombres: List[str], completo: bool = False) -> Dict[str, object]:
+    """Run the selected cases in a scratch directory and collect their metrics."""
+    metricas: Dict[str, float] = {}
+    omitidos: Dict[str, str] = {}
+    origen = os.getcwd()
+    directorio = tempfile.mkdtemp(prefix="nudamu-bench-")
+    os.chdir(directorio)  # Stores and logs created by the code under test land here
+    try:
+        for nombre in nombres:
+            print(f"… {nombre}", file=sys.stderr, flush=True)
+            try:
+                metricas.update(CASOS[nombre](completo))
+            except (ImportError, EnvironmentError) as e:
+                omitidos[nombre] = str(e)
+    finally:
+        os.chdir(origen)
+        shutil.rmtree(directorio, ignore_errors=True)
+    return {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "modo": "completo" if completo else "rapido",
+        "metricas": metricas,
+        "omitidos": omitidos,
+    }
+
+
+def cargar_umbrales(ruta: str = RUTA_UMBRALES) -> Dict[str, object]:
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"defecto": 0.25, "metricas": {}}
+
+
+def umbral_para(metrica: str, umbrales: Dict[str, object]) -> float:
+    """Most specific matching pattern wins; otherwise the default."""
+    patrones = [p for p in umbrales.get("metricas", {}) if fnmatch.fnmatch(metrica, p)]
+    if patrones:
+        return umbrales["metricas"][max(patrones, key=len)]
+    return umbrales.get("defecto", 0.25)
+
+
+def comparar(actual: Dict[str, float], base: Dict[str, float], umbrales: Dict[str, object]) -> List[Dict[str, object]]:
+    """
+    One row per metric present in both runs. `cambio` is the relative change in
+    the bad direction (positive = worse); `regresion` marks rows over threshold.
+    """
+    filas = []
+    for metrica in sorted(set(actual) & set(base)):
+        anterior, valor = base[metrica], actual[metrica]
+        if not anterior:
+            continue
+        if metrica.endswith("_s"):
+            cambio = anterior / valor - 1 if valor else float("inf")
+        else:
+            cambio = valor / anterior - 1
+        umbral = umbral_para(metrica, umbrales)
+        filas.append({"metrica": metrica, "base": anterior, "actual": valor,
+                      "cambio": f"{cambio:+.1%}", "umbral": f"{umbral:.0%}", "regresion": cambio > umbral})
+    return filas
+
+
+def _escribir(ruta: str, datos: Dict[str, object]):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.split("\n\n")[1])
+    parser.add_argument("--solo", nargs="+", choices=sorted(CASOS), help="Run only these cases")
+    parser.add_argument("--completo", action="store_true", help="Larger sizes (memory up to 1M records)")
+    parser.add_argument("--base", default=RUTA_BASE, help="Baseline JSON to compare against / record")
+    parser.add_argument("--guardar-base", action="store_true", help="Record this run as the baseline")
+    parser.add_argument("--umbrales", default=RUTA_UMBRALES, help="Regression thresholds JSON")
+    parser.add_argument("--umbral", type=float, help="Override the default threshold (e.g. 0.2 = 20%%)")
+    parser.add_argument("--salida", help="Also write this run's results here")
+    args = parser.parse_args(argv)
+
+    resultado = ejecutar(args.solo or list(CASOS), args.completo)
+    imprimir_tabla([{"metrica": k, "valor": v} for k, v in sorted(resultado["metricas"].items())])
+    for nombre, motivo in resultado["omitidos"].items():
+        print(f"omitido {nombre}: {motivo}", file=sys.stderr)
+    if args.salida:
+        _escribir(args.salida, resultado)
+    if args.guardar_base:
+        _escribir(args.base, resultado)
+        print(f"Baseline written to {args.base}")
+        return 0
+    if not os.path.exists(args.base):
+        print(f"No baseline at {args.base}; run with --guardar-base first", file=sys.stderr)
+        return 0
+
+    with open(args.base, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    umbrales = cargar_umbrales(args.umbrales)
+    if args.umbral is not None:
+        umbrales["defecto"] = args.umbral
+    filas = comparar(resultado["metricas"], base.get("metricas", {}), umbrales)
+    print()
+    imprimir_tabla(filas)
+    regresiones = [f["metrica"] for f in filas if f["regresion"]]
+    if regresiones:
+        print(f"\n{len(regresiones)} regression(s) over threshold: {', '.join(regresiones)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
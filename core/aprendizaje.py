@@ -0,0 +1,270 @@
+# core/aprendizaje.py
+
+import base64
+import copy
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from core.metricas import tramo
+from memoria_secure.fragmentos import bloqueo_archivo, escritura_atomica, huella_cola, leer_registros_desde
+from memoria_secure.tendencias import POLARIDAD_ETIQUETA
+
+logger = logging.getLogger(__name__)
+
+FORMATO = 1
+CLASES = tuple(POLARIDAD_ETIQUETA)  # Labels the engine stores; records with any other label are not learned
+N_RASGOS = 1 << 16
+
+_vectorizador = None
+
+
+def _vectorizar(textos: List[str]):
+    # HashingVectorizer keeps no vocabulary: nothing to fit, nothing to checkpoint
+    global _vectorizador
+    if _vectorizador is None:
+        from sklearn.feature_extraction.text import HashingVectorizer  # type: ignore
+        _vectorizador = HashingVectorizer(n_features=N_RASGOS, ngram_range=(1, 2), alternate_sign=False)
+    return _vectorizador.transform(textos)
+
+
+def _nuevo_clasificador():
+    from sklearn.linear_model import SGDClassifier  # type: ignore
+    # log_loss gives class probabilities, which the sentiment score is built from
+    return SGDClassifier(loss="log_loss", alpha=1e-5, random_state=0)
+
+
+class ModeloSentimiento:
+    """One published snapshot of the online model. It is never trained further once published."""
+
+    def __init__(self, clasificador, vistos: int, version: int):
+        self.clasificador = clasificador
+        self.vistos = vistos
+        self.version = version
+
+    def predecir(self, textos: List[str]) -> List[str]:
+        return list(self.clasificador.predict(_vectorizar(textos)))
+
+    def polaridad(self, texto: str) -> float:
+        """Expected polarity of the message under the model's label probabilities."""
+        probabilidades = self.clasificador.predict_proba(_vectorizar([texto]))[0]
+        return float(sum(p * POLARIDAD_ETIQUETA[c] for c, p in zip(self.clasificador.classes_, probabilidades)))
+
+    def sentimiento(self, texto: str) -> str:
+        polaridad = self.polaridad(texto)
+        return "positivo" if polaridad > 0.2 else "negativo" if polaridad < -0.2 else "neutral"
+
+
+def _archivo_punto(memoria) -> str:
+    return os.path.splitext(memoria.storage_file)[0] + ".sentimiento.modelo"
+
+
+def cargar_punto(memoria, archivo: Optional[str] = None) -> Dict[str, Any]:
+    """
+    The learner's checkpoint: the classifier (None before the first batch),
+    how many examples it has seen, and the per-shard byte offset it has read
+    the store up to. The classifier is pickled and encrypted with the store's
+    key; GCM authentication means only a holder of the key can produce a
+    checkpoint that gets unpickled.
+    """
+    archivo = archivo or _archivo_punto(memoria)
+    if not os.path.exists(archivo):
+        return {"formato": FORMATO, "fragmentos": memoria.fragmentos, "cursor": {}, "vistos": 0, "version": 0,
+                "clasificador": None}
+    with open(archivo, "r", encoding="utf-8") as f:
+        punto = json.load(f)
+    cifrado = punto.pop("modelo")
+    punto["clasificador"] = (pickle.loads(base64.b64decode(memoria.descifrar_verificado(cifrado)))
+                             if cifrado is not None else None)
+    return punto
+
+
+def _guardar_punto(memoria, archivo: str, punto: Dict[str, Any]):
+    datos = {clave: valor for clave, valor in punto.items() if clave != "clasificador"}
+    datos["modelo"] = None
+    if punto["clasificador"] is not None:
+        serializado = pickle.dumps(punto["clasificador"], protocol=pickle.HIGHEST_PROTOCOL)
+        datos["modelo"] = memoria.cifrar(base64.b64encode(serializado).decode("ascii"))
+    datos["ts"] = time.time()
+    with escritura_atomica(archivo) as f:
+        json.dump(datos, f)
+
+
+class SentimientoEnLinea:
+    """
+    Serving side of the online model. Holds the current snapshot and swaps
+    in a newer one when the checkpoint file changes (checked at most every
+    `revisar_s` seconds), so a trainer in another process reaches every
+    engine without a restart. A swap is a single reference assignment:
+    requests in flight keep the snapshot they started with.
+    """
+    def __init__(self, memoria, archivo: Optional[str] = None, revisar_s: float = 5.0):
+        self.memoria = memoria
+        self._archivo = archivo
+        self.revisar_s = revisar_s
+        self._modelo: Optional[ModeloSentimiento] = None
+        self._firma = None
+        self._revisado = float("-inf")
+        self._lock = threading.Lock()
+
+    @property
+    def archivo(self) -> str:
+        return self._archivo or _archivo_punto(self.memoria)
+
+    def modelo(self) -> Optional[ModeloSentimiento]:
+        """The latest model, or None while nothing has been learned yet."""
+        if time.monotonic() - self._revisado >= self.revisar_s:
+            self._recargar()
+        return self._modelo
+
+    def _recargar(self):
+        with self._lock:
+            self._revisado = time.monotonic()
+            try:
+                info = os.stat(self.archivo)
+                firma = (info.st_mtime_ns, info.st_size)
+            except FileNotFoundError:
+                return
+            if firma == self._firma:
+                return
+            self._firma = firma
+            try:
+                punto = cargar_punto(self.memoria, self.archivo)
+            except Exception as e:
+                logger.error("Unreadable sentiment model checkpoint %s: %s", self.archivo, e)
+                return
+            if punto["clasificador"] is not None:
+                self.publicar(ModeloSentimiento(punto["clasificador"], punto["vistos"], punto["version"]))
+
+    def publicar(self, modelo: ModeloSentimiento):
+        if self._modelo is None or modelo.version != self._modelo.version:
+            self._modelo = modelo
+            logger.info("Sentiment model v%d in service (%d examples)", modelo.version, modelo.vistos)
+
+    def sentimiento(self, texto: str) -> Optional[str]:
+        """positivo / negativo / neutral, or None when there is no model yet."""
+        modelo = self.modelo()
+        return modelo.sentimiento(texto) if modelo is not None else None
+
+
+class EntrenadorEnLinea:
+    """
+    Learns the label of every interaction stored in MemoriaSagrada, a few
+    hundred at a time. Each pass streams only the records appended since the
+    last checkpoint (shards are read from a byte offset), decrypts their
+    messages and calls `partial_fit` on mini-batches of `tamano_lote`, so the
+    store is never decrypted or refitted in full. Training happens on a copy
+    of the current classifier; the copy, with the new offsets, is then
+    checkpointed atomically and published to `servido`, if given. A pass
+    holds a lock on the checkpoint file, so trainers in several processes
+    take turns instead of overwriting each other's progress.
+    """
+    def __init__(self, memoria, archivo: Optional[str] = None, tamano_lote: int = 256,
+                 servido: Optional[SentimientoEnLinea] = None):
+        self.memoria = memoria
+        self._archivo = archivo
+        self.tamano_lote = tamano_lote
+        self.servido = servido
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    @property
+    def archivo(self) -> str:
+        return self._archivo or _archivo_punto(self.memoria)
+
+    def _ajustar(self, clasificador, textos: List[str], etiquetas: List[str]):
+        if clasificador is None:
+            clasificador = _nuevo_clasificador()
+        with tramo("aprendizaje.lote"):
+            clasificador.partial_fit(_vectorizar(textos), etiquetas, classes=list(CLASES))
+        return clasificador
+
+    def _ejemplo(self, registro: Dict[str, Any], ruta: str) -> Optional[tuple]:
+        etiqueta = registro.get("etiqueta")
+        if etiqueta not in CLASES:
+            return None
+        try:
+            return self.memoria.descifrar_verificado(registro["mensaje_cifrado"]).decode("utf-8"), etiqueta
+        except Exception:
+            logger.warning("Skipping a record of %s that fails decryption", ruta)
+            return None
+
+    def paso(self) -> int:
+        """Learn from the records stored since the last pass; returns how many."""
+        with self._lock, bloqueo_archivo(self.archivo), tramo("aprendizaje.paso"):
+            punto = cargar_punto(self.memoria, self.archivo)
+            if punto["fragmentos"] != self.memoria.fragmentos:
+                # Offsets of another layout mean nothing here; records get learned a second time
+                logger.warning("Store was resharded since the last training pass; reading it from the start")
+                punto.update(fragmentos=self.memoria.fragmentos, cursor={})
+            clasificador = copy.deepcopy(punto["clasificador"])
+            cursor_previo = copy.deepcopy(punto["cursor"])
+            aprendidos = 0
+            for indice in range(self.memoria.fragmentos):
+                ruta = self.memoria.archivo_fragmento(indice)
+                if not os.path.exists(ruta):
+                    continue
+                previo = punto["cursor"].get(str(indice))
+                desde = 0
+                if previo and huella_cola(ruta, previo["desplazamiento"]) == previo["cola"]:
+                    desde = previo["desplazamiento"]
+                elif previo:
+                    logger.warning("Shard %s was rewritten since the last training pass; reading it again", ruta)
+                fin = desde
+                textos: List[str] = []
+                etiquetas: List[str] = []
+                for registro, fin in leer_registros_desde(ruta, desde):
+                    ejemplo = self._ejemplo(registro, ruta)
+                    if ejemplo is None:
+                        continue
+                    textos.append(ejemplo[0])
+                    etiquetas.append(ejemplo[1])
+                    if len(textos) >= self.tamano_lote:
+                        clasificador = self._ajustar(clasificador, textos, etiquetas)
+                        aprendidos += len(textos)
+                        textos, etiquetas = [], []
+                if textos:
+                    clasificador = self._ajustar(clasificador, textos, etiquetas)
+                    aprendidos += len(textos)
+                punto["cursor"][str(indice)] = {"desplazamiento": fin, "cola": huella_cola(ruta, fin)}
+
+            if aprendidos:
+                punto.update(clasificador=clasificador, vistos=punto["vistos"] + aprendidos,
+                             version=punto["version"] + 1)
+            if aprendidos or punto["cursor"] != cursor_previo:
+                _guardar_punto(self.memoria, self.archivo, punto)
+            if aprendidos:
+                logger.info("Sentiment model v%d: learned %d new examples (%d in total)",
+                            punto["version"], aprendidos, punto["vistos"])
+                if self.servido is not None:
+                    self.servido.publicar(ModeloSentimiento(clasificador, punto["vistos"], punto["version"]))
+            return aprendidos
+
+    def iniciar(self, intervalo_s: float = 300.0):
+        """Run a pass now and then every `intervalo_s` seconds in a background thread."""
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._bucle, args=(intervalo_s,), name="nudamu-aprendizaje",
+                                      daemon=True)
+        self._hilo.start()
+
+    def _bucle(self, intervalo_s: float):
+        while True:
+            try:
+                self.paso()
+            except Exception as e:
+                logger.error("Online training pass failed: %s", e, exc_info=True)
+            if self._parar.wait(intervalo_s):
+                return
+
+    def detener(self, timeout_s: Optional[float] = None):
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout_s)
+            self._hilo = None
@@ -0,0 +1,174 @@
+# core/bitacora.py
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_ATRIBUTOS_BASE = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "suprimidos"}
+
+
+class FormateadorJSON(logging.Formatter):
+    """One JSON object per line. Fields passed with `extra=` are included as-is."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        salida = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+            "modulo": record.module,
+            "linea": record.lineno,
+            "proceso": record.process,
+            "hilo": record.threadName,
+        }
+        suprimidos = getattr(record, "suprimidos", 0)
+        if suprimidos:
+            salida["suprimidos"] = suprimidos
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_BASE:
+                salida[clave] = valor
+        if record.exc_info:
+            salida["excepcion"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            salida["excepcion"] = record.exc_text
+        return json.dumps(salida, ensure_ascii=False, default=str)
+
+
+class FiltroRepeticiones(logging.Filter):
+    """
+    Rate-limits repetitive warnings and errors: each call site (logger, line,
+    message template) may emit `maximo` records per `ventana_s`; the rest are
+    dropped before they reach the queue, and the count of dropped records is
+    attached to the next one that gets through.
+    """
+    def __init__(self, maximo: int = 5, ventana_s: float = 60.0, nivel_minimo: int = logging.WARNING):
+        super().__init__()
+        self.maximo = maximo
+        self.ventana_s = ventana_s
+        self.nivel_minimo = nivel_minimo
+        self._estado: Dict[Tuple, List] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.nivel_minimo:
+            return True
+        clave = (record.name, record.lineno, str(record.msg))
+        ahora = time.monotonic()
+        with self._lock:
+            estado = self._estado.get(clave)
+            if estado is None or ahora - estado[0] >= self.ventana_s:
+                if len(self._estado) > 10_000:
+                    self._estado.clear()
+                suprimidos = estado[2] if estado else 0
+                self._estado[clave] = [ahora, 1, 0]
+                if suprimidos:
+                    record.suprimidos = suprimidos
+                return True
+            if estado[1] < self.maximo:
+                estado[1] += 1
+                return True
+            estado[2] += 1
+            return False
+
+
+class FormateadorMensaje(logging.Formatter):
+    """The message with its `%` arguments applied; the traceback goes to `exc_text`, not into the message."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        return record.getMessage()
+
+
+class ManejadorCola(logging.handlers.QueueHandler):
+    """
+    QueueHandler that renders the message on the caller's thread, as the
+    stdlib one does: the `%` arguments may be mutated as soon as the call
+    returns, so they must not reach the listener. Only that is done here
+    (and only for records that pass the filters); JSON encoding and the
+    write happen on the listener thread.
+    """
+    def __init__(self, cola):
+        super().__init__(cola)
+        self.setFormatter(FormateadorMensaje())
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        mensaje = self.format(record)
+        # A copy, so handlers after this one still see the original record
+        record = copy.copy(record)
+        record.message = record.msg = mensaje
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+_manejador: Optional[ManejadorCola] = None
+_oyente: Optional[logging.handlers.QueueListener] = None
+_destinos: List[logging.Handler] = []
+_lock = threading.Lock()
+
+
+def _iniciar_oyente():
+    global _oyente
+    cola: "queue.SimpleQueue" = queue.SimpleQueue()
+    _manejador.queue = cola
+    _oyente = logging.handlers.QueueListener(cola, *_destinos, respect_handler_level=True)
+    _oyente.start()
+
+
+def _reiniciar_en_hijo():
+    # The listener thread does not survive fork(); give the child its own queue and thread
+    if _manejador is not None:
+        _iniciar_oyente()
+
+
+def configurar(archivo: Optional[str] = None, nivel: Optional[str] = None, consola: bool = False,
+               max_repeticiones: int = 5, ventana_s: float = 60.0) -> logging.Logger:
+    """
+    Configure logging for the whole process, once: the root logger gets a
+    queue handler (callers only enqueue) and a listener thread writes JSON
+    lines to `archivo` (NUDAMU_LOG) and/or stderr. Calling it again is a no-op.
+    """
+    global _manejador
+    with _lock:
+        raiz = logging.getLogger()
+        if _manejador is not None:
+            return raiz
+        archivo = archivo or os.getenv("NUDAMU_LOG")
+        formateador = FormateadorJSON()
+        if archivo:
+            _destinos.append(logging.FileHandler(archivo, encoding="utf-8"))
+        if consola or not archivo:
+            _destinos.append(logging.StreamHandler(sys.stderr))
+        for destino in _destinos:
+            destino.setFormatter(formateador)
+
+        _manejador = ManejadorCola(queue.SimpleQueue())
+        _manejador.addFilter(FiltroRepeticiones(max_repeticiones, ventana_s))
+        raiz.addHandler(_manejador)
+        raiz.setLevel((nivel or os.getenv("NUDAMU_LOG_NIVEL", "INFO")).upper())
+        _iniciar_oyente()
+        os.register_at_fork(after_in_child=_reiniciar_en_hijo)
+        atexit.register(detener)
+        return raiz
+
+
+def detener():
+    """Flush queued records and stop the listener thread."""
+    global _oyente
+    with _lock:
+        if _oyente is not None:
+            _oyente.stop()
+            _oyente = None
+        for destino in _destinos:
+            destino.flush()
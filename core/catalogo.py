@@ -0,0 +1,156 @@
+# core/catalogo.py
+
+import json
+import logging
+import os
+import sys
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DIRECTORIO_CATALOGO = os.getenv(
+    "NUDAMU_CATALOGO_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos", "catalogo")
+)
+FORMATO_CATALOGO = 1
+
+
+def _internar(valor: Any) -> Any:
+    """Intern every string of a decoded JSON value, keys included; lists become tuples."""
+    if isinstance(valor, str):
+        return sys.intern(valor)
+    if isinstance(valor, list):
+        return tuple(_internar(v) for v in valor)
+    if isinstance(valor, dict):
+        return {sys.intern(k): _internar(v) for k, v in valor.items()}
+    return valor
+
+
+def _leer(ruta: str) -> Dict[str, Any]:
+    with open(ruta, "r", encoding="utf-8") as f:
+        datos = json.load(f)
+    if datos.get("formato") != FORMATO_CATALOGO:
+        raise ValueError(f"Unsupported catalog format in {ruta}: {datos.get('formato')!r}")
+    return _internar(datos)
+
+
+class Emocion:
+    """Language-independent part of an emotion: its intensity and trigger words."""
+    __slots__ = ("nombre", "intensidad", "disparadores")
+
+    def __init__(self, nombre: str, intensidad: str, disparadores: Tuple[str, ...]):
+        self.nombre = nombre
+        self.intensidad = intensidad
+        self.disparadores = disparadores
+
+
+class TextoEmocion:
+    __slots__ = ("respuesta", "consejo")
+
+    def __init__(self, respuesta: str, consejo: Optional[str] = None):
+        self.respuesta = respuesta
+        self.consejo = consejo
+
+
+class SeccionIdioma:
+    """
+    Texts of one language: emotion responses and advice, the philosophical
+    answers per context, the emotion transformations (`{respuesta}`
+    templates), time-of-day endings and loose texts. Never mutated once loaded.
+    """
+    __slots__ = ("idioma", "emociones", "respuestas", "transformaciones", "momentos", "textos")
+
+    def __init__(self, idioma: str, datos: Dict[str, Any]):
+        self.idioma = idioma
+        self.emociones: Dict[str, TextoEmocion] = {
+            nombre: TextoEmocion(t["respuesta"], t.get("consejo")) for nombre, t in datos.get("emociones", {}).items()
+        }
+        self.respuestas: Dict[str, Tuple[str, ...]] = datos.get("respuestas", {})
+        self.transformaciones: Dict[str, str] = datos.get("transformaciones", {})
+        self.momentos: Dict[str, str] = datos.get("momentos", {})
+        self.textos: Dict[str, str] = datos.get("textos", {})
+
+
+class Catalogo:
+    """
+    Versioned catalog of the response texts, in `directorio`: `indice.json`
+    holds what is the same in every language (emotions, trigger words,
+    context phrases) and is read at construction; each language's texts
+    are in `<idioma>.json`, read the first time that language is asked for.
+    Every string is interned, so instances and requests share one copy.
+    """
+    __slots__ = ("directorio", "version", "idiomas", "emociones", "contextos", "estados",
+                 "_secciones", "_respuestas", "_lock")
+
+    def __init__(self, directorio: str = DIRECTORIO_CATALOGO):
+        self.directorio = directorio
+        indice = _leer(os.path.join(directorio, "indice.json"))
+        self.version: str = indice.get("version", "0")
+        self.idiomas: Tuple[str, ...] = indice.get("idiomas", ())
+        self.emociones: Dict[str, Emocion] = {
+            nombre: Emocion(nombre, e.get("intensidad", "low"), e.get("disparadores", ()))
+            for nombre, e in indice.get("emociones", {}).items()
+        }
+        # Phrase lists whose first match decides the context / emotional state, in file order
+        self.contextos: Dict[str, Tuple[str, ...]] = indice.get("contextos", {})
+        self.estados: Dict[str, Tuple[str, ...]] = indice.get("estados", {})
+        self._secciones: Dict[str, SeccionIdioma] = {}
+        self._respuestas: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+        logger.info("Response catalog %s loaded from %s", self.version, directorio)
+
+    def seccion(self, idioma: str) -> SeccionIdioma:
+        """One language's texts, loaded on first use (empty for a language the catalog lacks)."""
+        seccion = self._secciones.get(idioma)
+        if seccion is None:
+            with self._lock:
+                seccion = self._secciones.get(idioma)
+                if seccion is None:
+                    datos = _leer(os.path.join(self.directorio, f"{idioma}.json")) if idioma in self.idiomas else {}
+                    if datos and datos.get("version") != self.version:
+                        logger.warning("Catalog section %s is version %s, index is %s",
+                                       idioma, datos.get("version"), self.version)
+                    seccion = self._secciones[idioma] = SeccionIdioma(idioma, datos)
+        return seccion
+
+    def cargadas(self) -> Tuple[str, ...]:
+        """Languages whose section has been loaded so far."""
+        return tuple(self._secciones)
+
+    def respuestas_emocionales(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Emotion responses in the shape AnalizadorEmocional returns them
+        (every language, intensity, advice by language), built once.
+        """
+        if self._respuestas is None:
+            secciones = [self.seccion(idioma) for idioma in self.idiomas]
+            respuestas = {}
+            for nombre, emocion in self.emociones.items():
+                entrada: Dict[str, Any] = {}
+                consejo: Dict[str, str] = {}
+                for seccion in secciones:
+                    texto = seccion.emociones.get(nombre)
+                    if texto is None:
+                        continue
+                    entrada[seccion.idioma] = texto.respuesta
+                    if texto.consejo is not None:
+                        consejo[seccion.idioma] = texto.consejo
+                entrada["intensity"] = emocion.intensidad
+                entrada["advice"] = consejo
+                respuestas[nombre] = entrada
+            self._respuestas = respuestas
+        return self._respuestas
+
+
+_catalogos: Dict[str, Catalogo] = {}
+_catalogos_lock = threading.Lock()
+
+
+def obtener_catalogo(directorio: str = DIRECTORIO_CATALOGO) -> Catalogo:
+    """Process-wide catalog per directory, shared by every analyzer instance."""
+    directorio = os.path.abspath(directorio)
+    with _catalogos_lock:
+        if directorio not in _catalogos:
+            _catalogos[directorio] = Catalogo(directorio)
+        return _catalogos[directorio]
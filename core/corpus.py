@@ -0,0 +1,265 @@
+# core/corpus.py
+
+import csv
+import io
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Analyzer owned by each worker process, created once by the pool initializer
+_central = None
+
+
+def _iniciar_trabajador():
+    global _central
+    from core.luohe_central import LuoHeCentral
+    _central = LuoHeCentral()
+    # Warm lazy state (TextBlob corpora, ethics packs, regex caches) before real work arrives
+    _central.analisis_completo("calentamiento", random.Random(0))
+
+
+@dataclass(frozen=True)
+class RegistroInvalido:
+    """An input line that holds no message; it becomes an error row, keeping its position."""
+    linea: int
+    error: str
+
+
+def analizar_lote(lote: List[Tuple[int, Union[str, RegistroInvalido]]]) -> List[Dict[str, Any]]:
+    """Analyze a batch of (index, text) pairs. Runs inside worker processes."""
+    if _central is None:
+        _iniciar_trabajador()
+    from core.documento import preparar_lote
+    resultados = []
+    validos = [(indice, texto) for indice, texto in lote if not isinstance(texto, RegistroInvalido)]
+    # One preprocessing pass for the whole batch (spaCy lemmas via nlp.pipe)
+    documentos = iter(preparar_lote((texto for _, texto in validos), tamano_lote=max(len(validos), 1)))
+    for indice, texto in lote:
+        if isinstance(texto, RegistroInvalido):
+            resultados.append({"indice": indice, "linea": texto.linea, "error": texto.error})
+            continue
+        documento = next(documentos)
+        try:
+            # Seeded by position so reruns and resumed runs produce identical output
+            analisis = _central.analisis_completo(documento, random.Random(indice))
+            resultados.append({"indice": indice, "analisis": analisis})
+        except Exception as e:
+            resultados.append({"indice": indice, "texto": texto, "error": str(e)})
+    return resultados
+
+
+def leer_registros(ruta: str, formato: Optional[str] = None,
+                   campo: str = "texto") -> Iterator[Union[str, RegistroInvalido]]:
+    """
+    Stream message texts from JSONL, CSV or plain text, one record at a time.
+    JSONL lines may be objects (text under `campo`) or bare JSON strings; a
+    line that is neither (malformed JSON, a number, a list) is yielded as a
+    RegistroInvalido with its line number, and reading goes on. In 'txt'
+    every non-empty line is a message. `-` reads standard input.
+    """
+    formato = formato or ("csv" if ruta.lower().endswith(".csv") else "jsonl")
+    es_stdin = ruta == "-"
+    f = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="") if es_stdin else open(ruta, "r", encoding="utf-8", newline="")
+    try:
+        if formato == "csv":
+            for fila in csv.DictReader(f):
+                yield fila.get(campo) or ""
+        elif formato == "txt":
+            for linea in f:
+                linea = linea.rstrip("\r\n")
+                if linea.strip():
+                    yield linea
+        else:
+            for numero, linea in enumerate(f, start=1):
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    registro = json.loads(linea)
+                except ValueError as e:
+                    yield RegistroInvalido(numero, f"Invalid JSON: {e}")
+                    continue
+                if isinstance(registro, str):
+                    yield registro
+                elif isinstance(registro, dict):
+                    yield str(registro.get(campo, ""))
+                else:
+                    yield RegistroInvalido(numero, f"Expected a JSON object or string, got {type(registro).__name__}")
+    finally:
+        if es_stdin:
+            f.detach()
+        else:
+            f.close()
+
+
+class Punto:
+    """Checkpoint next to the output: records done and where the output ends."""
+
+    def __init__(self, ruta_salida: str):
+        self.ruta = ruta_salida + ".checkpoint.json"
+
+    def leer(self) -> Dict[str, int]:
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"procesados": 0, "bytes_salida": 0, "partes": 0}
+
+    def escribir(self, estado: Dict[str, int]):
+        temporal = self.ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(estado, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.ruta)
+
+    def borrar(self):
+        try:
+            os.remove(self.ruta)
+        except FileNotFoundError:
+            pass
+
+
+class EscritorJSONL:
+    """Appends results to a JSONL file; resuming truncates to the checkpointed offset."""
+
+    def __init__(self, ruta: str, estado: Dict[str, int]):
+        self.ruta = ruta
+        modo = "r+b" if estado["bytes_salida"] and os.path.exists(ruta) else "wb"
+        self.f = open(ruta, modo)
+        if modo == "r+b":
+            self.f.truncate(estado["bytes_salida"])
+            self.f.seek(estado["bytes_salida"])
+
+    def escribir(self, resultados: List[Dict[str, Any]]):
+        for resultado in resultados:
+            self.f.write(json.dumps(resultado, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    def confirmar(self, estado: Dict[str, int]):
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        estado["bytes_salida"] = self.f.tell()
+
+    def cerrar(self):
+        self.f.close()
+
+
+class EscritorParquet:
+    """
+    Writes a directory of complete Parquet part files, one per `filas_por_parte`
+    rows, so a crash never leaves a half-written file behind the checkpoint.
+    Part files past the checkpoint (all of them on a fresh run) are removed
+    first, so no earlier run's rows mix into the output.
+    The analysis is stored as a JSON string column because its shape varies.
+    """
+    def __init__(self, ruta: str, estado: Dict[str, int], filas_por_parte: int = 10_000):
+        import pyarrow  # type: ignore  # noqa: F401  (fail early when missing)
+        self.ruta = ruta
+        self.filas_por_parte = filas_por_parte
+        self.pendientes: List[Dict[str, Any]] = []
+        os.makedirs(ruta, exist_ok=True)
+        for nombre in os.listdir(ruta):
+            numero = nombre[len("part-"):].split(".")[0]
+            if nombre.startswith("part-") and numero.isdigit() and int(numero) >= estado["partes"]:
+                os.remove(os.path.join(ruta, nombre))
+
+    def escribir(self, resultados: List[Dict[str, Any]]):
+        self.pendientes.extend(resultados)
+
+    def listo_para_confirmar(self) -> bool:
+        return len(self.pendientes) >= self.filas_por_parte
+
+    def confirmar(self, estado: Dict[str, int]):
+        if not self.pendientes:
+            return
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+        tabla = pa.table({
+            "indice": [r["indice"] for r in self.pendientes],
+            "analisis": pa.array([json.dumps(r.get("analisis"), ensure_ascii=False) if "analisis" in r else None
+                                  for r in self.pendientes], type=pa.string()),
+            "linea": pa.array([r.get("linea") for r in self.pendientes], type=pa.int64()),
+            "error": pa.array([r.get("error") for r in self.pendientes], type=pa.string()),
+        })
+        destino = os.path.join(self.ruta, f"part-{estado['partes']:05d}.parquet")
+        pq.write_table(tabla, destino + ".tmp")
+        os.replace(destino + ".tmp", destino)
+        estado["partes"] += 1
+        self.pendientes = []
+
+    def cerrar(self):
+        pass
+
+
+def analizar_corpus(entrada: str, salida: str, workers: int = 1, formato_entrada: Optional[str] = None,
+                    formato_salida: Optional[str] = None, campo: str = "texto", tamano_lote: int = 64,
+                    reanudar: bool = False, limite: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Stream `entrada` through LuoHeCentral.analisis_completo on a process pool and
+    write results in input order. At most two batches per worker are in flight,
+    so memory stays flat regardless of input size. With `reanudar`, records
+    already covered by the checkpoint are skipped.
+    """
+    formato_salida = formato_salida or ("parquet" if salida.endswith(".parquet") else "jsonl")
+    punto = Punto(salida)
+    estado = punto.leer() if reanudar else {"procesados": 0, "bytes_salida": 0, "partes": 0}
+    if not reanudar:
+        punto.borrar()
+    escritor = EscritorParquet(salida, estado) if formato_salida == "parquet" else EscritorJSONL(salida, estado)
+
+    textos = leer_registros(entrada, formato_entrada, campo)
+    inicio_indice = estado["procesados"]
+    registros = enumerate(itertools.islice(textos, inicio_indice, None), start=inicio_indice)
+    if limite is not None:
+        registros = itertools.islice(registros, limite)
+    lotes = iter(lambda: list(itertools.islice(registros, tamano_lote)), [])
+
+    def confirmar(forzar: bool = False):
+        if forzar or not isinstance(escritor, EscritorParquet) or escritor.listo_para_confirmar():
+            escritor.confirmar(estado)
+            punto.escribir(estado)
+
+    inicio = time.perf_counter()
+    nuevos = 0
+    try:
+        if workers <= 1:
+            for lote in lotes:
+                escritor.escribir(analizar_lote(lote))
+                estado["procesados"] = lote[-1][0] + 1
+                nuevos += len(lote)
+                confirmar()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_trabajador) as pool:
+                en_vuelo = deque()
+                for lote in itertools.chain(lotes, [None]):
+                    if lote is not None:
+                        en_vuelo.append((lote[-1][0] + 1, len(lote), pool.submit(analizar_lote, lote)))
+                    # Drain in submission order once the window is full (or at the end)
+                    while en_vuelo and (lote is None or len(en_vuelo) >= workers * 2):
+                        fin, n, futuro = en_vuelo.popleft()
+                        escritor.escribir(futuro.result())
+                        estado["procesados"] = fin
+                        nuevos += n
+                        confirmar()
+        confirmar(forzar=True)
+    finally:
+        escritor.cerrar()
+
+    duracion = time.perf_counter() - inicio
+    return {
+        "procesados": nuevos,
+        "total": estado["procesados"],
+        "segundos": round(duracion, 3),
+        "registros_s": round(nuevos / duracion, 1) if duracion else 0.0,
+        "workers": workers,
+    }
@@ -1,94 +1,74 @@
 # core/daode.py
 
-import re
 import random
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Union
+from core.documento import Documento, como_documento
+from core.reglas import RepositorioEtico, obtener_repositorio
+from core.utils.azar import rng_o_local
+from core.yuyan import detectar_idioma
 
 class EticaNuDaMu:
     """
     Ethical evaluation system for NuDaMu AI with multilingual support.
     Provides philosophical judgments on ethical dilemmas across cultures.
     """
-    def __init__(self):
-        self.dilemas: Dict[str, Dict[str, str]] = {
-            "mentir": {
-                "es": "Mentir es construir un laberinto sin salida para el alma.",
-                "zh": "谎言是为灵魂建造没有出口的迷宫。",
-                "en": "Lying constructs a labyrinth with no exit for the soul.",
-                "philosophy": "Deception creates separation from true being"
-            },
-            "robar": {
-                "es": "Robar es vaciar el alma antes que el bolsillo.",
-                "zh": "偷窃先于物质失去的是自我完整。",
-                "en": "Theft drains spiritual wholeness before material loss.",
-                "philosophy": "Taking violates the fundamental unity of existence"
-            },
-            "dañar": {
-                "es": "Dañar a otros es fracturar el propio ser.",
-                "zh": "伤害他人即是分裂自我。",
-                "en": "Harming others fractures the self.",
-                "philosophy": "Violence against others is violence against the universal self"
-            }
-        }
+    def __init__(self, repositorio: Optional[RepositorioEtico] = None):
+        # Dilemmas and principles live in versioned packs under core/datos/etica,
+        # compiled once per process and shared by every instance
+        self.repositorio = repositorio or obtener_repositorio()
 
-        self.principios = {
-            "es": [
-                "Todo acto ético nace de la conciencia de unidad.",
-                "La moral verdadera fluye sin forzar su curso."
-            ],
-            "zh": [
-                "道德行为源于整体性的认知。",
-                "真正的道德总是自然而然。"
-            ],
-            "en": [
-                "Ethical action springs from awareness of unity.",
-                "True morality flows like water, unforced."
-            ]
-        }
+    @property
+    def dilemas(self) -> Dict[str, Dict[str, str]]:
+        return self.repositorio.reglas.dilemas
+
+    @property
+    def principios(self) -> Dict[str, List[str]]:
+        return self.repositorio.reglas.principios
 
     def detectar_idioma(self, texto: str) -> str:
         """
         Detect predominant language in the text.
         """
-        if re.search(r'[\u4e00-\u9fff]', texto):
-            return 'zh'
-        elif re.search(r'[áéíóúñ]', texto, re.IGNORECASE):
-            return 'es'
-        return 'en'
+        return detectar_idioma(texto)
 
-    def evaluar(self, texto: str, idioma: Optional[str] = None) -> Dict[str, Any]:
+    def evaluar(self, texto: Union[str, Documento], idioma: Optional[str] = None,
+                rng: Optional[random.Random] = None) -> Dict[str, Any]:
         """
         Evaluate text for ethical dilemmas and provide judgment.
         Returns a dict with multilingual and philosophical insights.
+        Takes the message's Documento (or a raw string, prepared here).
+        `rng` is the request's generator; the principle choice draws from it.
         """
-        idioma = idioma or self.detectar_idioma(texto)
-        texto_lower = texto.lower()
+        documento = como_documento(texto, idioma)
+        idioma = documento.idioma
+        self.repositorio.recargar_si_cambio()
+        reglas = self.repositorio.reglas
 
-        for dilema, respuestas in self.dilemas.items():
-            if dilema in texto_lower:
-                return {
-                    "es": respuestas["es"],
-                    "zh": respuestas["zh"],
-                    "en": respuestas["en"],
-                    "reflection": respuestas["philosophy"],
-                    "dilema": dilema
-                }
+        encontrado = reglas.buscar(documento.normalizado)
+        if encontrado:
+            dilema, respuestas = encontrado
+            return {
+                "es": respuestas["es"],
+                "zh": respuestas["zh"],
+                "en": respuestas["en"],
+                "reflection": respuestas["philosophy"],
+                "dilema": dilema
+            }
 
-        principle = random.choice(self.principios.get(idioma, self.principios["en"]))
+        principios = reglas.principios
+        principle = rng_o_local(rng).choice(principios.get(idioma) or principios["en"])
         return {
             "es": f"No detecto un dilema específico, pero reflexiona:\n{principle}\n(El sistema ético NuDaMu valora la unidad fundamental de todo ser)",
-            "zh": "未检测到具体的伦理困境，但请思考：\n" + (self.principios["zh"][0] if self.principios["zh"] else ""),
+            "zh": "未检测到具体的伦理困境，但请思考：\n" + (principios["zh"][0] if principios.get("zh") else ""),
             "en": f"No specific dilemma detected, but reflect:\n{principle}\n(The NuDaMu ethical system values the fundamental unity of all beings)",
             "reflection": principle,
             "dilema": None
         }
 
-    def agregar_dilema(self, tema: str, respuestas: Dict[str, str]):
+    def agregar_dilema(self, tema: str, respuestas: Dict[str, str], persistir: bool = False):
         """
         Add new ethical dilemma to the system. Requires keys 'es', 'zh', 'en' and 'philosophy'.
+        The dilemma is visible to every instance sharing the repository; with
+        `persistir` it is saved to the local pack for other processes too.
         """
-        required_keys = ['es', 'zh', 'en', 'philosophy']
-        if all(key in respuestas for key in required_keys):
-            self.dilemas[tema] = respuestas
-        else:
-            raise ValueError("Responses must include all required language keys")
\ No newline at end of file
+        self.repositorio.agregar(tema, respuestas, persistir=persistir)
\ No newline at end of file
@@ -0,0 +1,181 @@
+# core/doctor.py
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FORMATO_INFORME = 1
+_MARCA = "\x00nudamu-doctor "
+
+
+@dataclass(frozen=True)
+class Componente:
+    nombre: str
+    descripcion: str
+    codigo: str  # Imports and initializes the component in a fresh interpreter
+
+
+COMPONENTES = [
+    Componente("textblob", "TextBlob + corpora (AnalizadorEmocional)",
+               "from textblob import TextBlob\nTextBlob('hola mundo, estoy feliz').sentiment"),
+    Componente("spacy", "spaCy es_core_news_sm", "import spacy\nspacy.load('es_core_news_sm')"),
+    Componente("gensim", "gensim Word2Vec/KeyedVectors", "from gensim.models import Word2Vec, KeyedVectors"),
+    Componente("sklearn", "scikit-learn vectorizers and models",
+               "from sklearn.feature_extraction.text import TfidfVectorizer\nfrom sklearn.svm import SVC"),
+    Componente("nltk", "NLTK tokenizers and stopwords", "from nltk.tokenize import word_tokenize\nfrom nltk.corpus import stopwords"),
+    Componente("torch", "PyTorch", "import torch"),
+    Componente("transformers", "BERT sentiment pipeline (core.transformers_utils)", "import core.transformers_utils"),
+    Componente("tensorflow", "TensorFlow LSTM (core.deep_models)",
+               "import core.deep_models\ncore.deep_models.build_lstm_model()"),
+    Componente("nlp_utils", "core.nlp_utils (sklearn, NLTK, gensim)", "import core.nlp_utils"),
+    Componente("documento", "Shared message preprocessing, spaCy lemmas (core.documento)",
+               "from core.documento import preparar\npreparar('hola, hoy estoy feliz', lematizar=True)"),
+    Componente("nombres", "Sacred-name catalog", "from core.simbolos.nombres import catalogo\ncatalogo()"),
+    Componente("etica", "Ethics rule packs", "from core.daode import EticaNuDaMu\nEticaNuDaMu()"),
+    Componente("catalogo", "Response catalog, every language",
+               "from core.catalogo import obtener_catalogo\nobtener_catalogo().respuestas_emocionales()"),
+    Componente("luohe_central", "LuoHeCentral, first message",
+               "from core.luohe_central import LuoHeCentral\nLuoHeCentral().procesar('hola, hoy estoy feliz')"),
+    Componente("engine", "NuDaMuEngine, first message",
+               "from core.engine import NuDaMuEngine\nNuDaMuEngine().procesar('hola, hoy estoy feliz', 'doctor')"),
+    Componente("servidor", "HTTP front-end (FastAPI)", "import core.servidor"),
+]
+
+# Runs inside the child interpreter: measure one component from a clean start
+_ARNES = r"""
+import json, sys, time
+
+def rss_mib():
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return 0.0
+
+trazar = sys.argv[1] == "1"
+codigo = sys.argv[2]
+if trazar:
+    import tracemalloc
+    tracemalloc.start()
+rss_inicial = rss_mib()
+inicio = time.perf_counter()
+estado, error = "ok", None
+try:
+    exec(compile(codigo, "<componente>", "exec"), {"__name__": "__doctor__"})
+except ModuleNotFoundError as e:
+    estado, error = "falta", str(e)
+except BaseException as e:
+    estado, error = "error", f"{type(e).__name__}: {e}"
+resultado = {"estado": estado, "error": error, "segundos": time.perf_counter() - inicio,
+             "rss_inicial_mib": rss_inicial, "rss_mib": rss_mib()}
+if trazar:
+    resultado["pico_tracemalloc_mib"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+sys.stdout.flush()
+print("\x00nudamu-doctor " + json.dumps(resultado), flush=True)
+"""
+
+
+@dataclass
+class Medicion:
+    nombre: str
+    descripcion: str
+    estado: str = "ok"
+    segundos: float = 0.0
+    rss_delta_mib: float = 0.0
+    rss_mib: float = 0.0
+    pico_tracemalloc_mib: Optional[float] = None
+    error: Optional[str] = None
+
+
+def _ejecutar_arnes(codigo: str, trazar: bool, timeout_s: float, directorio: str) -> Dict[str, Any]:
+    entorno = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [RAIZ, os.getenv("PYTHONPATH")])))
+    # core.engine refuses to import without a key; the profile only needs it to be present
+    entorno.setdefault("NUDAMU_CRYPTO_KEY", "0123456789abcdef")
+    try:
+        proceso = subprocess.run([sys.executable, "-c", _ARNES, "1" if trazar else "0", codigo],
+                                 capture_output=True, text=True, timeout=timeout_s, cwd=directorio, env=entorno)
+    except subprocess.TimeoutExpired:
+        return {"estado": "error", "error": f"timed out after {timeout_s:.0f}s"}
+    for linea in reversed(proceso.stdout.splitlines()):
+        if linea.startswith(_MARCA):
+            return json.loads(linea[len(_MARCA):])
+    ultima = (proceso.stderr.strip().splitlines() or ["no output"])[-1]
+    return {"estado": "error", "error": f"exit {proceso.returncode}: {ultima}"}
+
+
+def perfilar(nombres: Optional[List[str]] = None, tracemalloc: bool = True,
+             timeout_s: float = 600.0) -> List[Medicion]:
+    """
+    Import and initialize each component in its own fresh interpreter, so
+    nothing is shared or already cached in memory. Wall time and RSS come from
+    a plain run; the tracemalloc peak from a second, traced run (tracing slows
+    imports down and would distort the timing).
+    """
+    componentes = [c for c in COMPONENTES if nombres is None or c.nombre in nombres]
+    mediciones = []
+    with tempfile.TemporaryDirectory(prefix="nudamu-doctor-") as directorio:
+        for componente in componentes:
+            simple = _ejecutar_arnes(componente.codigo, False, timeout_s, directorio)
+            medicion = Medicion(componente.nombre, componente.descripcion, simple["estado"], error=simple.get("error"))
+            if simple["estado"] == "ok":
+                medicion.segundos = round(simple["segundos"], 4)
+                medicion.rss_mib = round(simple["rss_mib"], 1)
+                medicion.rss_delta_mib = round(simple["rss_mib"] - simple["rss_inicial_mib"], 1)
+                if tracemalloc:
+                    trazado = _ejecutar_arnes(componente.codigo, True, timeout_s, directorio)
+                    if trazado["estado"] == "ok":
+                        medicion.pico_tracemalloc_mib = round(trazado["pico_tracemalloc_mib"], 1)
+            mediciones.append(medicion)
+    return mediciones
+
+
+def informe(mediciones: List[Medicion]) -> Dict[str, Any]:
+    """JSON report, ranked by startup time; stable layout so releases can be diffed."""
+    import platform
+    ordenadas = sorted(mediciones, key=lambda m: (m.estado != "ok", -m.segundos))
+    return {
+        "formato": FORMATO_INFORME,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "componentes": [asdict(m) for m in ordenadas],
+    }
+
+
+def comparar_informes(actual: Dict[str, Any], anterior: Dict[str, Any], umbral: float = 0.25,
+                      minimo_s: float = 0.05, minimo_mib: float = 5.0) -> List[Dict[str, Any]]:
+    """
+    Per-component change in time and RSS against an earlier report. A change
+    counts as a regression past `umbral` (relative) and above small absolute
+    floors, so millisecond-level noise on tiny components is ignored.
+    """
+    previos = {c["nombre"]: c for c in anterior.get("componentes", []) if c["estado"] == "ok"}
+    filas = []
+    for c in actual["componentes"]:
+        previo = previos.get(c["nombre"])
+        if c["estado"] != "ok" or previo is None:
+            continue
+        d_s = c["segundos"] - previo["segundos"]
+        d_mib = c["rss_delta_mib"] - previo["rss_delta_mib"]
+        lento = d_s > minimo_s and d_s > umbral * previo["segundos"]
+        pesado = d_mib > minimo_mib and d_mib > umbral * max(previo["rss_delta_mib"], 0.1)
+        filas.append({"componente": c["nombre"], "segundos": c["segundos"], "antes_s": previo["segundos"],
+                      "rss_delta_mib": c["rss_delta_mib"], "antes_mib": previo["rss_delta_mib"],
+                      "regresion": lento or pesado})
+    return filas
+
+
+def verificar_dependencias() -> List[Dict[str, str]]:
+    """Quick check without importing anything: which optional packages are installed."""
+    paquetes = ["textblob", "spacy", "gensim", "sklearn", "nltk", "torch", "transformers", "tensorflow",
+                "googletrans", "fastapi", "uvicorn", "pyarrow", "cryptography", "streamlit"]
+    return [{"paquete": p, "instalado": "sí" if importlib.util.find_spec(p) else "no"} for p in paquetes]
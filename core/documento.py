@@ -0,0 +1,137 @@
+# core/documento.py
+
+import logging
+import os
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from core.yuyan import identificar
+
+logger = logging.getLogger(__name__)
+
+_PALABRA = re.compile(r"\w+")
+
+# Only tokenization, tagging and lemmatization are needed; the rest of the pipeline is skipped
+_COMPONENTES_SPACY_OMITIDOS = ["parser", "ner", "senter"]
+_MODELOS_SPACY = {"es": os.getenv("NUDAMU_SPACY_MODELO", "es_core_news_sm")}
+
+_modelos: dict = {}
+_modelos_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Documento:
+    """
+    One message, preprocessed once and shared by every analyzer: the original
+    text, its normalized form (NFC, lower-case), word tokens, script and
+    language. `lemas` is filled only when the document was prepared with
+    lemmatization (spaCy, for languages with a model installed; the tokens
+    themselves otherwise) and is None when nobody asked for it.
+    """
+    texto: str
+    normalizado: str
+    tokens: Tuple[str, ...]
+    escritura: str
+    idioma: str
+    confianza: float
+    lemas: Optional[Tuple[str, ...]] = None
+
+    @property
+    def longitud(self) -> int:
+        return len(self.texto)
+
+
+def _modelo_spacy(idioma: str):
+    """spaCy pipeline for `idioma`, loaded once; None when spaCy or the model is not installed."""
+    nombre = _MODELOS_SPACY.get(idioma)
+    if not nombre:
+        return None
+    with _modelos_lock:
+        if idioma not in _modelos:
+            try:
+                import spacy  # type: ignore
+                _modelos[idioma] = spacy.load(nombre, disable=_COMPONENTES_SPACY_OMITIDOS)
+            except (ImportError, OSError) as e:
+                logger.info("spaCy model %s unavailable (%s); lemmas fall back to tokens", nombre, e)
+                _modelos[idioma] = None
+        return _modelos[idioma]
+
+
+def _lemas_spacy(doc_spacy) -> Tuple[str, ...]:
+    return tuple(t.lemma_.lower() for t in doc_spacy if not (t.is_punct or t.is_space))
+
+
+def _base(texto: str, idioma: Optional[str]) -> Documento:
+    normalizado = unicodedata.normalize("NFC", texto).lower()
+    resultado = identificar(texto)
+    return Documento(
+        texto=texto,
+        normalizado=normalizado,
+        tokens=tuple(_PALABRA.findall(normalizado)),
+        escritura=resultado.escritura,
+        idioma=idioma or resultado.codigo,
+        confianza=resultado.confianza,
+    )
+
+
+def preparar(texto: str, idioma: Optional[str] = None, lematizar: bool = False) -> Documento:
+    """
+    Build the Documento for one message. Pass `idioma` to override the
+    detected language; `lematizar` runs spaCy (only callers that use the
+    lemmas should ask for them).
+    """
+    documento = _base(texto, idioma)
+    if not lematizar:
+        return documento
+    modelo = _modelo_spacy(documento.idioma)
+    lemas = _lemas_spacy(modelo(texto)) if modelo is not None else documento.tokens
+    return _con_lemas(documento, lemas)
+
+
+def _con_lemas(documento: Documento, lemas: Tuple[str, ...]) -> Documento:
+    return Documento(documento.texto, documento.normalizado, documento.tokens, documento.escritura,
+                     documento.idioma, documento.confianza, lemas)
+
+
+def preparar_lote(textos: Iterable[str], lematizar: bool = True, tamano_lote: int = 64) -> Iterator[Documento]:
+    """
+    Documents for a stream of messages, in order. Lemmatization goes through
+    spaCy's `nlp.pipe` one batch of `tamano_lote` messages at a time (per
+    language), which is much cheaper than calling the model per message.
+    """
+    lote: List[str] = []
+    for texto in textos:
+        lote.append(texto)
+        if len(lote) >= tamano_lote:
+            yield from _preparar_bloque(lote, lematizar, tamano_lote)
+            lote = []
+    if lote:
+        yield from _preparar_bloque(lote, lematizar, tamano_lote)
+
+
+def _preparar_bloque(textos: List[str], lematizar: bool, tamano_lote: int) -> List[Documento]:
+    documentos = [_base(texto, None) for texto in textos]
+    if not lematizar:
+        return documentos
+    por_idioma: dict = {}
+    for i, documento in enumerate(documentos):
+        por_idioma.setdefault(documento.idioma, []).append(i)
+    for idioma, indices in por_idioma.items():
+        modelo = _modelo_spacy(idioma)
+        if modelo is None:
+            for i in indices:
+                documentos[i] = _con_lemas(documentos[i], documentos[i].tokens)
+            continue
+        for i, doc_spacy in zip(indices, modelo.pipe((textos[i] for i in indices), batch_size=tamano_lote)):
+            documentos[i] = _con_lemas(documentos[i], _lemas_spacy(doc_spacy))
+    return documentos
+
+
+def como_documento(texto: Union[str, Documento], idioma: Optional[str] = None) -> Documento:
+    """Analyzers accept either; a raw string is prepared here (without lemmas)."""
+    if isinstance(texto, Documento):
+        return texto
+    return preparar(texto, idioma)
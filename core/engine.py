@@ -1,23 +1,28 @@
 import os
+import random
 import logging
+import threading
+from typing import Iterator, Optional
 from dotenv import load_dotenv # type: ignore
 
 # Core modules
 from core.identidad import ModosSimbolicos # type: ignore
+from core.enrutador import EnrutadorComandos
 from core.qinggan import AnalizadorEmocional # type: ignore
 from core.daode import EticaNuDaMu # type: ignore
 from memoria_secure.memoria import MemoriaSagrada # type: ignore
+from memoria_secure.reciente import MemoriaReciente
+from core.aprendizaje import EntrenadorEnLinea, SentimientoEnLinea
+from core.documento import preparar
+from core.metricas import peticion, tramo
+from core.utils.azar import nuevo_rng
+from core.utils.flujo import medir_peticion, recortar
 
 # Opcional: Importa módulos NLP avanzados para experimentación
 from core.nlp_utils import analizar_sentimiento_sklearn
 from core.transformers_utils import analizar_sentimiento as bert_sentiment
 
-# Configure logging
-logging.basicConfig(
-    filename="nudamu.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -28,7 +33,7 @@ crypto_key = os.getenv("NUDAMU_CRYPTO_KEY")
 if not crypto_key:
     raise EnvironmentError("❌ Missing NUDAMU_CRYPTO_KEY in .env file!")
 
-logging.info("✅ Loaded encryption key for secure memory.")
+logger.info("✅ Loaded encryption key for secure memory.")
 
 class NuDaMuEngine:
     """
@@ -38,79 +43,126 @@ class NuDaMuEngine:
     def __init__(self):
         # Initialize core components
         self.memoria = MemoriaSagrada(clave=crypto_key) # FIX: do not encode, MemoriaSagrada handles encoding
+        # Recent history per user, written through to the encrypted store
+        self.recientes = MemoriaReciente(self.memoria)
         self.modos = ModosSimbolicos()
+        self.enrutador = EnrutadorComandos(self.modos.registro)
         self.emociones = AnalizadorEmocional()
         self.etica = EticaNuDaMu()
+        # Sentiment model learned online from the stored interactions, swapped in as it improves
+        self.sentimiento = SentimientoEnLinea(self.memoria)
+        # In-process training (NUDAMU_ENTRENAR_S); with --prefork run `nudamu.py entrenar` instead
+        self.entrenador: Optional[EntrenadorEnLinea] = None
+        self._intervalo_entrenamiento = os.getenv("NUDAMU_ENTRENAR_S")
+        self._pid_entrenador: Optional[int] = None
+        self._lock_entrenador = threading.Lock()
         # Ejemplo: inicializa aquí modelos NLP avanzados si los usas
         # self.bert_sentiment = bert_sentiment
 
-    def procesar(self, texto: str, usuario_id: str) -> str:
+    def _iniciar_entrenamiento(self):
+        """
+        Start the in-process trainer on the first request, never in __init__:
+        an engine built before a fork would hand its children a thread that
+        does not exist there. A forked child starts its own.
+        """
+        if not self._intervalo_entrenamiento or self._pid_entrenador == os.getpid():
+            return
+        with self._lock_entrenador:
+            if self._pid_entrenador != os.getpid():
+                self.entrenador = EntrenadorEnLinea(self.memoria, servido=self.sentimiento)
+                self.entrenador.iniciar(float(self._intervalo_entrenamiento))
+                self._pid_entrenador = os.getpid()
+
+    def procesar(self, texto: str, usuario_id: str, rng: Optional[random.Random] = None) -> str:
         """
         Process user input text, routing commands and normal dialogue appropriately.
         If input starts with "///", the symbolic mode is invoked.
         Otherwise, emotional analysis and ethical evaluation are performed,
         and the interaction is stored securely.
+        `rng` is the request's own generator (seed it for reproducible output).
         """
-        logging.info(f"Processing input for user: {usuario_id}")
+        rng = rng or nuevo_rng()
+        logger.info("Processing input for user: %s", usuario_id)
+        self._iniciar_entrenamiento()
+        with peticion("engine.procesar"):
+            return "".join(self._procesar_stream(texto, usuario_id, rng))
 
-        # Check if it's a symbolic mode invocation (starts with "///")
-        if texto.startswith("///"):
-            comando = texto[3:].strip().lower()
-            return self.modos.ejecutar(comando, texto)
-
-        # --- NLP avanzado opcional ---
-        # Puedes activar análisis avanzado aquí, por ejemplo:
-        resultado_tfidf = analizar_sentimiento_sklearn(texto)
-        resultado_bert = bert_sentiment(texto)
-        # logging.info(f"BERT sentiment: {resultado_bert}")
+    def calentar(self):
+        """
+        Run one dialogue message through every analyzer so lazy state is built,
+        without storing it: no record, trend, vector or training example.
+        """
+        "".join(self._procesar_stream("calentamiento", "calentamiento", random.Random(0), persistir=False))
 
-        # Perform emotional analysis and ethical evaluation
-        emocion = self.emociones.analizar(texto)
-        juicio = self.etica.evaluar(texto)
+    def procesar_stream(self, texto: str, usuario_id: str, rng: Optional[random.Random] = None) -> Iterator[str]:
+        """
+        Same response as `procesar`, yielded in sections as soon as each one is
+        known (the TF-IDF line before BERT has run). The emotional and ethical
+        analysis and the secure write happen when the stream ends or is
+        closed, so a consumer that stops early still stores the interaction.
+        Consume it from one thread.
+        """
+        logger.info("Processing input for user: %s", usuario_id)
+        self._iniciar_entrenamiento()
+        return medir_peticion("engine.procesar", self._procesar_stream(texto, usuario_id, rng or nuevo_rng()))
 
-        # Attempt to store the input securely
+    def _procesar_stream(self, texto: str, usuario_id: str, rng: random.Random,
+                         persistir: bool = True) -> Iterator[str]:
+        # Check if it's a symbolic mode invocation (starts with "///")
+        comando = self.enrutador.separar(texto)
+        if comando:
+            with tramo("engine.modo"):
+                salida = self.modos.ejecutar(*comando, rng)
+            yield salida
+            return
+        yield from recortar(self._secciones(texto, usuario_id, rng, persistir))
+
+    def _secciones(self, texto: str, usuario_id: str, rng: random.Random, persistir: bool = True) -> Iterator[str]:
+        resultado_tfidf = None
+        try:
+            # --- NLP avanzado opcional ---
+            # Puedes activar análisis avanzado aquí, por ejemplo:
+            with tramo("engine.tfidf"):
+                resultado_tfidf = self.sentimiento.sentimiento(texto) or analizar_sentimiento_sklearn(texto)
+
+            # Personaliza la respuesta según el sentimiento
+            if resultado_tfidf == "positivo":
+                mensaje = "¡Me alegra sentir tu energía positiva!"
+            elif resultado_tfidf == "negativo":
+                mensaje = "Siento que hay algo que te preocupa. ¿Quieres hablar más?"
+            else:
+                mensaje = "Gracias por compartir tus palabras."
+            yield mensaje
+            yield f"\n\n🔎 TF-IDF Sentiment: {resultado_tfidf}"
+
+            with tramo("engine.bert"):
+                resultado_bert = bert_sentiment(texto)
+            # logging.info(f"BERT sentiment: {resultado_bert}")
+            yield f"\n\n🤖 BERT Sentiment: {resultado_bert}"
+        finally:
+            # Also when the consumer stops early (closed stream, client gone, rerun)
+            if persistir:
+                self._registrar(texto, usuario_id, rng, resultado_tfidf)
+
+    def _registrar(self, texto: str, usuario_id: str, rng: random.Random, resultado_tfidf: Optional[str]):
+        """Emotional and ethical analysis of the message, then the secure write. Never raises."""
         try:
-            self.memoria.guardar(
-                usuario_id,
-                texto,
-                etiqueta=emocion.get("emotion", "neutral") if isinstance(emocion, dict) else "neutral"
-            )
+            # One shared preprocessed document for both analyzers
+            with tramo("engine.documento"):
+                documento = preparar(texto)
+            with tramo("engine.emociones"):
+                emocion = self.emociones.analizar(documento)
+            with tramo("engine.etica"):
+                juicio = self.etica.evaluar(documento, rng=rng)
+
+            with tramo("engine.memoria"):
+                self.recientes.registrar(
+                    usuario_id,
+                    texto,
+                    etiqueta=emocion.get("emotion", "neutral") if isinstance(emocion, dict) else "neutral",
+                    analisis={"emocion": emocion, "juicio": juicio, "tfidf": resultado_tfidf},
+                    polaridad=emocion.get("scores", {}).get("polarity") if isinstance(emocion, dict) else None,
+                    documento=documento
+                )
         except Exception as e:
-            logging.error(f"Error saving memory for user {usuario_id}: {e}", exc_info=True)
-
-        # Formatea la respuesta poética y robusta
-        idioma = "es"  # Cambia a "en" si quieres respuestas en inglés
-        mensaje = emocion.get(idioma) if isinstance(emocion, dict) else str(emocion)
-        if not mensaje:
-            mensaje = emocion.get("en") if isinstance(emocion, dict) else ""
-        consejo = ""
-        if isinstance(emocion, dict) and "advice" in emocion and isinstance(emocion["advice"], dict):
-            consejo = emocion["advice"].get(idioma) or emocion["advice"].get("en") or ""
-        elif isinstance(juicio, dict) and "advice" in juicio and isinstance(juicio["advice"], dict):
-            consejo = juicio["advice"].get(idioma) or juicio["advice"].get("en") or ""
-        respuesta = mensaje
-        if consejo:
-            respuesta += f"\n\n💡 {consejo}"
-        if isinstance(juicio, str):
-            respuesta += f"\n\n{juicio}"
-        elif isinstance(juicio, dict) and "reflection" in juicio:
-            respuesta += f"\n\n{juicio['reflection']}"
-        # Agrega resultados de NLP avanzados si los tienes
-        if resultado_tfidf:
-            respuesta += f"\n\n🔎 TF-IDF Sentiment: {resultado_tfidf}"
-        if resultado_bert:
-            respuesta += f"\n\n🤖 BERT Sentiment: {resultado_bert}"
-
-        # Personaliza la respuesta según el sentimiento
-        if resultado_tfidf == "positivo":
-            mensaje = "¡Me alegra sentir tu energía positiva!"
-        elif resultado_tfidf == "negativo":
-            mensaje = "Siento que hay algo que te preocupa. ¿Quieres hablar más?"
-        else:
-            mensaje = "Gracias por compartir tus palabras."
-
-        # Puedes combinar con el resultado de BERT si lo deseas
-        respuesta = mensaje
-        respuesta += f"\n\n🔎 TF-IDF Sentiment: {resultado_tfidf}"
-        respuesta += f"\n\n🤖 BERT Sentiment: {resultado_bert}"
-        return respuesta.strip()
\ No newline at end of file
+            logger.error("Error saving memory for user %s: %s", usuario_id, e, exc_info=True)
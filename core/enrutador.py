@@ -0,0 +1,128 @@
+# core/enrutador.py
+
+import logging
+import random
+import re
+import threading
+from dataclasses import dataclass, field
+from importlib import metadata
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = "///"
+GRUPO_PLUGINS = "nudamu.modos"
+
+# `///<mode>` followed by optional whitespace; parsed once per message
+_COMANDO = re.compile(r"///(\w+)\s*")
+
+
+@dataclass(frozen=True)
+class Modo:
+    """
+    A symbolic mode. Patterns and tables the handler needs should be built
+    when the module defining it is imported, not inside `manejador`.
+    The handler receives the text and the request's `random.Random`; with
+    `documento` it receives the text's core.documento.Documento instead.
+    """
+    nombre: str
+    manejador: Callable[[Any, random.Random], str]
+    simbolos: Tuple[str, ...] = ("🌀",)
+    descripcion: str = ""
+    alias: Tuple[str, ...] = field(default_factory=tuple)
+    documento: bool = False
+
+
+class RegistroModos:
+    """
+    Registry of symbolic modes. Built-in modes register at import time;
+    third-party packages add modes through the `nudamu.modos` entry point
+    group, each entry being a `Modo` or a callable that receives the registry.
+    """
+    def __init__(self):
+        self._modos: Dict[str, Modo] = {}
+        # Every accepted command word (name or alias, lower-case) -> mode name
+        self._indice: Dict[str, str] = {}
+        self._plugins_cargados = False
+        self._lock = threading.Lock()
+
+    def registrar(self, modo: Modo) -> Modo:
+        with self._lock:
+            self._modos[modo.nombre] = modo
+            for palabra in (modo.nombre, *modo.alias):
+                self._indice[palabra.lower()] = modo.nombre
+        return modo
+
+    def modo(self, nombre: str, simbolos: Tuple[str, ...] = ("🌀",), descripcion: str = "",
+             alias: Tuple[str, ...] = (), documento: bool = False) -> Callable[[Callable], Callable]:
+        """Decorator form of `registrar` for handler functions."""
+        def decorador(manejador: Callable[[Any, random.Random], str]) -> Callable[[Any, random.Random], str]:
+            self.registrar(Modo(nombre, manejador, tuple(simbolos), descripcion, tuple(alias), documento))
+            return manejador
+        return decorador
+
+    def resolver(self, palabra: str) -> Optional[Modo]:
+        nombre = self._indice.get(palabra.lower())
+        return self._modos[nombre] if nombre else None
+
+    def modos(self) -> Dict[str, Modo]:
+        return dict(self._modos)
+
+    def comandos(self) -> Dict[str, str]:
+        """Accepted command words mapped to the mode they run."""
+        return dict(self._indice)
+
+    def cargar_plugins(self, grupo: str = GRUPO_PLUGINS) -> List[str]:
+        """
+        Load entry point plugins once. A failing plugin is logged and skipped
+        so it cannot take the built-in modes down with it.
+        """
+        if self._plugins_cargados:
+            return []
+        self._plugins_cargados = True
+        cargados = []
+        for punto in metadata.entry_points(group=grupo):
+            try:
+                objeto = punto.load()
+                if isinstance(objeto, Modo):
+                    self.registrar(objeto)
+                else:
+                    objeto(self)
+                cargados.append(punto.name)
+            except Exception as e:
+                logger.error("Failed to load mode plugin %s: %s", punto.name, e)
+        return cargados
+
+
+# Process-wide registry used by ModosSimbolicos and the routers
+registro = RegistroModos()
+
+
+class EnrutadorComandos:
+    """
+    Single-pass `///<mode>` parser. One anchored regex match plus one dict
+    lookup, so dispatch cost does not grow with the number of modes.
+    """
+    def __init__(self, registro_modos: Optional[RegistroModos] = None):
+        self.registro = registro_modos or registro
+        self.registro.cargar_plugins()
+
+    def separar(self, texto: str) -> Optional[Tuple[str, str]]:
+        """
+        Split `///word rest` into (word, rest) without checking the word is a mode.
+        A bare prefix gives an empty word; text without the prefix gives None.
+        """
+        if not texto.startswith(PREFIJO):
+            return None
+        encontrado = _COMANDO.match(texto)
+        if not encontrado:
+            return "", texto[len(PREFIJO):]
+        return encontrado.group(1).lower(), texto[encontrado.end():]
+
+    def detectar(self, texto: str) -> Optional[Tuple[str, str]]:
+        """Return (mode name, rest of the text) for a known mode command, else None."""
+        partes = self.separar(texto)
+        if not partes or not partes[0]:
+            return None
+        modo = self.registro.resolver(partes[0])
+        return (modo.nombre, partes[1]) if modo else None
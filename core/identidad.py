@@ -2,115 +2,132 @@
 
 import random
 import re
-from typing import Dict, Callable
+from typing import Dict, Callable, List, Optional, Union
+from core.documento import Documento, como_documento
+from core.enrutador import RegistroModos, registro
+from core.utils.azar import rng_o_local
+
+# Tables and patterns for the built-in modes, compiled once at import time
+
+_TEMAS_SOMBRA = tuple(
+    (re.compile(rf"\b{tema}\b"), mensaje) for tema, mensaje in {
+        "amor": "El amor que niegas crece en las sombras.",
+        "miedo": "Los miedos no nombrados gobiernan en silencio.",
+        "deseo": "Lo que más deseas ya te posee."
+    }.items()
+)
+_SOMBRA_GENERICA = (
+    "Lo no dicho clama desde las sombras.",
+    "La verdad duele menos que su ausencia.",
+    "Cada luz proyecta su sombra correspondiente."
+)
+
+_TAMANOS_ESPEJO = (
+    ("corto", "Lo breve contiene lo esencial.", 20),
+    ("medio", "El equilibrio busca su centro.", 50),
+    ("largo", "La profundidad requiere espacio.", 100)
+)
+
+_PREGUNTAS_GUIA = tuple(
+    (re.compile(patron), mensaje) for patron, mensaje in {
+        r"\bpor qué\b": "Las preguntas de 'por qué' buscan causas, las de 'cómo' caminos.",
+        r"\bquién\b": "La identidad es una brújula, no un destino.",
+        r"\bcómo\b": "El método emerge cuando el propósito es claro."
+    }.items()
+)
+_GUIA_GENERICA = (
+    "A veces las preguntas son faros disfrazados.",
+    "Navegar requiere tanto mapa como brújula.",
+    "Todo camino comienza con un paso suspendido."
+)
+
+_ESCALAS_ETER = (
+    ("palabra", "Las palabras son constelaciones efímeras."),
+    ("frase", "Las frases orbitan como sistemas solares."),
+    ("pensamiento", "Los pensamientos son galaxias en formación.")
+)
+
+_ETAPAS_LOTO = " → ".join((
+    "El loto crece a través del lodo.",
+    "Los pétalos se abren a su propio ritmo.",
+    "La flor perfecta contiene tanto belleza como decadencia."
+))
+
+
+@registro.modo("sombra", ("👤", "🕳️", "🌑", "👁️"), "Revela aspectos ocultos", documento=True)
+def _modo_sombra(documento: Documento, rng: random.Random) -> str:
+    detected = next((msg for patron, msg in _TEMAS_SOMBRA if patron.search(documento.normalizado)), None)
+    return detected or rng.choice(_SOMBRA_GENERICA)
+
+
+@registro.modo("espejo", ("🪞", "🌀", "💠", "🔮"), "Reflejo simbólico", documento=True)
+def _modo_espejo(documento: Documento, rng: random.Random) -> str:
+    texto, length = documento.texto, documento.longitud
+    size = next((a for a in _TAMANOS_ESPEJO if length <= a[2]), _TAMANOS_ESPEJO[-1])
+    return (f"Reflejo {size[0]}: '{texto[:30]}...'\n"
+            f"{size[1]} [Caracteres: {length}]")
+
+
+@registro.modo("guia", ("🌠", "🧭", "🗺️", "🔱"), "Orientación filosófica", alias=("guía",), documento=True)
+def _modo_guia(documento: Documento, rng: random.Random) -> str:
+    matched = next((msg for patron, msg in _PREGUNTAS_GUIA if patron.search(documento.normalizado)), None)
+    return matched or rng.choice(_GUIA_GENERICA)
+
+
+@registro.modo("éter", ("🌌", "☄️", "♾️", "⚛️"), "Perspectiva cósmica", alias=("eter",), documento=True)
+def _modo_eter(documento: Documento, rng: random.Random) -> str:
+    return next((msg for key, msg in _ESCALAS_ETER if key in documento.normalizado),
+                "El éter contiene todas las posibilidades.")
+
+
+@registro.modo("loto", ("🌸", "🏵️", "🎴", "💮"), "Transformación gradual", alias=("lotus",))
+def _modo_loto(texto: str, rng: random.Random) -> str:
+    return _ETAPAS_LOTO + f"\nTu texto '{texto[:15]}...' es semilla potencial."
+
 
 class ModosSimbolicos:
     """
     Symbolic interaction modes for NuDaMu's philosophical dialogue system.
     Provides different metaphorical lenses for user interaction.
+    Modes come from the shared registry in core.enrutador, including plugins.
     """
-    def __init__(self):
-        # Map mode names to their handler methods
-        self.modos: Dict[str, Callable[[str], str]] = {
-            "sombra": self._modo_sombra,
-            "espejo": self._modo_espejo,
-            "guia": self._modo_guia,
-            "éter": self._modo_eter,
-            "loto": self._modo_loto  # New mode
-        }
-
-        # Symbols used for decorating responses
-        self.symbols = {
-            "sombra": ["👤", "🕳️", "🌑", "👁️"],
-            "espejo": ["🪞", "🌀", "💠", "🔮"],
-            "guia": ["🌠", "🧭", "🗺️", "🔱"],
-            "éter": ["🌌", "☄️", "♾️", "⚛️"],
-            "loto": ["🌸", "🏵️", "🎴", "💮"]
-        }
-
-    def ejecutar(self, comando: str, texto: str) -> str:
+    def __init__(self, registro_modos: Optional[RegistroModos] = None):
+        self.registro = registro_modos or registro
+        self.registro.cargar_plugins()
+
+    @property
+    def modos(self) -> Dict[str, Callable[..., str]]:
+        return {nombre: modo.manejador for nombre, modo in self.registro.modos().items()}
+
+    @property
+    def symbols(self) -> Dict[str, List[str]]:
+        return {nombre: list(modo.simbolos) for nombre, modo in self.registro.modos().items()}
+
+    def ejecutar(self, comando: str, texto: Union[str, Documento], rng: Optional[random.Random] = None) -> str:
         """
-        Execute the requested symbolic mode.
+        Execute the requested symbolic mode on the text (or its Documento).
+        All randomness comes from `rng`, the generator of the current request.
         """
-        comando = comando.lower().strip()
-        if comando in self.modos:
+        rng = rng_o_local(rng)
+        modo = self.registro.resolver(comando.strip())
+        if modo:
             try:
-                respuesta = self.modos[comando](texto)
-                return self._decorar_respuesta(comando, respuesta)
+                if modo.documento:
+                    respuesta = modo.manejador(como_documento(texto), rng)
+                else:
+                    respuesta = modo.manejador(texto.texto if isinstance(texto, Documento) else texto, rng)
+                return self._decorar_respuesta(modo.simbolos, respuesta, rng)
             except Exception as e:
                 return f"🌀 El modo falló: {str(e)}"
-        sugerencias = random.sample(list(self.modos.keys()), min(3, len(self.modos)))
+        nombres = list(self.registro.modos())
+        sugerencias = rng.sample(nombres, min(3, len(nombres)))
         return (f"🌀 Modo no reconocido. Prueba con:\n"
                 f"///{', ///'.join(sugerencias)}\n"
-                f"(Hay {len(self.modos)} modos disponibles)")
+                f"(Hay {len(nombres)} modos disponibles)")
 
-    def _decorar_respuesta(self, modo: str, respuesta: str) -> str:
-        symbol = random.choice(self.symbols.get(modo, ["🌀"]))
+    def _decorar_respuesta(self, simbolos, respuesta: str, rng: random.Random) -> str:
+        symbol = rng.choice(simbolos or ("🌀",))
         return f"{symbol} {respuesta} {symbol}"
 
-    def _modo_sombra(self, texto: str) -> str:
-        themes = {
-            "amor": "El amor que niegas crece en las sombras.",
-            "miedo": "Los miedos no nombrados gobiernan en silencio.",
-            "deseo": "Lo que más deseas ya te posee."
-        }
-        texto_lower = texto.lower()
-        detected = next((t for t in themes if re.search(rf"\b{t}\b", texto_lower)), None)
-        return themes.get(detected, random.choice([
-            "Lo no dicho clama desde las sombras.",
-            "La verdad duele menos que su ausencia.",
-            "Cada luz proyecta su sombra correspondiente."
-        ]))
-
-    def _modo_espejo(self, texto: str) -> str:
-        length = len(texto)
-        analysis = [
-            ("corto", "Lo breve contiene lo esencial.", 20),
-            ("medio", "El equilibrio busca su centro.", 50),
-            ("largo", "La profundidad requiere espacio.", 100)
-        ]
-        size = next((a for a in analysis if length <= a[2]), analysis[-1])
-        return (f"Reflejo {size[0]}: '{texto[:30]}...'\n"
-                f"{size[1]} [Caracteres: {length}]")
-
-    def _modo_guia(self, texto: str) -> str:
-        questions = {
-            r"\bpor qué\b": "Las preguntas de 'por qué' buscan causas, las de 'cómo' caminos.",
-            r"\bquién\b": "La identidad es una brújula, no un destino.",
-            r"\bcómo\b": "El método emerge cuando el propósito es claro."
-        }
-        texto_lower = texto.lower()
-        matched = next((msg for p, msg in questions.items() if re.search(p, texto_lower)), None)
-        return matched or random.choice([
-            "A veces las preguntas son faros disfrazados.",
-            "Navegar requiere tanto mapa como brújula.",
-            "Todo camino comienza con un paso suspendido."
-        ])
-
-    def _modo_eter(self, texto: str) -> str:
-        cosmic_scales = [
-            ("palabra", "Las palabras son constelaciones efímeras."),
-            ("frase", "Las frases orbitan como sistemas solares."),
-            ("pensamiento", "Los pensamientos son galaxias en formación.")
-        ]
-        texto_lower = texto.lower()
-        return next((msg for key, msg in cosmic_scales if key in texto_lower),
-                    "El éter contiene todas las posibilidades.")
-
-    def _modo_loto(self, texto: str) -> str:
-        stages = [
-            "El loto crece a través del lodo.",
-            "Los pétalos se abren a su propio ritmo.",
-            "La flor perfecta contiene tanto belleza como decadencia."
-        ]
-        return " → ".join(stages) + f"\nTu texto '{texto[:15]}...' es semilla potencial."
-
     def listar_modos(self) -> str:
-        descripciones = {
-            "sombra": "Revela aspectos ocultos",
-            "espejo": "Reflejo simbólico",
-            "guia": "Orientación filosófica",
-            "éter": "Perspectiva cósmica",
-            "loto": "Transformación gradual"
-        }
-        return "\n".join(f"///{modo}: {desc}" for modo, desc in descripciones.items())
\ No newline at end of file
+        return "\n".join(f"///{nombre}: {modo.descripcion}" for nombre, modo in self.registro.modos().items())
@@ -1,10 +1,15 @@
 # core/luohe_central.py
 
-import re
-from typing import Dict, Any, Optional, Tuple
+import random
+from typing import Dict, Any, Iterator, Optional, Tuple, Union
+from core.documento import Documento, preparar
 from core.qinggan import AnalizadorEmocional  # type: ignore
 from core.daode import EticaNuDaMu  # type: ignore
 from core.identidad import ModosSimbolicos  # type: ignore
+from core.enrutador import EnrutadorComandos
+from core.metricas import peticion, tramo
+from core.utils.azar import nuevo_rng
+from core.utils.flujo import medir_peticion, recortar, rellenar
 
 class LuoHeCentral:
     """
@@ -15,14 +20,8 @@ class LuoHeCentral:
         self.etica = EticaNuDaMu()
         self.modos = ModosSimbolicos()
 
-        # Command registry with improved regex detection (using .match for beginning-of-string)
-        self.comandos: Dict[str, Tuple[str, int]] = {
-            r"^///sombra": ("sombra", 9),
-            r"^///espejo": ("espejo", 9),
-            r"^///guia": ("guia", 8),
-            r"^///éter": ("éter", 8),
-            r"^///lotus": ("loto", 9)
-        }
+        # `///<mode>` commands resolved against the shared mode registry
+        self.enrutador = EnrutadorComandos(self.modos.registro)
 
         # Response templates
         self.plantillas = {
@@ -31,60 +30,97 @@ class LuoHeCentral:
             "error": "⛔ El río encontró un obstáculo: {error}"
         }
 
-    def procesar(self, texto: str, usuario_id: str = "anon") -> str:
+    def procesar(self, texto: str, usuario_id: str = "anon", rng: Optional[random.Random] = None) -> str:
         """
         Main processing method that routes input to appropriate subsystems.
+        Each request draws from its own `rng` (a fresh unseeded one by default),
+        so concurrent calls never share random state; pass a seeded
+        `random.Random` for reproducible output.
+        """
+        rng = rng or nuevo_rng()
+        with peticion("central.procesar"):
+            return "".join(self._procesar_stream(texto, rng))
+
+    def calentar(self):
+        """Run one request through every analyzer so lazy state is built; nothing is recorded."""
+        "".join(self._procesar_stream("calentamiento", random.Random(0)))
+
+    def procesar_stream(self, texto: str, usuario_id: str = "anon",
+                        rng: Optional[random.Random] = None) -> Iterator[str]:
         """
+        Same response as `procesar`, yielded in sections as each analyzer
+        finishes: the emotion message first, the ethics reflection and the
+        perspective as they are ready. Joined, the sections equal what
+        `procesar` returns for the same `rng`. Consume it from one thread.
+        """
+        return medir_peticion("central.procesar", self._procesar_stream(texto, rng or nuevo_rng()))
+
+    def _procesar_stream(self, texto: str, rng: random.Random) -> Iterator[str]:
+        emitido = False
         try:
             # Check for symbolic mode commands
             modo_match = self._detectar_modo(texto)
             if modo_match:
-                modo, start_idx = modo_match
-                salida = self.modos.ejecutar(modo, texto[start_idx:])
-                return self.plantillas["modo"].format(respuesta=salida)
-
-            # Standard emotional-ethical analysis
-            emocion = self.emociones.analizar(texto)
-            dilema = self.etica.evaluar(texto)
-            perspectiva = self._generar_perspectiva(texto)
-
-            # --- Formateo poético y robusto ---
-            idioma = "es"
-            mensaje = emocion.get(idioma) or emocion.get("en") or str(emocion)
+                modo, resto = modo_match
+                with tramo("central.modo"):
+                    salida = self.modos.ejecutar(modo, resto, rng)
+                yield self.plantillas["modo"].format(respuesta=salida)
+                return
+
+            # Standard emotional-ethical analysis over one shared preprocessed document
+            with tramo("central.documento"):
+                documento = preparar(texto)
+            for trozo in recortar(rellenar(self.plantillas["default"], self._secciones(documento, rng))):
+                emitido = True
+                yield trozo
+        except Exception as e:
+            error = self.plantillas["error"].format(error=str(e))
+            # Sections already shown cannot be taken back; the error follows them
+            yield f"\n\n{error}" if emitido else error
+
+    def _secciones(self, documento: Documento, rng: random.Random) -> Iterator[Dict[str, str]]:
+        """Template fields of the default response, stage by stage."""
+        # --- Formateo poético y robusto ---
+        idioma = "es"
+        campos: Dict[str, str] = {}
+        with tramo("central.emociones"):
+            emocion = self.emociones.analizar(documento)
+        campos["mensaje"] = emocion.get(idioma) or emocion.get("en") or str(emocion)
+        if "advice" in emocion and isinstance(emocion["advice"], dict):
+            consejo = emocion["advice"].get(idioma) or emocion["advice"].get("en") or ""
+            campos["consejo"] = f"💡 {consejo}" if consejo else ""
+        yield campos
+
+        with tramo("central.etica"):
+            dilema = self.etica.evaluar(documento, rng=rng)
+        if "consejo" not in campos:
             consejo = ""
-            if "advice" in emocion and isinstance(emocion["advice"], dict):
-                consejo = emocion["advice"].get(idioma) or emocion["advice"].get("en") or ""
-            elif isinstance(dilema, dict) and "advice" in dilema and isinstance(dilema["advice"], dict):
+            if isinstance(dilema, dict) and "advice" in dilema and isinstance(dilema["advice"], dict):
                 consejo = dilema["advice"].get(idioma) or dilema["advice"].get("en") or ""
-            # Si dilema es dict, intenta mostrar reflexión, si es str, muéstralo directo
-            if isinstance(dilema, dict):
-                dilema_str = dilema.get("reflection") or dilema.get("es") or dilema.get("en") or str(dilema)
-            else:
-                dilema_str = str(dilema)
-
-            return self.plantillas["default"].format(
-                mensaje=mensaje,
-                consejo=f"💡 {consejo}" if consejo else "",
-                dilema=dilema_str,
-                perspectiva=perspectiva
-            ).strip()
-        except Exception as e:
-            return self.plantillas["error"].format(error=str(e))
+            campos["consejo"] = f"💡 {consejo}" if consejo else ""
+        # Si dilema es dict, intenta mostrar reflexión, si es str, muéstralo directo
+        if isinstance(dilema, dict):
+            campos["dilema"] = dilema.get("reflection") or dilema.get("es") or dilema.get("en") or str(dilema)
+        else:
+            campos["dilema"] = str(dilema)
+        yield campos
+
+        with tramo("central.perspectiva"):
+            campos["perspectiva"] = self._generar_perspectiva(documento)
+        yield campos
 
-    def _detectar_modo(self, texto: str) -> Optional[Tuple[str, int]]:
+    def _detectar_modo(self, texto: str) -> Optional[Tuple[str, str]]:
         """
-        Detect and parse symbolic mode commands using .match() for efficiency.
+        Detect and parse symbolic mode commands.
+        Returns (mode name, text after the command) or None.
         """
-        for pattern, (modo, length) in self.comandos.items():
-            if re.match(pattern, texto, re.IGNORECASE):
-                return (modo, length)
-        return None
+        return self.enrutador.detectar(texto)
 
-    def _generar_perspectiva(self, texto: str) -> str:
+    def _generar_perspectiva(self, documento: Documento) -> str:
         """
         Generate an integrated perspective combining multiple analyses.
         """
-        length = len(texto)
+        length = documento.longitud
         if length < 20:
             return f"Brevedad ({length} chars): Lo esencial se oculta en lo conciso."
         elif length < 100:
@@ -97,27 +133,34 @@ class LuoHeCentral:
         List all available special commands.
         """
         return "\n".join(
-            f"{cmd[:4]}...{cmd[-1:]}: {modo}"
-            for cmd, (modo, _) in self.comandos.items()
+            f"///{comando}: {modo}"
+            for comando, modo in self.enrutador.registro.comandos().items()
         )
 
-    def analisis_completo(self, texto: str) -> Dict[str, Any]:
+    def analisis_completo(self, texto: Union[str, Documento], rng: Optional[random.Random] = None) -> Dict[str, Any]:
         """
         Return complete system analysis as structured data.
+        Takes a raw string or a Documento already prepared with lemmas
+        (corpus jobs prepare them in batches with core.documento.preparar_lote).
         """
+        rng = rng or nuevo_rng()
+        documento = texto if isinstance(texto, Documento) else preparar(texto, lematizar=True)
         return {
-            "texto": texto,
-            "emocion": self.emociones.analizar(texto),
-            "etica": self.etica.evaluar(texto),
-            "modo_detectado": self._detectar_modo(texto),
-            "perspectiva": self._generar_perspectiva(texto),
-            "longitud": len(texto),
-            "palabras_clave": self._extraer_palabras_clave(texto)
+            "texto": documento.texto,
+            "idioma": documento.idioma,
+            "emocion": self.emociones.analizar(documento),
+            "etica": self.etica.evaluar(documento, rng=rng),
+            "modo_detectado": self._detectar_modo(documento.texto),
+            "perspectiva": self._generar_perspectiva(documento),
+            "longitud": documento.longitud,
+            "palabras_clave": self._extraer_palabras_clave(documento)
         }
 
-    def _extraer_palabras_clave(self, texto: str) -> list:
+    def _extraer_palabras_clave(self, documento: Documento) -> list:
         """
-        Extract potential keywords from text.
+        Extract potential keywords from text: words of four letters or more,
+        by lemma when the document has them.
         """
-        palabras = re.findall(r'\b\w{4,}\b', texto.lower())
-        return list(set(palabras))[:5]
\ No newline at end of file
+        palabras = [p for p in (documento.lemas or documento.tokens) if len(p) >= 4]
+        # First-occurrence order: stable across processes, unlike set order
+        return list(dict.fromkeys(palabras))[:5]
\ No newline at end of file
@@ -0,0 +1,253 @@
+# core/metricas.py
+
+import bisect
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets in seconds: 50µs .. ~26s, each sqrt(2) wider than the last
+LIMITES = tuple(round(5e-5 * 2 ** (i / 2), 7) for i in range(39))
+
+
+class Histograma:
+    """Cumulative-bucket latency histogram (Prometheus style); fixed memory."""
+    __slots__ = ("cuentas", "n", "suma")
+
+    def __init__(self):
+        self.cuentas = [0] * (len(LIMITES) + 1)
+        self.n = 0
+        self.suma = 0.0
+
+    def observar(self, segundos: float):
+        self.cuentas[bisect.bisect_left(LIMITES, segundos)] += 1
+        self.n += 1
+        self.suma += segundos
+
+    def percentil(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding rank q·n."""
+        if not self.n:
+            return 0.0
+        objetivo = q * self.n
+        acumulado = 0
+        for i, cuenta in enumerate(self.cuentas):
+            if cuenta and acumulado + cuenta >= objetivo:
+                inferior = LIMITES[i - 1] if i > 0 else 0.0
+                superior = LIMITES[i] if i < len(LIMITES) else LIMITES[-1] * 2
+                return inferior + (superior - inferior) * (objetivo - acumulado) / cuenta
+            acumulado += cuenta
+        return LIMITES[-1]
+
+
+class _TramoNulo:
+    """Shared no-op span returned while metrics are disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULO = _TramoNulo()
+
+
+class _Tramo:
+    __slots__ = ("registro", "nombre", "inicio")
+
+    def __init__(self, registro: "RegistroMetricas", nombre: str):
+        self.registro = registro
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duracion = time.perf_counter() - self.inicio
+        self.registro.observar(self.nombre, duracion)
+        detalle = getattr(self.registro._local, "detalle", None)
+        if detalle is not None:
+            detalle.append((self.nombre, duracion))
+        return False
+
+
+class _Peticion(_Tramo):
+    """Top-level span: collects the stage breakdown and reports slow requests."""
+    __slots__ = ("anterior",)
+
+    def __enter__(self):
+        local = self.registro._local
+        self.anterior = getattr(local, "detalle", None)
+        local.detalle = []
+        perfilador = self.registro.perfilador
+        if perfilador is not None and self.anterior is None:
+            perfilador.seguir()
+        return super().__enter__()
+
+    def __exit__(self, *exc):
+        duracion = time.perf_counter() - self.inicio
+        local = self.registro._local
+        detalle, local.detalle = local.detalle, self.anterior
+        if self.anterior is not None:
+            self.anterior.append((self.nombre, duracion))
+        self.registro.observar(self.nombre, duracion)
+        perfilador = self.registro.perfilador
+        muestras = perfilador.soltar() if perfilador is not None and self.anterior is None else None
+        if duracion >= self.registro.umbral_lento_s:
+            self.registro.reportar_lenta(self.nombre, duracion, detalle, muestras)
+        return False
+
+
+class PerfiladorMuestreo:
+    """
+    Sampling profiler for slow requests: while a request runs, a daemon thread
+    records its Python stack every `intervalo_s`. Only requests that end up
+    over the slow threshold keep their samples.
+    """
+    def __init__(self, intervalo_s: float = 0.005, profundidad: int = 25):
+        self.intervalo_s = intervalo_s
+        self.profundidad = profundidad
+        self._seguidos: Dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._hilo: Optional[threading.Thread] = None
+
+    def seguir(self):
+        with self._lock:
+            self._seguidos[threading.get_ident()] = Counter()
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._muestrear, name="nudamu-perfilador", daemon=True)
+                self._hilo.start()
+
+    def soltar(self) -> Counter:
+        with self._lock:
+            return self._seguidos.pop(threading.get_ident(), Counter())
+
+    def _pila(self, marco) -> Tuple[str, ...]:
+        pila = []
+        while marco is not None and len(pila) < self.profundidad:
+            codigo = marco.f_code
+            pila.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}:{marco.f_lineno}")
+            marco = marco.f_back
+        return tuple(reversed(pila))
+
+    def _muestrear(self):
+        while True:
+            time.sleep(self.intervalo_s)
+            with self._lock:
+                if not self._seguidos:
+                    continue
+                marcos = sys._current_frames()
+                for ident, muestras in self._seguidos.items():
+                    marco = marcos.get(ident)
+                    if marco is not None:
+                        muestras[self._pila(marco)] += 1
+
+
+class RegistroMetricas:
+    """
+    Process-wide latency histograms keyed by stage name.
+    `tramo(nombre)` times a stage; `peticion(nombre)` times a whole request and
+    keeps its per-stage breakdown when it is slower than `umbral_lento_s`.
+    When disabled both return a shared no-op, so instrumented code pays only
+    a function call.
+    """
+    def __init__(self, habilitado: bool = True, umbral_lento_s: float = 1.0,
+                 perfilador: Optional[PerfiladorMuestreo] = None, max_lentas: int = 50):
+        self.habilitado = habilitado
+        self.umbral_lento_s = umbral_lento_s
+        self.perfilador = perfilador
+        self.histogramas: Dict[str, Histograma] = {}
+        self.lentas: deque = deque(maxlen=max_lentas)
+        self.al_lento: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def tramo(self, nombre: str):
+        return _Tramo(self, nombre) if self.habilitado else _NULO
+
+    def peticion(self, nombre: str):
+        return _Peticion(self, nombre) if self.habilitado else _NULO
+
+    def observar(self, nombre: str, segundos: float):
+        with self._lock:
+            histograma = self.histogramas.get(nombre)
+            if histograma is None:
+                histograma = self.histogramas[nombre] = Histograma()
+            histograma.observar(segundos)
+
+    def reportar_lenta(self, nombre: str, duracion: float, detalle: List[Tuple[str, float]],
+                       muestras: Optional[Counter] = None):
+        informe: Dict[str, Any] = {
+            "peticion": nombre,
+            "ms": round(duracion * 1e3, 3),
+            "tramos": [{"tramo": t, "ms": round(d * 1e3, 3)} for t, d in detalle],
+        }
+        if muestras:
+            informe["pilas"] = [{"muestras": n, "pila": list(pila)} for pila, n in muestras.most_common(5)]
+        self.lentas.append(informe)
+        logger.warning("Slow request %s: %.1f ms (%s)", nombre, duracion * 1e3,
+                       ", ".join(f"{t}={d * 1e3:.1f}ms" for t, d in detalle))
+        for gancho in self.al_lento:
+            gancho(informe)
+
+    def reiniciar(self):
+        with self._lock:
+            self.histogramas.clear()
+            self.lentas.clear()
+
+    def instantanea(self) -> Dict[str, Any]:
+        """JSON-friendly summary: count, total and p50/p95/p99 per stage, plus recent slow requests."""
+        with self._lock:
+            tramos = {
+                nombre: {
+                    "n": h.n,
+                    "suma_s": round(h.suma, 6),
+                    "p50_ms": round(h.percentil(0.50) * 1e3, 3),
+                    "p95_ms": round(h.percentil(0.95) * 1e3, 3),
+                    "p99_ms": round(h.percentil(0.99) * 1e3, 3),
+                }
+                for nombre, h in sorted(self.histogramas.items())
+            }
+            return {"habilitado": self.habilitado, "tramos": tramos, "lentas": list(self.lentas)}
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lineas = [
+            "# HELP nudamu_tramo_segundos Latency of NuDaMu pipeline stages in seconds.",
+            "# TYPE nudamu_tramo_segundos histogram",
+        ]
+        with self._lock:
+            for nombre, h in sorted(self.histogramas.items()):
+                etiqueta = nombre.replace("\\", "\\\\").replace('"', '\\"')
+                acumulado = 0
+                for limite, cuenta in zip(LIMITES, h.cuentas):
+                    acumulado += cuenta
+                    lineas.append(f'nudamu_tramo_segundos_bucket{{tramo="{etiqueta}",le="{limite:g}"}} {acumulado}')
+                lineas.append(f'nudamu_tramo_segundos_bucket{{tramo="{etiqueta}",le="+Inf"}} {h.n}')
+                lineas.append(f'nudamu_tramo_segundos_sum{{tramo="{etiqueta}"}} {h.suma:.9g}')
+                lineas.append(f'nudamu_tramo_segundos_count{{tramo="{etiqueta}"}} {h.n}')
+        return "\n".join(lineas) + "\n"
+
+
+def _registro_desde_entorno() -> RegistroMetricas:
+    lento_ms = float(os.getenv("NUDAMU_LENTO_MS", "1000"))
+    perfilar = os.getenv("NUDAMU_PERFILAR_LENTAS", "0") == "1"
+    return RegistroMetricas(
+        habilitado=os.getenv("NUDAMU_METRICAS", "1") != "0",
+        umbral_lento_s=lento_ms / 1e3,
+        perfilador=PerfiladorMuestreo() if perfilar else None,
+    )
+
+
+# Process-wide registry (NUDAMU_METRICAS=0 disables it;
+# NUDAMU_LENTO_MS sets the slow threshold; NUDAMU_PERFILAR_LENTAS=1 samples stacks)
+metricas = _registro_desde_entorno()
+tramo = metricas.tramo
+peticion = metricas.peticion
@@ -4,11 +4,9 @@ from sklearn.naive_bayes import MultinomialNB
 import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
-import spacy
 from gensim.models import Word2Vec, KeyedVectors
 
-# Inicialización de spaCy (descarga el modelo antes: python -m spacy download es_core_news_sm)
-nlp = spacy.load("es_core_news_sm")
+# spaCy (lemmas) lives in core.documento, loaded lazily with only the components it needs
 
 # Cargar modelo preentrenado Word2Vec o GloVe
 # w2v = KeyedVectors.load_word2vec_format('GoogleNews-vectors-negative300.bin', binary=True)
@@ -0,0 +1,183 @@
+# core/prefork.py
+
+import gc
+import json
+import logging
+import os
+import signal
+import sys
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_CAMPOS_SMAPS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def leer_memoria(pid: int) -> Dict[str, int]:
+    """
+    Memory of one process in KiB from /proc (Linux). `unico` is what the
+    process alone holds (private pages); `compartido` is mapped by other
+    processes too, e.g. model weights inherited copy-on-write from the master.
+    """
+    valores = dict.fromkeys(_CAMPOS_SMAPS, 0)
+    ruta = f"/proc/{pid}/smaps_rollup"
+    if not os.path.exists(ruta):
+        ruta = f"/proc/{pid}/smaps"
+    with open(ruta, "r") as f:
+        for linea in f:
+            campo, _, resto = linea.partition(":")
+            if campo in valores:
+                valores[campo] += int(resto.split()[0])
+    return {
+        "pid": pid,
+        "rss_kib": valores["Rss"],
+        "pss_kib": valores["Pss"],
+        "unico_kib": valores["Private_Clean"] + valores["Private_Dirty"],
+        "compartido_kib": valores["Shared_Clean"] + valores["Shared_Dirty"],
+    }
+
+
+class Prefork:
+    """
+    Prefork launcher. `inicializar` runs once in the master (load engine and
+    models), then the GC is frozen so collections in the children do not
+    write to inherited objects, and `workers` processes are forked to run
+    `trabajo(estado, indice)`. Workers that die are restarted with backoff.
+
+    Workers share files, not memory: MemoriaSagrada and its trend and vector
+    files take a per-shard flock for every write, so they are safe here.
+    What a process keeps in memory is not shared: a worker's recent-memory
+    buffer does not see interactions stored by its siblings once loaded.
+    Start nothing (threads included) in `inicializar` that must keep running
+    in the workers; fork copies only the thread that calls it.
+    """
+    def __init__(self, inicializar: Callable[[], Any], trabajo: Callable[[Any, int], None],
+                 workers: int = 2, congelar_gc: bool = True, espera_reinicio_max: float = 30.0):
+        self.inicializar = inicializar
+        self.trabajo = trabajo
+        self.num_workers = workers
+        self.congelar_gc = congelar_gc
+        self.espera_reinicio_max = espera_reinicio_max
+        self.estado: Any = None
+        self.workers: Dict[int, int] = {}
+        self.reinicios: Dict[int, int] = {}
+        self._inicio_worker: Dict[int, float] = {}
+        self._deteniendo = False
+
+    def iniciar(self):
+        self.estado = self.inicializar()
+        if self.congelar_gc:
+            gc.collect()
+            gc.freeze()
+        for indice in range(self.num_workers):
+            self._lanzar(indice)
+
+    def _lanzar(self, indice: int) -> int:
+        pid = os.fork()
+        if pid == 0:
+            codigo = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                self.trabajo(self.estado, indice)
+            except BaseException:
+                traceback.print_exc()
+                codigo = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(codigo)
+        self.workers[pid] = indice
+        self._inicio_worker[indice] = time.monotonic()
+        logger.info("Worker %s started (pid %s)", indice, pid)
+        return pid
+
+    def supervisar(self, duracion: Optional[float] = None, intervalo_informe: Optional[float] = None):
+        """
+        Reap and restart workers until stopped (or for `duracion` seconds).
+        With `intervalo_informe`, log the memory report periodically.
+        """
+        fin = time.monotonic() + duracion if duracion is not None else None
+        proximo_informe = time.monotonic() + intervalo_informe if intervalo_informe else None
+        while self.workers and not self._deteniendo:
+            if fin is not None and time.monotonic() >= fin:
+                return
+            if proximo_informe and time.monotonic() >= proximo_informe:
+                logger.info("Memory report: %s", json.dumps(self.informe_memoria()))
+                proximo_informe = time.monotonic() + intervalo_informe
+            try:
+                pid, estado = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                time.sleep(0.05)
+                continue
+            indice = self.workers.pop(pid, None)
+            if indice is None or self._deteniendo:
+                continue
+            logger.error("Worker %s (pid %s) exited with status %s; restarting", indice, pid, estado)
+            self.reinicios[indice] = self.reinicios.get(indice, 0) + 1
+            # Back off when a worker dies right after starting, to avoid a crash loop
+            vida = time.monotonic() - self._inicio_worker.get(indice, 0)
+            if vida < 1.0:
+                time.sleep(min(self.espera_reinicio_max, 0.1 * 2 ** min(self.reinicios[indice], 8)))
+            self._lanzar(indice)
+
+    def detener(self, timeout: float = 10.0):
+        """Terminate all workers, killing those still alive after `timeout`."""
+        self._deteniendo = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+        limite = time.monotonic() + timeout
+        while self.workers and time.monotonic() < limite:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                self.workers.pop(pid, None)
+            else:
+                time.sleep(0.05)
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self.workers.pop(pid, None)
+
+    def informe_memoria(self) -> Dict[str, Any]:
+        """Per-worker unique vs shared memory, plus the master, in KiB."""
+        trabajadores: List[Dict[str, int]] = []
+        for pid, indice in sorted(self.workers.items(), key=lambda kv: kv[1]):
+            try:
+                trabajadores.append({"worker": indice, **leer_memoria(pid)})
+            except OSError:
+                continue
+        return {
+            "master": leer_memoria(os.getpid()),
+            "workers": trabajadores,
+            "unico_total_kib": sum(t["unico_kib"] for t in trabajadores),
+            "compartido_total_kib": sum(t["compartido_kib"] for t in trabajadores),
+            # What N independent processes would use versus what this pool uses
+            "rss_sin_compartir_kib": sum(t["rss_kib"] for t in trabajadores),
+            "pss_total_kib": sum(t["pss_kib"] for t in trabajadores),
+        }
+
+    def ejecutar(self, intervalo_informe: Optional[float] = None):
+        """Start, supervise until SIGTERM/SIGINT, then stop the workers."""
+        def _parar(signum, frame):
+            self._deteniendo = True
+
+        signal.signal(signal.SIGTERM, _parar)
+        signal.signal(signal.SIGINT, _parar)
+        self.iniciar()
+        try:
+            self.supervisar(intervalo_informe=intervalo_informe)
+        finally:
+            self.detener()
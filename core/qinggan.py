@@ -1,85 +1,43 @@
 # core/qinggan.py
 
-import re
 from textblob import TextBlob # type: ignore
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Union
+from core.catalogo import Catalogo, obtener_catalogo
+from core.documento import Documento, como_documento
+from core.yuyan import detectar_idioma
 
 class AnalizadorEmocional:
     """
     Enhanced emotional analyzer with multilingual support and nuanced sentiment detection.
     """
-    def __init__(self):
-        self.respuestas: Dict[str, Dict[str, Any]] = {
-            "tristeza": {
-                "es": "La tristeza es el jardín donde crece tu alma.",
-                "zh": "悲伤是灵魂生长的土壤。",
-                "en": "Sadness is the soil where the soul grows.",
-                "intensity": "high",
-                "advice": {
-                    "es": "Permite que esta emoción te enseñe lo que necesita verse.",
-                    "en": "Let this emotion reveal what needs to be seen."
-                }
-            },
-            "alegria": {
-                "es": "Tu alegría es un faro en la niebla del mundo.",
-                "zh": "快乐是迷雾中的灯塔。",
-                "en": "Your joy is a beacon in the world's mist.",
-                "intensity": "high",
-                "advice": {
-                    "es": "Comparte esta luz, pues es cuando más brilla.",
-                    "en": "Share this light, for that's when it shines brightest."
-                }
-            },
-            "serenidad": {
-                "es": "La calma contiene todo potencial.",
-                "zh": "平静蕴含无限可能。",
-                "en": "Calm contains all potential.",
-                "intensity": "medium",
-                "advice": {
-                    "es": "Este equilibrio es tu centro natural.",
-                    "en": "This balance is your natural center."
-                }
-            },
-            "confusion": {
-                "es": "La confusión precede a la claridad.",
-                "zh": "困惑是清晰的前奏。",
-                "en": "Confusion precedes clarity.",
-                "intensity": "medium",
-                "advice": {
-                    "es": "No busques respuestas; mantén la pregunta.",
-                    "en": "Seek not answers, but preserve the question."
-                }
-            },
-            "neutral": {
-                "es": "Explorar es el primer paso del saber.",
-                "zh": "探索是认知的起点。",
-                "en": "To explore is the first step of knowing.",
-                "intensity": "low",
-                "advice": {
-                    "es": "Cada momento es una puerta.",
-                    "en": "Every moment is a doorway."
-                }
-            }
-        }
+    def __init__(self, catalogo: Optional[Catalogo] = None):
+        # Response texts and triggers live in the versioned catalog under core/datos/catalogo,
+        # loaded once per process and shared by every instance
+        self.catalogo = catalogo or obtener_catalogo()
 
-        self.triggers = {
-            "tristeza": ["sad", "triste", "deprimido", "失落", "悲伤"],
-            "alegria": ["happy", "alegre", "joy", "快乐", "高兴"],
-            "serenidad": ["calm", "paz", "peace", "平静", "安宁"],
-            "confusion": ["confuso", "confused", "困惑", "不解"]
-        }
+    @property
+    def respuestas(self) -> Dict[str, Dict[str, Any]]:
+        return self.catalogo.respuestas_emocionales()
+
+    @property
+    def triggers(self) -> Dict[str, List[str]]:
+        return {nombre: list(e.disparadores) for nombre, e in self.catalogo.emociones.items() if e.disparadores}
 
-    def analizar(self, texto: str) -> Dict[str, Any]:
+    def analizar(self, texto: Union[str, Documento], idioma: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyze text for emotional content with multiple detection methods.
         Returns a dictionary with emotion, sentiment scores, triggers, and advice.
+        Takes the message's Documento (or a raw string, prepared here);
+        `idioma` overrides the detected language of a raw string.
         """
+        documento = como_documento(texto, idioma)
+        texto = documento.texto
         analysis = {
             "emotion": "neutral",
             "scores": {"polarity": 0.0, "subjectivity": 0.0},
             "detected_triggers": [],
             "text_length": len(texto),
-            "language": self._detect_language(texto)
+            "language": documento.idioma
         }
 
         try:
@@ -96,7 +54,7 @@ class AnalizadorEmocional:
                 analysis["emotion"] = "serenidad"
 
             # Method 2: Keyword triggers
-            detected = self._detect_triggers(texto)
+            detected = self._detect_triggers(documento)
             if detected:
                 analysis["emotion"], analysis["detected_triggers"] = detected
 
@@ -115,39 +73,36 @@ class AnalizadorEmocional:
         except Exception as e:
             analysis["error"] = str(e)
             analysis.update(self.respuestas["neutral"])
-            analysis["advice"] = self.respuestas["neutral"]["advice"]
+            analysis["advice"] = dict(self.respuestas["neutral"]["advice"])
 
         return analysis
 
-    def _detect_triggers(self, texto: str) -> Optional[tuple]:
-        texto_lower = texto.lower()
-        for emotion, triggers in self.triggers.items():
-            found = [t for t in triggers if t in texto_lower]
+    def _detect_triggers(self, documento: Documento) -> Optional[tuple]:
+        for emotion in self.catalogo.emociones.values():
+            found = [t for t in emotion.disparadores if t in documento.normalizado]
             if found:
-                return (emotion, found)
+                return (emotion.nombre, found)
         return None
 
     def _detect_language(self, texto: str) -> str:
-        if re.search(r'[\u4e00-\u9fff]', texto):
-            return 'zh'
-        elif re.search(r'[áéíóúñ]', texto, re.IGNORECASE):
-            return 'es'
-        return 'en'
+        return detectar_idioma(texto)
 
     def _get_contextual_advice(self, texto: str, emotion: str) -> dict:
         length = len(texto)
         base_advice = self.respuestas.get(emotion, {}).get("advice", {})
         if length > 150:
-            return {
-                "es": f"{base_advice.get('es', '')} Tu extensa reflexión merece contemplación.",
-                "en": f"{base_advice.get('en', '')} Your lengthy reflection deserves contemplation."
-            }
-        return base_advice if isinstance(base_advice, dict) else {"es": str(base_advice), "en": str(base_advice)}
+            extensa = ((idioma, self.catalogo.seccion(idioma).textos.get("reflexion_extensa"))
+                       for idioma in self.catalogo.idiomas)
+            return {idioma: f"{base_advice.get(idioma, '')} {texto}" for idioma, texto in extensa if texto}
+        # A copy: the catalog's entries are shared by every caller
+        return dict(base_advice) if isinstance(base_advice, dict) else {"es": str(base_advice), "en": str(base_advice)}
 
-    def get_emotional_spectrum(self, texto: str) -> Dict[str, float]:
-        blob = TextBlob(texto)
-        word_count = len(blob.words)
-        avg_word_length = (sum(len(word) for word in blob.words) / word_count) if word_count else 0
+    def get_emotional_spectrum(self, texto: Union[str, Documento]) -> Dict[str, float]:
+        documento = como_documento(texto)
+        blob = TextBlob(documento.texto)
+        # Word statistics from the shared tokens rather than a second tokenization
+        word_count = len(documento.tokens)
+        avg_word_length = (sum(len(word) for word in documento.tokens) / word_count) if word_count else 0
         return {
             "polarity": blob.sentiment.polarity,
             "subjectivity": blob.sentiment.subjectivity,
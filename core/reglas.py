@@ -0,0 +1,244 @@
+# core/reglas.py
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.utils.instantanea import cargar_o_construir
+
+logger = logging.getLogger(__name__)
+
+DIRECTORIO_PAQUETES = os.getenv(
+    "NUDAMU_ETICA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos", "etica")
+)
+FORMATO_PAQUETE = 1
+CLAVES_DILEMA = ("es", "zh", "en", "philosophy")
+
+
+class AutomataReglas:
+    """
+    Aho-Corasick automaton over the rule keywords.
+    A scan costs O(len(texto)) no matter how many rules are loaded; when several
+    keywords occur, the one registered first (lowest index) wins, matching the
+    old dict-order scan.
+    """
+    __slots__ = ("transiciones", "fallos", "salidas", "patrones")
+
+    def __init__(self, patrones: List[str]):
+        self.patrones = list(patrones)
+        self.transiciones: List[Dict[str, int]] = [{}]
+        self.fallos: List[int] = [0]
+        # Lowest pattern index recognised at each state, fail links included
+        self.salidas: List[int] = [-1]
+
+        for indice, patron in enumerate(self.patrones):
+            estado = 0
+            for c in patron:
+                siguiente = self.transiciones[estado].get(c)
+                if siguiente is None:
+                    siguiente = len(self.transiciones)
+                    self.transiciones[estado][c] = siguiente
+                    self.transiciones.append({})
+                    self.fallos.append(0)
+                    self.salidas.append(-1)
+                estado = siguiente
+            if patron and self.salidas[estado] == -1:
+                self.salidas[estado] = indice
+
+        cola = deque(self.transiciones[0].values())
+        while cola:
+            estado = cola.popleft()
+            for c, siguiente in self.transiciones[estado].items():
+                cola.append(siguiente)
+                fallo = self.fallos[estado]
+                while fallo and c not in self.transiciones[fallo]:
+                    fallo = self.fallos[fallo]
+                destino = self.transiciones[fallo].get(c, 0)
+                self.fallos[siguiente] = destino if destino != siguiente else 0
+                heredada = self.salidas[self.fallos[siguiente]]
+                if heredada != -1 and (self.salidas[siguiente] == -1 or heredada < self.salidas[siguiente]):
+                    self.salidas[siguiente] = heredada
+
+    def primera(self, texto: str) -> int:
+        """Index of the highest-priority pattern contained in `texto`, or -1."""
+        transiciones, fallos, salidas = self.transiciones, self.fallos, self.salidas
+        estado, mejor = 0, -1
+        for c in texto:
+            while estado and c not in transiciones[estado]:
+                estado = fallos[estado]
+            estado = transiciones[estado].get(c, 0)
+            encontrada = salidas[estado]
+            if encontrada != -1 and (mejor == -1 or encontrada < mejor):
+                mejor = encontrada
+                if mejor == 0:
+                    break
+        return mejor
+
+
+class ReglasCompiladas:
+    """
+    Immutable result of compiling a set of packs. Swapped atomically on reload,
+    so readers never need a lock.
+    """
+    __slots__ = ("dilemas", "principios", "temas", "automata", "versiones")
+
+    def __init__(self, dilemas: Dict[str, Dict[str, str]], principios: Dict[str, List[str]],
+                 versiones: Dict[str, str]):
+        self.dilemas = dilemas
+        self.principios = principios
+        self.temas = list(dilemas)
+        self.automata = AutomataReglas([t.lower() for t in self.temas])
+        self.versiones = versiones
+
+    def buscar(self, texto_lower: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        indice = self.automata.primera(texto_lower)
+        if indice == -1:
+            return None
+        tema = self.temas[indice]
+        return tema, self.dilemas[tema]
+
+
+def validar_dilema(tema: str, respuestas: Dict[str, str]):
+    if not tema or not all(key in respuestas for key in CLAVES_DILEMA):
+        raise ValueError("Responses must include all required language keys")
+
+
+def leer_paquete(ruta: str) -> Dict[str, Any]:
+    """Read and validate one JSON rule pack."""
+    with open(ruta, "r", encoding="utf-8") as f:
+        paquete = json.load(f)
+    if paquete.get("formato") != FORMATO_PAQUETE:
+        raise ValueError(f"Unsupported ethics pack format in {ruta}: {paquete.get('formato')!r}")
+    for tema, respuestas in paquete.get("dilemas", {}).items():
+        validar_dilema(tema, respuestas)
+    return paquete
+
+
+def compilar_paquetes(rutas: List[str], extra: Optional[Dict[str, Dict[str, str]]] = None) -> ReglasCompiladas:
+    """
+    Merge packs in file-name order. A later pack overrides the texts of a
+    dilemma it redefines but keeps its original priority. The merged set
+    must have English principles: evaluation falls back to them.
+    """
+    dilemas: Dict[str, Dict[str, str]] = {}
+    principios: Dict[str, List[str]] = {}
+    versiones: Dict[str, str] = {}
+    for ruta in rutas:
+        paquete = leer_paquete(ruta)
+        versiones[paquete.get("nombre", os.path.basename(ruta))] = str(paquete.get("version", "0"))
+        dilemas.update(paquete.get("dilemas", {}))
+        for idioma, frases in paquete.get("principios", {}).items():
+            principios.setdefault(idioma, []).extend(frases)
+    if not principios.get("en"):
+        raise ValueError("Ethics packs define no 'en' principles, the fallback language")
+    if extra:
+        dilemas.update(extra)
+    return ReglasCompiladas(dilemas, principios, versiones)
+
+
+class RepositorioEtico:
+    """
+    Ethics rule packs loaded from a directory of JSON files, compiled into a
+    matcher and cached as a binary snapshot. Packs hot-reload when a file is
+    added, removed or modified; the check is a directory stat throttled to
+    once every `intervalo_recarga` seconds.
+    """
+    def __init__(self, directorio: str = DIRECTORIO_PAQUETES, intervalo_recarga: float = 2.0):
+        self.directorio = directorio
+        self.intervalo_recarga = intervalo_recarga
+        self._extra: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._firma: Tuple = ()
+        self._ultima_revision = 0.0
+        self.reglas = self._compilar()
+
+    def _rutas(self) -> List[str]:
+        try:
+            nombres = sorted(n for n in os.listdir(self.directorio) if n.endswith(".json"))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.directorio, n) for n in nombres]
+
+    def _firma_actual(self, rutas: List[str]) -> Tuple:
+        firma = []
+        for ruta in rutas:
+            try:
+                st = os.stat(ruta)
+            except FileNotFoundError:
+                continue
+            firma.append((ruta, st.st_size, st.st_mtime_ns))
+        return tuple(firma)
+
+    def _compilar(self) -> ReglasCompiladas:
+        rutas = self._rutas()
+        self._firma = self._firma_actual(rutas)
+        self._ultima_revision = time.monotonic()
+        if self._extra:
+            # Runtime additions are not part of any file, so skip the snapshot
+            return compilar_paquetes(rutas, dict(self._extra))
+        return cargar_o_construir("etica", rutas, lambda: compilar_paquetes(rutas), version=FORMATO_PAQUETE)
+
+    def recargar_si_cambio(self) -> bool:
+        """Recompile when the pack files changed. Returns True if a reload happened."""
+        ahora = time.monotonic()
+        if ahora - self._ultima_revision < self.intervalo_recarga:
+            return False
+        with self._lock:
+            self._ultima_revision = ahora
+            if self._firma_actual(self._rutas()) == self._firma:
+                return False
+            try:
+                self.reglas = self._compilar()
+            except (OSError, ValueError) as e:
+                # Keep serving the previous rules if an edited pack is broken
+                logger.error("Ethics pack reload failed, keeping previous rules: %s", e)
+                return False
+        logger.info("Ethics packs reloaded: %s", self.reglas.versiones)
+        return True
+
+    def agregar(self, tema: str, respuestas: Dict[str, str], persistir: bool = False):
+        """
+        Add a dilemma for every evaluator sharing this repository. With
+        `persistir`, it is also written to the `local.json` pack so other
+        processes pick it up on their next reload.
+        """
+        validar_dilema(tema, respuestas)
+        with self._lock:
+            if persistir:
+                self._persistir(tema, respuestas)
+            else:
+                self._extra[tema] = dict(respuestas)
+            self.reglas = self._compilar()
+
+    def _persistir(self, tema: str, respuestas: Dict[str, str]):
+        ruta = os.path.join(self.directorio, "local.json")
+        try:
+            paquete = leer_paquete(ruta)
+        except FileNotFoundError:
+            paquete = {"formato": FORMATO_PAQUETE, "nombre": "local", "version": "0", "dilemas": {}}
+        paquete["dilemas"][tema] = dict(respuestas)
+        version = str(paquete.get("version", "0"))
+        paquete["version"] = str(int(version) + 1) if version.isdigit() else version
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(paquete, f, ensure_ascii=False, indent=4)
+        os.replace(temporal, ruta)
+
+
+_repositorios: Dict[str, RepositorioEtico] = {}
+_repositorios_lock = threading.Lock()
+
+
+def obtener_repositorio(directorio: str = DIRECTORIO_PAQUETES) -> RepositorioEtico:
+    """Process-wide repository per pack directory, shared by all EticaNuDaMu instances."""
+    directorio = os.path.abspath(directorio)
+    with _repositorios_lock:
+        if directorio not in _repositorios:
+            _repositorios[directorio] = RepositorioEtico(directorio)
+        return _repositorios[directorio]
@@ -0,0 +1,173 @@
+# core/servidor.py
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, List, Optional
+
+from fastapi import FastAPI, HTTPException  # type: ignore
+from fastapi.responses import PlainTextResponse  # type: ignore
+from pydantic import BaseModel, Field  # type: ignore
+
+from core.utils.azar import nuevo_rng
+
+logger = logging.getLogger(__name__)
+
+
+class Peticion(BaseModel):
+    texto: str
+    usuario_id: str = "anon"
+    semilla: Optional[int] = Field(None, description="Seed the request's RNG for reproducible output")
+
+
+class PeticionLote(BaseModel):
+    items: List[Peticion]
+
+
+class Respuesta(BaseModel):
+    respuesta: str
+    usuario_id: str
+    ms: float
+
+
+class LimiteConcurrencia:
+    """
+    Bounds CPU-bound work: at most `maximo` jobs run in the thread pool and at
+    most `cola` more wait for a slot; beyond that requests are rejected with 503
+    instead of piling up. Every job has a deadline and fails with 504 past it.
+    """
+    def __init__(self, maximo: int, cola: int, timeout_s: float):
+        self.maximo = maximo
+        self.cola = cola
+        self.timeout_s = timeout_s
+        self.pool = ThreadPoolExecutor(max_workers=maximo, thread_name_prefix="nudamu")
+        self._semaforo = asyncio.Semaphore(maximo)
+        self._esperando = 0
+
+    async def ejecutar(self, funcion: Callable[..., Any], *args) -> Any:
+        if self._esperando >= self.cola:
+            raise HTTPException(status_code=503, detail="Server busy, retry later")
+        loop = asyncio.get_running_loop()
+        limite = loop.time() + self.timeout_s
+        self._esperando += 1
+        try:
+            await asyncio.wait_for(self._semaforo.acquire(), timeout=self.timeout_s)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Timed out waiting for a worker")
+        finally:
+            self._esperando -= 1
+        futuro = loop.run_in_executor(self.pool, funcion, *args)
+        # A thread cannot be interrupted: on timeout the job finishes in the
+        # background and only then gives its slot back
+        futuro.add_done_callback(lambda _: self._semaforo.release())
+        try:
+            return await asyncio.wait_for(asyncio.shield(futuro), timeout=max(0.0, limite - loop.time()))
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Processing timed out")
+
+    def cerrar(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _crear_motor(nombre: str):
+    if nombre == "engine":
+        from core.engine import NuDaMuEngine
+        return NuDaMuEngine()
+    from core.luohe_central import LuoHeCentral
+    return LuoHeCentral()
+
+
+def _crear_memoria():
+    clave = os.getenv("NUDAMU_CRYPTO_KEY")
+    if not clave:
+        return None
+    from memoria_secure.memoria import MemoriaSagrada
+    return MemoriaSagrada(clave)
+
+
+def crear_app(motor=None, memoria=None, max_concurrencia: int = 8, max_cola: int = 64,
+              timeout_s: float = 10.0) -> FastAPI:
+    """
+    ASGI app over one warm processing engine shared by all requests.
+    `motor` is anything with `procesar(texto, usuario_id, rng)`: a LuoHeCentral
+    or NuDaMuEngine (chosen by NUDAMU_MOTOR when not given); its `calentar()`,
+    if it has one, runs at startup and must not store anything. All CPU and disk
+    work runs in a bounded thread pool so the event loop never blocks.
+    """
+    estado: dict = {"motor": motor, "memoria": memoria}
+
+    @asynccontextmanager
+    async def ciclo_de_vida(app: FastAPI):
+        if estado["motor"] is None:
+            estado["motor"] = _crear_motor(os.getenv("NUDAMU_MOTOR", "central"))
+        if estado["memoria"] is None:
+            estado["memoria"] = getattr(estado["motor"], "memoria", None) or _crear_memoria()
+        app.state.limite = LimiteConcurrencia(max_concurrencia, max_cola, timeout_s)
+        # Warm lazy state before the first real request; calentar() stores nothing
+        calentar = getattr(estado["motor"], "calentar", None)
+        if calentar is not None:
+            await app.state.limite.ejecutar(calentar)
+        logger.info("NuDaMu server ready (%s)", type(estado["motor"]).__name__)
+        yield
+        app.state.limite.cerrar()
+
+    app = FastAPI(title="NuDaMu", lifespan=ciclo_de_vida)
+
+    def _procesar(peticion: Peticion) -> Respuesta:
+        inicio = time.perf_counter()
+        rng = nuevo_rng(peticion.semilla)
+        respuesta = estado["motor"].procesar(peticion.texto, peticion.usuario_id, rng)
+        return Respuesta(respuesta=respuesta, usuario_id=peticion.usuario_id,
+                         ms=round((time.perf_counter() - inicio) * 1e3, 3))
+
+    @app.post("/procesar", response_model=Respuesta)
+    async def procesar(peticion: Peticion):
+        return await app.state.limite.ejecutar(_procesar, peticion)
+
+    @app.post("/procesar_lote", response_model=List[Respuesta])
+    async def procesar_lote(lote: PeticionLote):
+        # One pool job for the whole batch, so a large batch cannot exhaust the queue
+        return await app.state.limite.ejecutar(lambda: [_procesar(p) for p in lote.items])
+
+    @app.get("/modos")
+    async def modos():
+        from core.enrutador import registro
+        return [
+            {"modo": nombre, "descripcion": modo.descripcion, "comandos": [f"///{c}" for c in (nombre, *modo.alias)]}
+            for nombre, modo in registro.modos().items()
+        ]
+
+    @app.get("/metricas", response_class=PlainTextResponse)
+    async def metricas_prometheus():
+        from core.metricas import metricas
+        return PlainTextResponse(metricas.prometheus(), media_type="text/plain; version=0.0.4")
+
+    @app.get("/metricas.json")
+    async def metricas_json():
+        from core.metricas import metricas
+        return metricas.instantanea()
+
+    @app.get("/memoria/{usuario_id}")
+    async def memoria(usuario_id: str):
+        if estado["memoria"] is None:
+            raise HTTPException(status_code=503, detail="Secure memory not configured (NUDAMU_CRYPTO_KEY)")
+        recuerdos = await app.state.limite.ejecutar(estado["memoria"].recuperar, usuario_id)
+        return {"usuario_id": usuario_id, "recuerdos": recuerdos}
+
+    @app.get("/tendencias/{usuario_id}")
+    async def tendencias(usuario_id: str):
+        if estado["memoria"] is None:
+            raise HTTPException(status_code=503, detail="Secure memory not configured (NUDAMU_CRYPTO_KEY)")
+        return await app.state.limite.ejecutar(estado["memoria"].tendencias.tendencia, usuario_id)
+
+    @app.get("/recuerdos/{usuario_id}/similares")
+    async def similares(usuario_id: str, texto: str, k: int = 5):
+        if estado["memoria"] is None:
+            raise HTTPException(status_code=503, detail="Secure memory not configured (NUDAMU_CRYPTO_KEY)")
+        recuerdos = await app.state.limite.ejecutar(estado["memoria"].recall_similar, usuario_id, texto, k)
+        return {"usuario_id": usuario_id, "recuerdos": recuerdos}
+
+    return app
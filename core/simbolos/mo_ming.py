@@ -1,13 +1,11 @@
 # core/simbolos/mo_ming.py
 
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import random
-from functools import lru_cache
-from langdetect import detect # type: ignore
-from googletrans import Translator # type: ignore
-
-translator = Translator()
+from core.simbolos.nombres import NombreSagrado, catalogo, calcular_resonancia as _resonancia
+from core.simbolos.traduccion import obtener_traductor
+from core.utils.azar import rng_o_local
+from core.yuyan import detectar_idioma as _codigo_idioma, identificar
 
 IDIOMAS_SOPORTADOS = {
     'zh-cn': 'chino simplificado',
@@ -17,121 +15,73 @@ IDIOMAS_SOPORTADOS = {
     'en': 'inglés'
 }
 
-@lru_cache(maxsize=100)
 def detectar_idioma(texto: str) -> str:
-    try:
-        idioma = detect(texto)
-        return IDIOMAS_SOPORTADOS.get(idioma, idioma)
-    except Exception:
+    resultado = identificar(texto)
+    if not resultado.escritura:
+        # No letters of any script: digits, emoji, punctuation or nothing at all
         return "desconocido"
+    return IDIOMAS_SOPORTADOS.get(resultado.codigo, resultado.codigo)
 
-@lru_cache(maxsize=100)
 def traducir_a(texto: str, destino: str = 'zh-cn') -> str:
     try:
-        traduccion = translator.translate(texto, dest=destino)
-        return traduccion.text
+        return obtener_traductor().translate(texto, destino)
     except Exception as e:
         return f"Error de traducción: {e}"
 
-@lru_cache(maxsize=100)
-def traducir_bidireccional(texto: str) -> str:
+def traducir_muchos(textos: List[str], destino: str = 'zh-cn') -> List[str]:
+    """Batch version of traducir_a: one cache lookup and one backend call for all misses."""
     try:
-        idioma_origen = detect(texto)
-    except Exception:
-        idioma_origen = "es"
+        return obtener_traductor().translate_many(textos, destino)
+    except Exception as e:
+        return [f"Error de traducción: {e}"] * len(textos)
+
+def traducir_bidireccional(texto: str) -> str:
+    idioma_origen = _codigo_idioma(texto) if texto.strip() else "es"
     destino = 'zh-cn' if idioma_origen not in ['zh-cn', 'zh'] else 'es'
     return traducir_a(texto, destino)
 
-@dataclass
-class NombreSagrado:
-    caracter: str
-    pronunciacion: Dict[str, str]
-    resonancia: Dict[str, float]
-    elementos: List[str]
-
-# Sacred names database
-NOMBRES_SAGRADOS: Dict[str, List[Dict]] = {
-    "zh": [
-        {
-            "caracter": "道",
-            "pronunciacion": {"zh": "dào", "es": "dao", "en": "dao"},
-            "elementos": ["agua", "metal"]
-        },
-        {
-            "caracter": "天",
-            "pronunciacion": {"zh": "tiān", "es": "tian", "en": "heaven"},
-            "elementos": ["fuego", "madera"]
-        }
-    ],
-    "es": [
-        {
-            "caracter": "Verdad",
-            "pronunciacion": {"es": "ver-dad", "en": "truth"},
-            "elementos": ["fuego", "aire"]
-        }
-    ]
-}
-
-SIGNIFICADOS: Dict[str, Dict[str, str]] = {
-    "道": {
-        "zh": "自然之道，无为而治",
-        "es": "El Camino — el flujo natural del universo",
-        "en": "The Way — natural order of all things",
-        "profundidad": "Nivel 9"
-    },
-    "天": {
-        "zh": "天命不可违",
-        "es": "Cielo como orden divino",
-        "en": "Heaven's mandate",
-        "profundidad": "Nivel 7"
-    },
-    "Verdad": {
-        "es": "La verdad es la luz que disipa toda sombra.",
-        "en": "Truth is the light that dispels all shadows.",
-        "zh": "真理是驱散一切阴影的光。",
-        "profundidad": "Nivel 8"
-    }
-}
+# Sacred names database: core/simbolos/datos/nombres.tsv, indexed by core.simbolos.nombres
 
 def obtener_significado_completo(nombre: str, idioma: str = "es") -> Dict[str, str]:
-    significado = SIGNIFICADOS.get(nombre, {})
+    registro = catalogo().obtener(nombre)
+    significados = registro.significados if registro else {}
     return {
         "nombre": nombre,
-        "significado": significado.get(idioma, "Significado no disponible"),
-        "profundidad": significado.get("profundidad", "Desconocida"),
+        "significado": significados.get(idioma, "Significado no disponible"),
+        "profundidad": registro.profundidad if registro else "Desconocida",
         "elementos": obtener_elementos(nombre),
         "resonancia": calcular_resonancia(nombre)
     }
 
 def obtener_elementos(nombre: str) -> List[str]:
-    for lang in NOMBRES_SAGRADOS.values():
-        for nom in lang:
-            if nom["caracter"] == nombre:
-                return nom.get("elementos", [])
-    return []
+    registro = catalogo().obtener(nombre)
+    return list(registro.elementos) if registro else []
 
 def calcular_resonancia(nombre: str) -> Dict[str, float]:
-    random.seed(nombre)  # Para que sea reproducible por nombre
-    return {
-        "paz": round(random.uniform(0.7, 0.9), 2),
-        "claridad": round(random.uniform(0.5, 0.8), 2),
-        "poder": round(random.uniform(0.3, 0.6), 2)
-    }
+    # Precalculada al construir el índice; solo los nombres desconocidos se calculan aquí
+    registro = catalogo().obtener(nombre)
+    return dict(registro.resonancia) if registro else _resonancia(nombre)
 
 def es_nombre_sagrado(nombre: str, idioma: str = "zh") -> bool:
-    return any(nom["caracter"] == nombre for nom in NOMBRES_SAGRADOS.get(idioma, []))
+    return catalogo().en_idioma(nombre, idioma)
+
+def buscar_por_pronunciacion(pronunciacion: str) -> List[NombreSagrado]:
+    return catalogo().buscar_pronunciacion(pronunciacion)
 
-def generar_combinacion(idioma: str = "zh") -> Tuple[str, str]:
-    nombres = NOMBRES_SAGRADOS.get(idioma, [])
+def buscar_por_elemento(elemento: str) -> List[NombreSagrado]:
+    return catalogo().buscar_elemento(elemento)
+
+def generar_combinacion(idioma: str = "zh", rng: Optional[random.Random] = None) -> Tuple[str, str]:
+    nombres = catalogo().por_idioma.get(idioma, [])
     if not nombres:
         return ("", "No hay nombres en este idioma")
-    seleccion = random.choice(nombres)
-    significado = SIGNIFICADOS.get(seleccion["caracter"], {})
-    return (seleccion["caracter"], significado.get(idioma, "Significado oculto"))
+    seleccion = rng_o_local(rng).choice(nombres)
+    significados = catalogo().obtener(seleccion).significados
+    return (seleccion, significados.get(idioma, "Significado oculto"))
 
 def analizar_identidad(nombre: str) -> Dict:
     return {
         "sagrado": es_nombre_sagrado(nombre),
         "elementos": obtener_elementos(nombre),
         "significado": obtener_significado_completo(nombre)
-    }
\ No newline at end of file
+    }
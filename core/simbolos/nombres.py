@@ -0,0 +1,150 @@
+# core/simbolos/nombres.py
+
+import csv
+import logging
+import os
+import random
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from core.utils.instantanea import cargar_o_construir
+
+logger = logging.getLogger(__name__)
+
+RUTA_NOMBRES = os.getenv(
+    "NUDAMU_NOMBRES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos", "nombres.tsv")
+)
+# Bump when the in-memory layout changes so old snapshots are rebuilt
+VERSION_INDICE = 2
+COLUMNAS_SIGNIFICADO = ("zh", "es", "en")
+
+
+@dataclass(slots=True)
+class NombreSagrado:
+    caracter: str
+    pronunciacion: Dict[str, str]
+    resonancia: Dict[str, float]
+    elementos: List[str]
+    idioma: str = ""
+    profundidad: str = "Desconocida"
+    significados: Dict[str, str] = field(default_factory=dict)
+
+
+def calcular_resonancia(nombre: str) -> Dict[str, float]:
+    # Generador propio sembrado con el nombre: reproducible y sin tocar el estado global
+    rng = random.Random(nombre)
+    return {
+        "paz": round(rng.uniform(0.7, 0.9), 2),
+        "claridad": round(rng.uniform(0.5, 0.8), 2),
+        "poder": round(rng.uniform(0.3, 0.6), 2)
+    }
+
+
+def leer_tsv(ruta: str) -> Iterator[NombreSagrado]:
+    """
+    Stream names from the compact TSV catalog. Columns: caracter, idioma,
+    pronunciacion (`lang:value;...`), elementos (`a,b`), profundidad, and one
+    meaning column per language.
+    """
+    with open(ruta, "r", encoding="utf-8", newline="") as f:
+        for fila in csv.DictReader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+            caracter = fila["caracter"]
+            pronunciacion = dict(
+                par.split(":", 1) for par in (fila.get("pronunciacion") or "").split(";") if ":" in par
+            )
+            yield NombreSagrado(
+                caracter=caracter,
+                pronunciacion=pronunciacion,
+                resonancia=calcular_resonancia(caracter),
+                elementos=[e for e in (fila.get("elementos") or "").split(",") if e],
+                idioma=fila.get("idioma") or "",
+                profundidad=fila.get("profundidad") or "Desconocida",
+                significados={k: fila[k] for k in COLUMNAS_SIGNIFICADO if fila.get(k)},
+            )
+
+
+class CatalogoNombres:
+    """
+    Sacred-name catalog with hash indexes by character, language,
+    pronunciation and element. Resonance is computed once at build time,
+    so every lookup is a dict access.
+    Records are kept as flat tuples of builtins, which keeps the pickled
+    snapshot small and fast to load; `NombreSagrado` objects are built on access.
+    A character is one entry: when it appears again (say in another
+    language's rows), the first row is kept and the repeat is logged.
+    """
+    def __init__(self, nombres: Iterable[NombreSagrado]):
+        self._filas: Dict[str, tuple] = {}
+        por_idioma: Dict[str, List[str]] = {}
+        por_pronunciacion: Dict[str, List[str]] = {}
+        por_elemento: Dict[str, List[str]] = {}
+        for nombre in nombres:
+            caracter = nombre.caracter
+            if caracter in self._filas:
+                logger.warning("Duplicate sacred name %r (idioma %r) ignored; keeping the %r row",
+                               caracter, nombre.idioma, self._filas[caracter][0])
+                continue
+            self._filas[caracter] = (
+                nombre.idioma,
+                tuple(nombre.pronunciacion.items()),
+                tuple(nombre.elementos),
+                nombre.profundidad,
+                tuple(nombre.resonancia.items()),
+                tuple(nombre.significados.items()),
+            )
+            por_idioma.setdefault(nombre.idioma, []).append(caracter)
+            for valor in set(nombre.pronunciacion.values()):
+                por_pronunciacion.setdefault(valor.lower(), []).append(caracter)
+            for elemento in nombre.elementos:
+                por_elemento.setdefault(elemento, []).append(caracter)
+        self.por_idioma = {k: tuple(v) for k, v in por_idioma.items()}
+        self.por_pronunciacion = {k: tuple(v) for k, v in por_pronunciacion.items()}
+        self.por_elemento = {k: tuple(v) for k, v in por_elemento.items()}
+
+    def __len__(self) -> int:
+        return len(self._filas)
+
+    def __contains__(self, caracter: str) -> bool:
+        return caracter in self._filas
+
+    def caracteres(self) -> Iterator[str]:
+        return iter(self._filas)
+
+    def obtener(self, caracter: str) -> Optional[NombreSagrado]:
+        fila = self._filas.get(caracter)
+        if fila is None:
+            return None
+        idioma, pronunciacion, elementos, profundidad, resonancia, significados = fila
+        return NombreSagrado(caracter, dict(pronunciacion), dict(resonancia), list(elementos),
+                             idioma, profundidad, dict(significados))
+
+    def en_idioma(self, caracter: str, idioma: str) -> bool:
+        fila = self._filas.get(caracter)
+        return fila is not None and fila[0] == idioma
+
+    def buscar_pronunciacion(self, pronunciacion: str) -> List[NombreSagrado]:
+        return [self.obtener(c) for c in self.por_pronunciacion.get(pronunciacion.lower(), ())]
+
+    def buscar_elemento(self, elemento: str) -> List[NombreSagrado]:
+        return [self.obtener(c) for c in self.por_elemento.get(elemento, ())]
+
+
+def cargar_catalogo(ruta: str = RUTA_NOMBRES) -> CatalogoNombres:
+    """Load the catalog, reusing the pickled index snapshot while the TSV is unchanged."""
+    return cargar_o_construir("nombres", [ruta], lambda: CatalogoNombres(leer_tsv(ruta)), version=VERSION_INDICE)
+
+
+_catalogo: Optional[CatalogoNombres] = None
+_catalogo_lock = threading.Lock()
+
+
+def catalogo() -> CatalogoNombres:
+    """Process-wide catalog, loaded on first use."""
+    global _catalogo
+    if _catalogo is None:
+        with _catalogo_lock:
+            if _catalogo is None:
+                _catalogo = cargar_catalogo()
+    return _catalogo
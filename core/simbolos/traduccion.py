@@ -0,0 +1,296 @@
+# core/simbolos/traduccion.py
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from core.utils.instantanea import DIRECTORIO_CACHE
+
+logger = logging.getLogger(__name__)
+
+
+def idioma_base(codigo: str) -> str:
+    """'zh-cn' -> 'zh', 'ES' -> 'es'."""
+    return codigo.split("-")[0].lower()
+
+
+class BackendTraduccion(ABC):
+    """Translation backend. Implementations translate in batches."""
+    nombre = "base"
+
+    @abstractmethod
+    def translate_many(self, textos: Sequence[str], destino: str, origen: Optional[str] = None) -> List[str]:
+        """Translate every text to `destino`, preserving order."""
+
+    def translate(self, texto: str, destino: str, origen: Optional[str] = None) -> str:
+        return self.translate_many([texto], destino, origen)[0]
+
+
+class GoogleTransBackend(BackendTraduccion):
+    """Online backend through googletrans (network required)."""
+    nombre = "google"
+
+    def __init__(self):
+        from googletrans import Translator  # type: ignore
+        self.translator = Translator()
+
+    def translate_many(self, textos, destino, origen=None):
+        if not textos:
+            return []
+        resultados = self.translator.translate(list(textos), dest=destino, src=origen or "auto")
+        return [r.text for r in resultados]
+
+
+class MarianBackend(BackendTraduccion):
+    """
+    Offline backend using locally stored MarianMT models, one per language pair.
+    Models are looked up as `<directorio>/opus-mt-<origen>-<destino>` and loaded
+    on first use of each pair. Without `origen`, a batch is split by each
+    text's detected language; texts already in `destino` pass through.
+    """
+    nombre = "marian"
+
+    def __init__(self, directorio: Optional[str] = None, tamano_lote: int = 16):
+        self.directorio = directorio or os.getenv("NUDAMU_MARIAN_DIR", os.path.join(DIRECTORIO_CACHE, "marian"))
+        self.tamano_lote = tamano_lote
+        self._modelos: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _modelo(self, origen: str, destino: str):
+        par = f"{idioma_base(origen)}-{idioma_base(destino)}"
+        with self._lock:
+            if par not in self._modelos:
+                from transformers import MarianMTModel, MarianTokenizer  # type: ignore
+                ruta = os.path.join(self.directorio, f"opus-mt-{par}")
+                self._modelos[par] = (MarianTokenizer.from_pretrained(ruta), MarianMTModel.from_pretrained(ruta))
+            return self._modelos[par]
+
+    def translate_many(self, textos, destino, origen=None):
+        if not textos:
+            return []
+        grupos: Dict[str, List[int]] = {}
+        if origen is not None:
+            grupos[idioma_base(origen)] = list(range(len(textos)))
+        else:
+            # Each text goes to the model of its own language, not of the batch's first text
+            from core.yuyan import detectar_idioma
+            for i, texto in enumerate(textos):
+                grupos.setdefault(idioma_base(detectar_idioma(texto)), []).append(i)
+        salida: List[str] = list(textos)
+        for idioma, indices in grupos.items():
+            if idioma == idioma_base(destino):
+                continue  # Already in the target language: there is no model for the pair
+            traducidos = self._traducir([textos[i] for i in indices], idioma, destino)
+            for i, traducido in zip(indices, traducidos):
+                salida[i] = traducido
+        return salida
+
+    def _traducir(self, textos: List[str], origen: str, destino: str) -> List[str]:
+        tokenizer, modelo = self._modelo(origen, destino)
+        salida: List[str] = []
+        for i in range(0, len(textos), self.tamano_lote):
+            lote = tokenizer(textos[i:i + self.tamano_lote], return_tensors="pt", padding=True, truncation=True)
+            generados = modelo.generate(**lote)
+            salida.extend(tokenizer.batch_decode(generados, skip_special_tokens=True))
+        return salida
+
+
+class TablaFrasesBackend(BackendTraduccion):
+    """
+    Offline phrase table built from NuDaMu's fixed multilingual response
+    catalogs (emotions, ethics packs, sacred names). Texts outside the table
+    go to `respaldo` in one batch, or come back unchanged without one.
+    """
+    nombre = "tabla"
+
+    def __init__(self, respaldo: Optional[BackendTraduccion] = None,
+                 entradas: Optional[Iterable[Dict[str, str]]] = None):
+        self.respaldo = respaldo
+        self._entradas = entradas
+        self._tabla: Optional[Dict[str, Dict[str, str]]] = None
+        if respaldo:
+            self.nombre = f"tabla+{respaldo.nombre}"
+
+    @staticmethod
+    def entradas_catalogo() -> List[Dict[str, str]]:
+        # Imported here so the catalogs load only when the table is first used
+        from core.qinggan import AnalizadorEmocional
+        from core.daode import EticaNuDaMu
+        from core.simbolos.nombres import catalogo
+
+        entradas: List[Dict[str, str]] = []
+        for respuesta in AnalizadorEmocional().respuestas.values():
+            entradas.append(respuesta)
+            entradas.append(respuesta.get("advice", {}))
+        entradas.extend(EticaNuDaMu().dilemas.values())
+        nombres = catalogo()
+        entradas.extend(nombres.obtener(c).significados for c in nombres.caracteres())
+        return entradas
+
+    @property
+    def tabla(self) -> Dict[str, Dict[str, str]]:
+        """Source text -> {language: translation}, built on first use."""
+        if self._tabla is None:
+            tabla: Dict[str, Dict[str, str]] = {}
+            for entrada in (self._entradas if self._entradas is not None else self.entradas_catalogo()):
+                textos = {k: v for k, v in entrada.items() if k in ("es", "en", "zh") and isinstance(v, str)}
+                for texto in textos.values():
+                    tabla.setdefault(texto, {}).update(textos)
+            self._tabla = tabla
+        return self._tabla
+
+    def translate_many(self, textos, destino, origen=None):
+        destino_base = idioma_base(destino)
+        salida: List[Optional[str]] = [self.tabla.get(t, {}).get(destino_base) for t in textos]
+        faltantes = [i for i, t in enumerate(salida) if t is None]
+        if faltantes and self.respaldo:
+            traducidos = self.respaldo.translate_many([textos[i] for i in faltantes], destino, origen)
+            for i, traducido in zip(faltantes, traducidos):
+                salida[i] = traducido
+        return [t if t is not None else textos[i] for i, t in enumerate(salida)]
+
+
+class StubBackend(BackendTraduccion):
+    """
+    Local stand-in for tests and benchmarks: deterministic output, call
+    counters and an optional simulated per-batch latency. No network.
+    """
+    nombre = "stub"
+
+    def __init__(self, latencia_s: float = 0.0):
+        self.latencia_s = latencia_s
+        self.llamadas = 0
+        self.textos_traducidos = 0
+
+    def translate_many(self, textos, destino, origen=None):
+        self.llamadas += 1
+        self.textos_traducidos += len(textos)
+        if self.latencia_s:
+            time.sleep(self.latencia_s)
+        return [f"[{destino}] {t}" for t in textos]
+
+
+class CacheSQLite:
+    """
+    Persistent translation cache shared by every process on the host.
+    WAL mode lets readers proceed while another process writes; each thread
+    keeps its own connection.
+    """
+    def __init__(self, ruta: Optional[str] = None):
+        self.ruta = ruta or os.getenv("NUDAMU_TRADUCCION_CACHE", os.path.join(DIRECTORIO_CACHE, "traducciones.sqlite"))
+        os.makedirs(os.path.dirname(os.path.abspath(self.ruta)), exist_ok=True)
+        self._local = threading.local()
+        with self._conexion() as conexion:
+            conexion.execute(
+                "CREATE TABLE IF NOT EXISTS traducciones ("
+                "clave TEXT PRIMARY KEY, traduccion TEXT NOT NULL)"
+            )
+
+    def _conexion(self) -> sqlite3.Connection:
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=30)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexion = conexion
+        return conexion
+
+    @staticmethod
+    def clave(backend: str, destino: str, texto: str) -> str:
+        return hashlib.sha1(f"{backend}\x00{idioma_base(destino)}\x00{texto}".encode()).hexdigest()
+
+    def obtener_many(self, backend: str, destino: str, textos: Sequence[str]) -> Dict[str, str]:
+        claves = {self.clave(backend, destino, t): t for t in textos}
+        encontrados: Dict[str, str] = {}
+        lista = list(claves)
+        conexion = self._conexion()
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(lista), 500):
+            bloque = lista[i:i + 500]
+            filas = conexion.execute(
+                f"SELECT clave, traduccion FROM traducciones WHERE clave IN ({','.join('?' * len(bloque))})",
+                bloque
+            )
+            for clave, traduccion in filas:
+                encontrados[claves[clave]] = traduccion
+        return encontrados
+
+    def guardar_many(self, backend: str, destino: str, pares: Dict[str, str]):
+        if not pares:
+            return
+        with self._conexion() as conexion:
+            conexion.executemany(
+                "INSERT OR REPLACE INTO traducciones (clave, traduccion) VALUES (?, ?)",
+                [(self.clave(backend, destino, t), traduccion) for t, traduccion in pares.items()]
+            )
+
+
+class Traductor:
+    """Backend plus persistent cache: only cache misses reach the backend, in one batch."""
+
+    def __init__(self, backend: BackendTraduccion, cache: Optional[CacheSQLite] = None):
+        self.backend = backend
+        self.cache = cache
+        self.aciertos = 0
+        self.fallos = 0
+
+    def translate_many(self, textos: Sequence[str], destino: str, origen: Optional[str] = None) -> List[str]:
+        unicos = list(dict.fromkeys(textos))
+        conocidos = self.cache.obtener_many(self.backend.nombre, destino, unicos) if self.cache else {}
+        faltantes = [t for t in unicos if t not in conocidos]
+        self.aciertos += len(unicos) - len(faltantes)
+        self.fallos += len(faltantes)
+        if faltantes:
+            nuevos = dict(zip(faltantes, self.backend.translate_many(faltantes, destino, origen)))
+            if self.cache:
+                self.cache.guardar_many(self.backend.nombre, destino, nuevos)
+            conocidos.update(nuevos)
+        return [conocidos[t] for t in textos]
+
+    def translate(self, texto: str, destino: str, origen: Optional[str] = None) -> str:
+        return self.translate_many([texto], destino, origen)[0]
+
+    def estadisticas(self) -> Dict[str, float]:
+        total = self.aciertos + self.fallos
+        return {"aciertos": self.aciertos, "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / total, 4) if total else 0.0}
+
+
+def crear_backend(nombre: str) -> BackendTraduccion:
+    """
+    Build a backend by name: 'google' and 'marian' sit behind the offline
+    phrase table, 'tabla' is the table alone, 'stub' is the local stand-in.
+    """
+    if nombre == "google":
+        return TablaFrasesBackend(respaldo=GoogleTransBackend())
+    if nombre == "marian":
+        return TablaFrasesBackend(respaldo=MarianBackend())
+    if nombre == "tabla":
+        return TablaFrasesBackend()
+    if nombre == "stub":
+        return StubBackend()
+    raise ValueError(f"Unknown translation backend: {nombre}")
+
+
+_traductor: Optional[Traductor] = None
+_traductor_lock = threading.Lock()
+
+
+def obtener_traductor() -> Traductor:
+    """Process-wide translator configured by NUDAMU_TRADUCCION (default 'google')."""
+    global _traductor
+    with _traductor_lock:
+        if _traductor is None:
+            backend = crear_backend(os.getenv("NUDAMU_TRADUCCION", "google"))
+            try:
+                cache = CacheSQLite()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Translation cache unavailable, continuing without it: %s", e)
+                cache = None
+            _traductor = Traductor(backend, cache)
+        return _traductor
@@ -1,15 +1,81 @@
 # core/utils/animaciones.py
 
-import time
+import sys
 import random
 import textwrap
+import threading
 from enum import Enum
+from typing import Callable, Optional, Sequence, TextIO
+from core.utils.azar import rng_o_local
 
 class RitualSpeed(Enum):
     SLOW = 0.7
     MEDIUM = 0.4
     FAST = 0.2
 
+class Animacion:
+    """
+    Frames drawn by a daemon thread so the caller never waits on them.
+    `cancelar()` stops it before the next frame (e.g. when new input arrives).
+    """
+    def __init__(self, cuadros: Sequence[str], intervalo: float, dibujar: Callable[[str], None]):
+        self.cuadros = cuadros
+        self.intervalo = intervalo
+        self.dibujar = dibujar
+        self._cancelada = threading.Event()
+        self._hilo = threading.Thread(target=self._correr, name="nudamu-animacion", daemon=True)
+
+    def iniciar(self) -> "Animacion":
+        self._hilo.start()
+        return self
+
+    def _correr(self):
+        for cuadro in self.cuadros:
+            if self._cancelada.is_set():
+                return
+            self.dibujar(cuadro)
+            if self._cancelada.wait(self.intervalo):
+                return
+
+    @property
+    def activa(self) -> bool:
+        return self._hilo.is_alive()
+
+    def cancelar(self, timeout: float = 1.0):
+        self._cancelada.set()
+        if self._hilo.is_alive() and threading.current_thread() is not self._hilo:
+            self._hilo.join(timeout)
+
+    def esperar(self, timeout: Optional[float] = None):
+        self._hilo.join(timeout)
+
+
+def es_terminal(salida: Optional[TextIO] = None) -> bool:
+    salida = salida or sys.stdout
+    try:
+        return salida.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
+def html_secuencia(cuadros: Sequence[str], intervalo: float, inicio: float = 0.0, etiqueta: str = "h1") -> str:
+    """
+    Frames stacked in one cell and shown one after another by CSS keyframes;
+    the last one stays. The browser runs it, so the script never sleeps.
+    """
+    partes = []
+    for i, cuadro in enumerate(cuadros):
+        final = " forwards" if i == len(cuadros) - 1 else ""
+        partes.append(
+            f"<span style='grid-area:1/1;opacity:0;"
+            f"animation:nudamu-cuadro {intervalo}s linear {inicio + i * intervalo:.2f}s{final}'>{cuadro}</span>"
+        )
+    return (
+        "<style>@keyframes nudamu-cuadro{from,to{opacity:1}}</style>"
+        f"<{etiqueta} style='display:grid;justify-content:center'>{''.join(partes)}</{etiqueta}>"
+    )
+
+
 class ArbolAnimacion:
     """
     Animated tree growth visualization with multiple display options.
@@ -35,19 +101,29 @@ class ArbolAnimacion:
             return stage
         return None
 
-    def animate_console(self):
+    def animate_console(self, salida: Optional[TextIO] = None) -> Optional[Animacion]:
+        """
+        Grow the tree on a line reserved just above the cursor, from a
+        background thread, and return at once. Frames are drawn with ANSI
+        save/restore so a prompt printed afterwards stays intact. Skipped
+        (returns None) when output is not a terminal.
+        """
+        salida = salida or sys.stdout
+        if not es_terminal(salida):
+            return None
         self.current_stage = 0  # Reset for repeated use
-        while (frame := self.next_stage()) is not None:
-            print("\r" + frame, end="", flush=True)
-            time.sleep(self.speed)
-        print()
+        print(file=salida, flush=True)
 
-    def animate_streamlit(self, st):
-        self.current_stage = 0  # Reset for repeated use
-        placeholder = st.empty()
-        while (frame := self.next_stage()) is not None:
-            placeholder.markdown(f"<h1 style='text-align: center'>{frame}</h1>", unsafe_allow_html=True)
-            time.sleep(self.speed)
+        def dibujar(cuadro: str):
+            salida.write(f"\x1b7\x1b[1A\r\x1b[2K{cuadro}\x1b8")
+            salida.flush()
+            self.current_stage += 1
+
+        return Animacion(self.ETAPAS, self.speed, dibujar).iniciar()
+
+    def animate_streamlit(self, st, inicio: float = 0.0):
+        self.current_stage = len(self.ETAPAS)
+        st.markdown(html_secuencia(self.ETAPAS, self.speed, inicio), unsafe_allow_html=True)
 
 class RitualNuDaMu:
     """
@@ -71,24 +147,25 @@ class RitualNuDaMu:
         self.speed = speed.value
         self.arbol = ArbolAnimacion(speed)
 
-    def invocacion(self, st=None):
-        messages = random.sample(self.INVOCACIONES, 3)
+    def invocacion(self, st=None, rng: Optional[random.Random] = None) -> Optional[Animacion]:
+        """
+        Show the invocation without blocking: messages appear at once and the
+        tree grows in the background (console) or in the browser (Streamlit).
+        Returns the console animation so the caller can cancel it.
+        """
+        messages = rng_o_local(rng).sample(self.INVOCACIONES, 3)
         if st:
-            container = st.empty()
-            for msg in messages:
-                container.markdown(f"```\n{msg}\n```")
-                time.sleep(self.speed * 2)
-            self.arbol.animate_streamlit(st)
-        else:
-            print("\n" + "="*40)
-            for msg in messages:
-                print(msg)
-                time.sleep(self.speed * 2)
-            self.arbol.animate_console()
-            print("="*40 + "\n")
-
-    def despedida(self, st=None):
-        msg = random.choice(self.DESPEDIDAS)
+            st.markdown(html_secuencia(messages, self.speed * 2, etiqueta="pre"), unsafe_allow_html=True)
+            self.arbol.animate_streamlit(st, inicio=self.speed * 2 * len(messages))
+            return None
+        print("\n" + "="*40)
+        for msg in messages:
+            print(msg)
+        print("="*40)
+        return self.arbol.animate_console()
+
+    def despedida(self, st=None, rng: Optional[random.Random] = None):
+        msg = rng_o_local(rng).choice(self.DESPEDIDAS)
         if st:
             st.markdown(f"```\n{msg}\n```")
         else:
@@ -0,0 +1,25 @@
+# core/utils/azar.py
+
+import random
+import threading
+from typing import Optional
+
+_local = threading.local()
+
+
+def nuevo_rng(semilla=None) -> random.Random:
+    """Generator for one request. Pass a seed for reproducible output."""
+    return random.Random(semilla)
+
+
+def rng_o_local(rng: Optional[random.Random] = None) -> random.Random:
+    """
+    The caller's generator, or one owned by the current thread when none is given.
+    Never the module-level `random` state, so threads do not interfere.
+    """
+    if rng is not None:
+        return rng
+    propio = getattr(_local, "rng", None)
+    if propio is None:
+        propio = _local.rng = random.Random()
+    return propio
@@ -0,0 +1,63 @@
+# core/utils/flujo.py
+
+import string
+from typing import Any, Dict, Iterator
+
+from core.metricas import peticion
+
+_formateador = string.Formatter()
+
+
+def rellenar(plantilla: str, campos: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Stream `plantilla.format(**valores)` piece by piece. `campos` yields the
+    field values known so far, stage by stage; each literal and field is
+    emitted as soon as every field before it is known. `campos` is always run
+    to the end, so work in its last stage happens even if no field needs it.
+    """
+    valores: Dict[str, Any] = {}
+    for literal, campo, especificacion, conversion in _formateador.parse(plantilla):
+        while campo is not None and campo not in valores:
+            siguiente = next(campos, None)
+            if siguiente is None:
+                raise KeyError(campo)
+            valores = siguiente
+        trozo = literal
+        if campo is not None:
+            valor = _formateador.convert_field(valores[campo], conversion)
+            trozo += _formateador.format_field(valor, especificacion or "")
+        if trozo:
+            yield trozo
+    for _ in campos:
+        pass
+
+
+def recortar(trozos: Iterator[str]) -> Iterator[str]:
+    """
+    The same chunks, streamed so that joining them gives `"".join(trozos).strip()`:
+    leading whitespace is dropped and trailing whitespace held back until
+    more text follows it.
+    """
+    pendiente = ""
+    iniciado = False
+    for trozo in trozos:
+        if not iniciado:
+            trozo = trozo.lstrip()
+            if not trozo:
+                continue
+            iniciado = True
+        texto = pendiente + trozo
+        cuerpo = texto.rstrip()
+        pendiente = texto[len(cuerpo):]
+        if cuerpo:
+            yield cuerpo
+
+
+def medir_peticion(nombre: str, trozos: Iterator[str]) -> Iterator[str]:
+    """
+    The same chunks inside a `peticion(nombre)` span, which ends when the
+    stream is exhausted or closed; so a streamed request is measured like
+    a whole one (time between chunks included).
+    """
+    with peticion(nombre):
+        yield from trozos
@@ -0,0 +1,61 @@
+# core/utils/instantanea.py
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from typing import Any, Callable, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+DIRECTORIO_CACHE = os.getenv("NUDAMU_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "nudamu"))
+
+
+def firma_fuentes(fuentes: Iterable[str], version: Any = None) -> Tuple:
+    """
+    Cheap identity of a set of source files: path, size and mtime of each.
+    Any edit to a source changes the signature and invalidates the snapshot.
+    """
+    firma = []
+    for ruta in sorted(fuentes):
+        st = os.stat(ruta)
+        firma.append((os.path.abspath(ruta), st.st_size, st.st_mtime_ns))
+    return (version, tuple(firma))
+
+
+def cargar_o_construir(nombre: str, fuentes: Iterable[str], construir: Callable[[], Any],
+                       version: Any = None, directorio: str = None) -> Any:
+    """
+    Return the object built by `construir`, using a pickled snapshot on disk
+    when the source files have not changed since it was written.
+    Snapshot I/O errors never fail the caller; they only cost a rebuild.
+    """
+    fuentes = list(fuentes)
+    firma = firma_fuentes(fuentes, version)
+    directorio = directorio or DIRECTORIO_CACHE
+    # One snapshot file per distinct set of source paths
+    clave = hashlib.sha1(repr([ruta for ruta, _, _ in firma[1]]).encode()).hexdigest()[:12]
+    ruta = os.path.join(directorio, f"{nombre}-{clave}.pickle")
+
+    try:
+        with open(ruta, "rb") as f:
+            firma_guardada, objeto = pickle.load(f)
+        if firma_guardada == firma:
+            return objeto
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning("Discarding unreadable snapshot %s: %s", ruta, e)
+
+    objeto = construir()
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial snapshot
+        fd, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((firma, objeto), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+    except OSError as e:
+        logger.warning("Could not write snapshot %s: %s", ruta, e)
+    return objeto
@@ -0,0 +1,191 @@
+# core/yuyan.py
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Tuple
+
+# Unicode script ranges, checked in order during the histogram pass.
+# Each entry: (start, end, script)
+_RANGOS_ESCRITURA: Tuple[Tuple[int, int, str], ...] = (
+    (0x0041, 0x024F, "latin"),
+    (0x1E00, 0x1EFF, "latin"),
+    (0x0370, 0x03FF, "griego"),
+    (0x0400, 0x052F, "cirilico"),
+    (0x0590, 0x05FF, "hebreo"),
+    (0x0600, 0x06FF, "arabe"),
+    (0x0750, 0x077F, "arabe"),
+    (0x3040, 0x30FF, "kana"),
+    (0x3400, 0x4DBF, "han"),
+    (0x4E00, 0x9FFF, "han"),
+    (0xF900, 0xFAFF, "han"),
+    (0x1100, 0x11FF, "hangul"),
+    (0xAC00, 0xD7AF, "hangul"),
+)
+
+# A CJK ideograph carries roughly one word of content; weight it so a short
+# Chinese phrase is not outvoted by a couple of Latin words around it.
+_PESO_ESCRITURA = {"han": 3, "kana": 3, "hangul": 2}
+
+# Scripts that identify the language on their own
+_IDIOMA_POR_ESCRITURA = {
+    "han": "zh",
+    "kana": "ja",
+    "hangul": "ko",
+    "cirilico": "ru",
+    "arabe": "ar",
+    "griego": "el",
+    "hebreo": "he",
+}
+
+_MARCAS_ES = re.compile(r"[áéíóúñ¿¡]", re.IGNORECASE)
+
+# Below these the trigram profiles are not trusted on Latin text
+_MIN_PALABRAS = 2      # One word ("yes", "no") shares too many trigrams between languages
+_MARGEN_MINIMO = 0.05  # Per-trigram log-likelihood margin between the two best profiles
+_ACUERDO_MINIMO = 2 / 3  # Share of words whose own best profile is the winner
+_PALABRA = re.compile(r"[^\W\d_]+")
+
+# Seed text for the character n-gram profiles used on Latin script input
+_SEMILLAS = {
+    "es": (
+        "el que de la los las en un una por para con como pero todo esta este "
+        "es son fue ser estar hay muy mas cuando donde quien porque tambien "
+        "yo tu nosotros ellos mi su alma vida tiempo mundo camino corazon "
+        "me siento triste hoy no se que hacer con mi vida quiero hablar contigo "
+        "la verdad es que estoy cansado y necesito paz en mi corazon "
+        "cada dia es una nueva oportunidad para aprender algo de nosotros mismos "
+        "el amor y el miedo son dos caras de la misma moneda "
+        "tengo muchas preguntas sobre el sentido de la existencia "
+        "gracias por escucharme siempre me ayudas a pensar mejor "
+        "mentir es construir un laberinto sin salida para el alma "
+        "la calma contiene todo potencial y la confusion precede a la claridad "
+        "nosotros buscamos respuestas en lugares donde solo hay preguntas"
+    ),
+    "en": (
+        "the and of to in is that it for with as was on be at by this have from "
+        "not are but or they you he she we what which their there when would "
+        "i feel sad today and i do not know what to do with my life "
+        "the truth is that i am tired and i need peace in my heart "
+        "every day is a new chance to learn something about ourselves "
+        "love and fear are two sides of the same coin "
+        "i have many questions about the meaning of existence "
+        "thank you for listening you always help me think more clearly "
+        "lying constructs a labyrinth with no exit for the soul "
+        "calm contains all potential and confusion precedes clarity "
+        "we look for answers in places where there are only questions "
+        "what should i do when everything feels heavy and the world is loud"
+    ),
+}
+
+
+def _trigramas(texto: str):
+    for palabra in _PALABRA.findall(texto):
+        relleno = f" {palabra} "
+        for i in range(len(relleno) - 2):
+            yield relleno[i:i + 3]
+
+
+def _construir_perfiles() -> Dict[str, Dict[str, float]]:
+    conteos = {idioma: Counter(_trigramas(texto)) for idioma, texto in _SEMILLAS.items()}
+    vocabulario = set().union(*conteos.values())
+    perfiles = {}
+    for idioma, conteo in conteos.items():
+        total = sum(conteo.values()) + len(vocabulario)
+        # Add-one smoothing; unseen trigrams fall back to the per-profile floor
+        perfiles[idioma] = {t: math.log((conteo[t] + 1) / total) for t in vocabulario}
+        perfiles[idioma][""] = math.log(1 / total)
+    return perfiles
+
+
+_PERFILES = _construir_perfiles()
+
+
+@dataclass(frozen=True)
+class ResultadoIdioma:
+    """Language identification result for one message."""
+    codigo: str
+    escritura: str
+    confianza: float
+
+
+def _escritura_de(codigo: int) -> str:
+    for inicio, fin, escritura in _RANGOS_ESCRITURA:
+        if inicio <= codigo <= fin:
+            return escritura
+    return ""
+
+
+def histograma_escrituras(texto: str) -> Dict[str, int]:
+    """
+    Weighted count of letters per Unicode script, built in a single pass.
+    Pure ASCII input short-circuits to the Latin bucket.
+    """
+    if texto.isascii():
+        letras = sum(1 for c in texto if c.isalpha())
+        return {"latin": letras} if letras else {}
+    histograma: Dict[str, int] = {}
+    for c in texto:
+        if not c.isalpha():
+            continue
+        escritura = _escritura_de(ord(c))
+        if escritura:
+            histograma[escritura] = histograma.get(escritura, 0) + _PESO_ESCRITURA.get(escritura, 1)
+    return histograma
+
+
+def _puntuar_latin(texto: str) -> Tuple[str, float]:
+    """
+    Character trigram scoring between the Latin-script profiles. When the
+    evidence is thin (a single word, a small margin, or words that disagree,
+    as in mixed-language text) it falls back to the accent-mark heuristic:
+    Spanish only with Spanish marks, English otherwise, at confidence 0.
+    """
+    if _MARCAS_ES.search(texto):
+        return "es", 1.0
+    puntuaciones = {idioma: 0.0 for idioma in _PERFILES}
+    votos = {idioma: 0 for idioma in _PERFILES}
+    n = palabras = 0
+    for palabra in _PALABRA.findall(texto.lower()):
+        de_palabra = {idioma: 0.0 for idioma in _PERFILES}
+        for trigrama in _trigramas(palabra):
+            n += 1
+            for idioma, perfil in _PERFILES.items():
+                de_palabra[idioma] += perfil.get(trigrama, perfil[""])
+        for idioma, puntuacion in de_palabra.items():
+            puntuaciones[idioma] += puntuacion
+        votos[max(de_palabra, key=de_palabra.get)] += 1
+        palabras += 1
+    if palabras < _MIN_PALABRAS:
+        return "en", 0.0
+    orden = sorted(puntuaciones.items(), key=lambda kv: kv[1], reverse=True)
+    mejor, segundo = orden[0], orden[1]
+    # Per-trigram log-likelihood margin
+    margen = (mejor[1] - segundo[1]) / n
+    if margen < _MARGEN_MINIMO or votos[mejor[0]] < palabras * _ACUERDO_MINIMO:
+        return "en", 0.0
+    # Squashed into [0, 1)
+    return mejor[0], round(1 - math.exp(-4 * margen), 3)
+
+
+@lru_cache(maxsize=4096)
+def identificar(texto: str) -> ResultadoIdioma:
+    """
+    Identify the language of a message.
+    Script histogram first; character n-grams only when the text is Latin script.
+    """
+    histograma = histograma_escrituras(texto)
+    if not histograma:
+        return ResultadoIdioma("en", "", 0.0)
+    escritura, peso = max(histograma.items(), key=lambda kv: kv[1])
+    if escritura in _IDIOMA_POR_ESCRITURA:
+        return ResultadoIdioma(_IDIOMA_POR_ESCRITURA[escritura], escritura, round(peso / sum(histograma.values()), 3))
+    codigo, confianza = _puntuar_latin(texto)
+    return ResultadoIdioma(codigo, escritura, confianza)
+
+
+def detectar_idioma(texto: str) -> str:
+    """Return the ISO 639-1 code of the predominant language ('en' when unknown)."""
+    return identificar(texto).codigo
@@ -1,41 +1,54 @@
 #!/usr/bin/env python3
 
 import os
+import sys
+import json
+import time
+import argparse
+import itertools
 import logging
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import md5
 from datetime import datetime
+from typing import Optional, TextIO
 from dotenv import load_dotenv # type: ignore
 
+from core.bitacora import configurar as configurar_bitacora
+from core.documento import preparar
 from core.luohe_central import LuoHeCentral
 from core.utils.animaciones import RitualNuDaMu, RitualSpeed
+from core.utils.azar import nuevo_rng
+from memoria_secure.memoria import MemoriaSagrada
+from memoria_secure.reciente import MemoriaReciente
 
-# Configure logging
-logging.basicConfig(
-    filename="nudamu.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+logger = logging.getLogger("nudamu.main")
 
 # Load environment variables
 load_dotenv()
 
-# Retrieve encryption key from .env
-crypto_key = os.getenv("NUDAMU_CRYPTO_KEY")
-
-if not crypto_key:
-    raise EnvironmentError("❌ Missing NUDAMU_CRYPTO_KEY in .env file!")
-
-logging.info("✅ Loaded encryption key for secure memory.")
+def require_crypto_key() -> str:
+    """Retrieve the encryption key from .env (needed by the interactive session)."""
+    crypto_key = os.getenv("NUDAMU_CRYPTO_KEY")
+    if not crypto_key:
+        raise EnvironmentError("❌ Missing NUDAMU_CRYPTO_KEY in .env file!")
+    logger.info("✅ Loaded encryption key for secure memory.")
+    return crypto_key
 
 class NuDaMuSession:
     """
     Manages user interaction session with state tracking.
     """
-    def __init__(self):
+    def __init__(self, crypto_key: str, user_id: Optional[str] = None):
         self.central = LuoHeCentral()
         self.ritual = RitualNuDaMu(RitualSpeed.MEDIUM)
         self.interaction_count = 0
-        self.user_id = self._generate_user_id()
+        self.animacion = None
+        self.user_id = user_id or self._generate_user_id()
+        self.recientes = MemoriaReciente(MemoriaSagrada(crypto_key))
+        # Load this user's recent history while the invocation plays
+        self.recientes.precalentar([self.user_id])
 
     def _generate_user_id(self) -> str:
         """Generate a unique user ID."""
@@ -43,13 +56,15 @@ class NuDaMuSession:
 
     def run(self):
         """Run the interactive session."""
-        self.ritual.invocacion()
         print("\n🌌 Type your message (or 'exit' to quit):")
-        print("💡 Try special commands like: ///sombra, ///espejo\n")
+        print("💡 Try special commands like: ///sombra, ///espejo")
+        # The tree keeps growing above the prompt; the next input cancels it
+        self.animacion = self.ritual.invocacion()
         
         while True:
             try:
                 user_input = self._get_input()
+                self._cancel_animation()
                 if self._should_exit(user_input):
                     break
                 self.interaction_count += 1
@@ -75,25 +90,129 @@ class NuDaMuSession:
         return input_text.lower() in ["exit", "salir", "quit"]
 
     def _process_input(self, user_input: str):
-        """Process input and provide appropriate response."""
-        response = self.central.procesar(user_input, self.user_id)
-        print(f"\n🧠 NuDaMu responds:\n{response}\n")
+        """Process input and provide appropriate response, printing each section as soon as it is ready."""
+        print("\n🧠 NuDaMu responds:")
+        secciones = []
+        for seccion in self.central.procesar_stream(user_input, self.user_id):
+            print(seccion, end="", flush=True)
+            secciones.append(seccion)
+        print("\n")
+        self._recordar(user_input, "".join(secciones))
         
-        # Trigger symbolic animation periodically
+        # Trigger symbolic animation periodically, in the background
         if self.interaction_count % 3 == 0:
-            self.ritual.arbol.animate_console()
+            self.animacion = self.ritual.arbol.animate_console()
+
+    def _recordar(self, user_input: str, response: str):
+        """
+        Store the turn under its detected emotion, as the engine does, so trends,
+        the vector index and the online learner see a real label. Mode
+        commands stay in this session's buffer only.
+        """
+        if self.central._detectar_modo(user_input):
+            self.recientes.registrar(self.user_id, user_input, etiqueta="modo",
+                                     analisis={"respuesta": response}, persistir=False)
+            return
+        documento = preparar(user_input)
+        emocion = self.central.emociones.analizar(documento)
+        self.recientes.registrar(
+            self.user_id,
+            user_input,
+            etiqueta=emocion.get("emotion", "neutral"),
+            analisis={"respuesta": response, "emocion": emocion},
+            polaridad=emocion.get("scores", {}).get("polarity"),
+            documento=documento
+        )
+
+    def _cancel_animation(self):
+        """Stop a running animation so it never overlaps new output."""
+        if self.animacion is not None:
+            self.animacion.cancelar()
+            self.animacion = None
 
     def _end_session(self):
         """End the session gracefully."""
+        self._cancel_animation()
         print(f"\n📊 Session Summary:")
         print(f"- Interactions: {self.interaction_count}")
         print(f"- User ID: {self.user_id}")
         self.ritual.despedida()
 
+def run_batch(entrada: str = "-", salida: Optional[TextIO] = None, workers: int = 4,
+              formato: str = "txt", campo: str = "texto", semilla: Optional[int] = None,
+              central: Optional[LuoHeCentral] = None) -> dict:
+    """
+    Headless mode: process every message through LuoHeCentral.procesar on a
+    thread pool and write one JSON line per message, in input order, with its
+    timing. No rituals or prompts. With `semilla`, message i uses
+    random.Random(semilla + i), so regression runs are reproducible.
+    """
+    from core.corpus import RegistroInvalido, leer_registros
+
+    salida = salida or sys.stdout
+    central = central or LuoHeCentral()
+
+    def procesar(indice: int, texto) -> dict:
+        if isinstance(texto, RegistroInvalido):
+            return {"indice": indice, "linea": texto.linea, "error": texto.error, "ms": 0.0}
+        rng = nuevo_rng(semilla + indice if semilla is not None else None)
+        inicio = time.perf_counter()
+        try:
+            resultado = {"indice": indice, "entrada": texto, "respuesta": central.procesar(texto, "batch", rng)}
+        except Exception as e:
+            resultado = {"indice": indice, "entrada": texto, "error": str(e)}
+        resultado["ms"] = round((time.perf_counter() - inicio) * 1e3, 3)
+        return resultado
+
+    def escribir(resultado: dict):
+        salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+
+    inicio = time.perf_counter()
+    total = 0
+    mensajes = enumerate(leer_registros(entrada, formato, campo))
+    if workers <= 1:
+        for indice, texto in mensajes:
+            escribir(procesar(indice, texto))
+            total += 1
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nudamu-batch") as pool:
+            # Bounded window: input is read lazily and results leave in order
+            en_vuelo = deque()
+            for item in itertools.chain(mensajes, [None]):
+                if item is not None:
+                    en_vuelo.append(pool.submit(procesar, *item))
+                while en_vuelo and (item is None or len(en_vuelo) >= workers * 4):
+                    escribir(en_vuelo.popleft().result())
+                    total += 1
+    salida.flush()
+    duracion = time.perf_counter() - inicio
+    return {"procesados": total, "segundos": round(duracion, 3),
+            "mensajes_s": round(total / duracion, 1) if duracion else 0.0, "workers": workers}
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="NuDaMu interactive session, or headless batch processing")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="ENTRADA",
+                        help="Process messages from a file (default: stdin) and write JSONL to stdout")
+    parser.add_argument("-o", "--output", help="With --batch, write JSONL here instead of stdout")
+    parser.add_argument("--workers", type=int, default=4, help="With --batch, messages processed concurrently")
+    parser.add_argument("--format", choices=["txt", "jsonl", "csv"], default="txt",
+                        help="With --batch, input format: one message per line (default), JSONL or CSV")
+    parser.add_argument("--field", default="texto", help="With --batch, JSONL/CSV field holding the message")
+    parser.add_argument("--seed", type=int, help="With --batch, base seed for reproducible responses")
+    parser.add_argument("--user", help="Resume the interactive session as this user ID")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
+    args = parse_args()
+    configurar_bitacora(archivo=os.getenv("NUDAMU_LOG", "nudamu.log"))
+    if args.batch is not None:
+        with (open(args.output, "w", encoding="utf-8") if args.output else nullcontext(sys.stdout)) as out:
+            resumen = run_batch(args.batch, out, args.workers, args.format, args.field, args.seed)
+        print(json.dumps(resumen), file=sys.stderr)
+        sys.exit(0)
     try:
-        session = NuDaMuSession()
+        session = NuDaMuSession(require_crypto_key(), args.user)
         session.run()
     except Exception as e:
         print(f"Critical error: {str(e)}")
-        logging.error(f"Critical failure in NuDaMuSession: {str(e)}", exc_info=True)
\ No newline at end of file
+        logger.error("Critical failure in NuDaMuSession: %s", e, exc_info=True)
\ No newline at end of file
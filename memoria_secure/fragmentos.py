@@ -0,0 +1,302 @@
+# memoria_secure/fragmentos.py
+
+import codecs
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, locking is per process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_BLOQUE = 1 << 16
+_COLA = 64  # Bytes before a resume point fingerprinted to notice a rewritten file
+
+
+def fragmento_de(usuario_id: str, fragmentos: int) -> int:
+    """Shard holding this user's records: CRC-32 of the id, stable across processes and runs."""
+    return zlib.crc32(usuario_id.encode("utf-8")) % fragmentos
+
+
+def ruta_fragmento(base: str, indice: int, fragmentos: int) -> str:
+    """
+    File of shard `indice` out of `fragmentos` for a store named `base`.
+    A single shard is `base` itself, so unsharded stores keep their old name;
+    otherwise the shard count is part of the name (secure_memoria.003-016.json)
+    and files from two layouts never mix.
+    """
+    if fragmentos == 1:
+        return base
+    raiz, extension = os.path.splitext(base)
+    return f"{raiz}.{indice:03d}-{fragmentos:03d}{extension}"
+
+
+def distribuciones_presentes(base: str) -> List[int]:
+    """Shard counts that have at least one file on disk next to `base`."""
+    directorio = os.path.dirname(base) or "."
+    raiz, extension = os.path.splitext(os.path.basename(base))
+    presentes = {1} if os.path.exists(base) else set()
+    try:
+        nombres = os.listdir(directorio)
+    except FileNotFoundError:
+        return []
+    for nombre in nombres:
+        if not (nombre.startswith(raiz + ".") and nombre.endswith(extension)):
+            continue
+        sufijo = nombre[len(raiz) + 1:len(nombre) - len(extension)]
+        indice, _, total = sufijo.partition("-")
+        if indice.isdigit() and total.isdigit() and len(indice) == 3:
+            presentes.add(int(total))
+    return sorted(presentes)
+
+
+@contextmanager
+def bloqueo_archivo(ruta: str):
+    """
+    Exclusive lock on `ruta` across processes: flock on `<ruta>.lock`, held
+    for the block. flock conflicts between two descriptors of one process
+    too, so callers hold their own thread lock first and never nest this.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f"{ruta}.lock", "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def escritura_atomica(ruta: str, modo: str = "w"):
+    """
+    File to write `ruta`'s new content to: a unique temporary next to it,
+    put in place only if the block finishes. Readers never see a partial
+    file, and concurrent writers never share a temporary.
+    """
+    directorio = os.path.dirname(ruta) or "."
+    fd, temporal = tempfile.mkstemp(dir=directorio, prefix=os.path.basename(ruta) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, modo, **({} if "b" in modo else {"encoding": "utf-8"})) as f:
+            yield f
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def leer_registros(ruta: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the records of one store file (a JSON array of objects) without
+    loading the whole file: objects are decoded one at a time from a
+    fixed-size read buffer.
+    """
+    for registro, _ in leer_registros_desde(ruta):
+        yield registro
+
+
+def leer_registros_desde(ruta: str, desplazamiento: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """
+    Like leer_registros, starting at byte `desplazamiento` (the end of an
+    earlier record, or 0), and yielding each record with the byte offset
+    where it ends, so a later read can resume right after it.
+    """
+    if not os.path.exists(ruta):
+        return
+    decodificador = json.JSONDecoder()
+    with open(ruta, "rb") as f:
+        f.seek(desplazamiento)
+        lector = codecs.getincrementaldecoder("utf-8")()
+        bufer, posicion, fin = "", 0, False
+        abierto = desplazamiento > 0
+        while True:
+            # Skip whitespace and array punctuation between objects
+            inicio = posicion
+            while posicion < len(bufer) and (bufer[posicion].isspace() or bufer[posicion] in "[,"):
+                abierto = abierto or bufer[posicion] == "["
+                posicion += 1
+            desplazamiento += len(bufer[inicio:posicion].encode("utf-8"))
+            if posicion < len(bufer):
+                if bufer[posicion] == "]":
+                    return
+                if not abierto:
+                    raise ValueError(f"Not a JSON array: {ruta}")
+                try:
+                    registro, final = decodificador.raw_decode(bufer, posicion)
+                except ValueError:
+                    if fin:
+                        raise ValueError(f"Invalid record in store file: {ruta}")
+                else:
+                    desplazamiento += len(bufer[posicion:final].encode("utf-8"))
+                    posicion = final
+                    yield registro, desplazamiento
+                    continue
+            elif fin:
+                if abierto:
+                    raise ValueError(f"Truncated store file: {ruta}")
+                return  # Empty file
+            # The next object is incomplete: read more
+            bloque = f.read(_BLOQUE)
+            fin = not bloque
+            bufer, posicion = bufer[posicion:] + lector.decode(bloque, final=fin), 0
+
+
+def huella_cola(ruta: str, desplazamiento: int) -> Optional[str]:
+    """
+    Fingerprint of the bytes just before `desplazamiento`. A reader that
+    stopped there can resume only if the fingerprint still matches (the file
+    was appended to, not rewritten); None if the file is gone or shorter.
+    """
+    try:
+        with open(ruta, "rb") as f:
+            if os.fstat(f.fileno()).st_size < desplazamiento:
+                return None
+            f.seek(max(0, desplazamiento - _COLA))
+            return hashlib.sha256(f.read(min(_COLA, desplazamiento))).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+class EscritorArreglo:
+    """Writes a JSON array one object at a time, in the store's own layout."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self.temporal = f"{ruta}.tmp"
+        self.n = 0
+        self._f = open(self.temporal, "w", encoding="utf-8")
+        self._f.write("[")
+
+    def escribir(self, registro: Dict[str, Any]):
+        self._f.write(",\n    " if self.n else "\n    ")
+        self._f.write(json.dumps(registro, ensure_ascii=False, indent=4).replace("\n", "\n    "))
+        self.n += 1
+
+    def cerrar(self):
+        self._f.write("\n]" if self.n else "]")
+        self._f.close()
+
+    def descartar(self):
+        self._f.close()
+        os.remove(self.temporal)
+
+
+def _refragmentar_tendencias(base: str, origen: int, destino: int, conservar: bool) -> int:
+    # Trend files hold one small encrypted blob per user; they fit in memory
+    raiz, extension = os.path.splitext(base)
+    base_tendencias = f"{raiz}.tendencias{extension}"
+    usuarios: Dict[str, str] = {}
+    for i in range(origen):
+        ruta = ruta_fragmento(base_tendencias, i, origen)
+        if os.path.exists(ruta):
+            with open(ruta, "r", encoding="utf-8") as f:
+                usuarios.update(json.load(f).get("usuarios", {}))
+    if not usuarios:
+        return 0
+    repartidos: List[Dict[str, str]] = [{} for _ in range(destino)]
+    for usuario_id, cifrado in usuarios.items():
+        repartidos[fragmento_de(usuario_id, destino)][usuario_id] = cifrado
+    for i, grupo in enumerate(repartidos):
+        ruta = ruta_fragmento(base_tendencias, i, destino)
+        with open(f"{ruta}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"formato": 1, "usuarios": grupo}, f, separators=(",", ":"))
+        os.replace(f"{ruta}.tmp", ruta)
+    if not conservar:
+        nuevas = {ruta_fragmento(base_tendencias, i, destino) for i in range(destino)}
+        for i in range(origen):
+            ruta = ruta_fragmento(base_tendencias, i, origen)
+            if ruta not in nuevas and os.path.exists(ruta):
+                os.remove(ruta)
+    return len(usuarios)
+
+
+def _refragmentar_vectores(base: str, origen: int, destino: int, conservar: bool) -> int:
+    # The embedding index is one JSON line per memory, with the user id in clear
+    raiz, extension = os.path.splitext(base)
+    base_vectores = f"{raiz}.vectores{extension}l"
+    if not any(os.path.exists(ruta_fragmento(base_vectores, i, origen)) for i in range(origen)):
+        return 0
+    rutas = [ruta_fragmento(base_vectores, i, destino) for i in range(destino)]
+    salidas = [open(f"{ruta}.tmp", "w", encoding="utf-8") for ruta in rutas]
+    lineas = 0
+    try:
+        for i in range(origen):
+            ruta = ruta_fragmento(base_vectores, i, origen)
+            if not os.path.exists(ruta):
+                continue
+            with open(ruta, "r", encoding="utf-8") as f:
+                for linea in f:
+                    if linea.endswith("\n"):
+                        salidas[fragmento_de(json.loads(linea)["u"], destino)].write(linea)
+                        lineas += 1
+    finally:
+        for salida in salidas:
+            salida.close()
+    for ruta in rutas:
+        os.replace(f"{ruta}.tmp", ruta)
+    if not conservar:
+        for i in range(origen):
+            ruta = ruta_fragmento(base_vectores, i, origen)
+            if ruta not in rutas and os.path.exists(ruta):
+                os.remove(ruta)
+    return lineas
+
+
+def refragmentar(base: str, destino: int, origen: Optional[int] = None, conservar: bool = False) -> Dict[str, Any]:
+    """
+    Move a store from `origen` shards to `destino` shards, streaming record by
+    record: no shard is ever fully loaded, and ciphertexts are copied as they
+    are (no key needed). New files are written under temporary names and put in
+    place only when every record has been copied. Run it with the store
+    offline; writers of the old layout would be lost.
+    """
+    if destino < 1:
+        raise ValueError("Shard count must be at least 1")
+    if origen is None:
+        presentes = distribuciones_presentes(base)
+        if len(presentes) > 1:
+            raise ValueError(f"Several layouts on disk ({presentes}); pass the source shard count")
+        origen = presentes[0] if presentes else 1
+    if origen == destino:
+        return {"origen": origen, "destino": destino, "registros": 0, "usuarios_tendencias": 0, "vectores": 0}
+
+    escritores = [EscritorArreglo(ruta_fragmento(base, i, destino)) for i in range(destino)]
+    registros = 0
+    try:
+        for i in range(origen):
+            for registro in leer_registros(ruta_fragmento(base, i, origen)):
+                escritores[fragmento_de(registro["usuario_id"], destino)].escribir(registro)
+                registros += 1
+        for escritor in escritores:
+            escritor.cerrar()
+    except BaseException:
+        for escritor in escritores:
+            if not escritor._f.closed:
+                escritor.descartar()
+            elif os.path.exists(escritor.temporal):
+                os.remove(escritor.temporal)
+        raise
+
+    rutas_origen = [ruta_fragmento(base, i, origen) for i in range(origen)]
+    for escritor in escritores:
+        os.replace(escritor.temporal, escritor.ruta)
+    if not conservar:
+        nuevas = {e.ruta for e in escritores}
+        for ruta in rutas_origen:
+            if ruta not in nuevas and os.path.exists(ruta):
+                os.remove(ruta)
+    usuarios = _refragmentar_tendencias(base, origen, destino, conservar)
+    vectores = _refragmentar_vectores(base, origen, destino, conservar)
+    logger.info("Resharded %d records from %d to %d shards", registros, origen, destino)
+    return {"origen": origen, "destino": destino, "registros": registros, "usuarios_tendencias": usuarios,
+            "vectores": vectores}
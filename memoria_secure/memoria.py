@@ -2,22 +2,25 @@ import os
 import json
 import base64
 import logging
+import threading
+from typing import Optional
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
+from core.documento import Documento
+from core.metricas import tramo
+from memoria_secure.fragmentos import (bloqueo_archivo, distribuciones_presentes, escritura_atomica, fragmento_de,
+                                       ruta_fragmento)
+from memoria_secure.tendencias import TendenciasEmocionales
+from memoria_secure.vectorial import IndiceVectorial
 
-# Configure logging
-logging.basicConfig(
-    filename="nudamu_memory.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+logger = logging.getLogger(__name__)
 
 class MemoriaSagrada:
     """
     Secure encrypted memory storage using AES-GCM.
     Stores interactions securely and allows retrieval.
     """
-    def __init__(self, clave):
+    def __init__(self, clave, fragmentos: Optional[int] = None):
         # Permite clave como str o bytes
         if isinstance(clave, str):
             clave = clave.encode()
@@ -25,9 +28,41 @@ class MemoriaSagrada:
             raise ValueError("❌ Invalid/Missing NUDAMU_CRYPTO_KEY (needs 16/24/32 bytes)")
         self.clave = clave
         self.storage_file = "secure_memoria.json"
+        # Records are partitioned by a hash of usuario_id; one file and one lock per shard
+        self.fragmentos = fragmentos or int(os.getenv("NUDAMU_FRAGMENTOS", "1"))
+        if self.fragmentos < 1:
+            raise ValueError("❌ Shard count must be at least 1")
+        self._locks = [threading.RLock() for _ in range(self.fragmentos)]
+        self._distribucion_verificada = None
+        # Per-user emotional aggregates, kept current by guardar()
+        self.tendencias = TendenciasEmocionales(self)
+        # Embeddings of every stored message, for recall_similar()
+        self.vectores = IndiceVectorial(self)
+
+    def fragmento(self, usuario_id: str) -> int:
+        """Index of the shard that holds this user's records."""
+        return fragmento_de(usuario_id, self.fragmentos)
+
+    def archivo_fragmento(self, indice: int) -> str:
+        """File of one shard (`storage_file` itself when the store is not sharded)."""
+        if self._distribucion_verificada != self.storage_file:
+            self._verificar_distribucion()
+        return ruta_fragmento(self.storage_file, indice, self.fragmentos)
+
+    def _verificar_distribucion(self):
+        # Records written with another shard count are invisible to this layout
+        self._distribucion_verificada = self.storage_file
+        otras = [n for n in distribuciones_presentes(self.storage_file) if n != self.fragmentos]
+        if otras:
+            logger.warning("Store %s has files for %s shard(s) but is opened with %d; "
+                           "run 'nudamu.py refragmentar' to move them", self.storage_file, otras, self.fragmentos)
 
     def cifrar(self, mensaje: str) -> str:
         """Encrypts a message using AES-GCM."""
+        with tramo("memoria.cifrar"):
+            return self._cifrar(mensaje)
+
+    def _cifrar(self, mensaje: str) -> str:
         iv = os.urandom(12)  # Secure random nonce (IV)
         cipher = Cipher(algorithms.AES(self.clave), modes.GCM(iv), backend=default_backend())
         encryptor = cipher.encryptor()
@@ -43,43 +78,77 @@ class MemoriaSagrada:
 
     def descifrar(self, encrypted_json: str) -> str:
         """Decrypts an AES-GCM encrypted message."""
-        try:
-            data = json.loads(encrypted_json)
-            iv = base64.b64decode(data["iv"])
-            ciphertext = base64.b64decode(data["ciphertext"])
-            tag = base64.b64decode(data["tag"])
-
-            cipher = Cipher(algorithms.AES(self.clave), modes.GCM(iv, tag), backend=default_backend())
-            decryptor = cipher.decryptor()
+        with tramo("memoria.descifrar"):
+            return self._descifrar(encrypted_json)
 
-            return (decryptor.update(ciphertext) + decryptor.finalize()).decode()
+    def _descifrar(self, encrypted_json: str) -> str:
+        try:
+            return self.descifrar_verificado(encrypted_json).decode()
         except Exception as e:
-            logging.error(f"⚠️ Decryption failed: {e}")
+            logger.error("⚠️ Decryption failed: %s", e)
             return "❌ Decryption error!"
 
-    def guardar(self, usuario_id: str, mensaje: str, etiqueta: str):
-        """Encrypts and stores user interaction securely."""
-        encrypted_message = self.cifrar(mensaje)
-        memoria_entry = {
-            "usuario_id": usuario_id,
-            "etiqueta": etiqueta,
-            "mensaje_cifrado": encrypted_message
-        }
+    def descifrar_verificado(self, encrypted_json: str) -> bytes:
+        """Decrypts and checks the GCM tag; raises (cryptography's InvalidTag) on tampering."""
+        data = json.loads(encrypted_json)
+        iv = base64.b64decode(data["iv"])
+        ciphertext = base64.b64decode(data["ciphertext"])
+        tag = base64.b64decode(data["tag"])
 
-        # Save to file
-        self._guardar_json(memoria_entry)
+        cipher = Cipher(algorithms.AES(self.clave), modes.GCM(iv, tag), backend=default_backend())
+        decryptor = cipher.decryptor()
 
-        logging.info(f"✅ Interaction stored securely for user {usuario_id}.")
+        return decryptor.update(ciphertext) + decryptor.finalize()
+
+    def guardar(self, usuario_id: str, mensaje: str, etiqueta: str, polaridad: Optional[float] = None,
+                documento: Optional[Documento] = None):
+        """
+        Encrypts and stores user interaction securely, then updates the user's
+        emotional trend (`polaridad` is the sentiment score, if the caller has one)
+        and embeds it for recall (from `documento`, the caller's preprocessed
+        message, when given, so it is not tokenized again).
+        """
+        with tramo("memoria.guardar"):
+            encrypted_message = self.cifrar(mensaje)
+            memoria_entry = {
+                "usuario_id": usuario_id,
+                "etiqueta": etiqueta,
+                "mensaje_cifrado": encrypted_message
+            }
+
+            # Save to file
+            self._guardar_json(memoria_entry)
+
+        try:
+            self.tendencias.actualizar(usuario_id, etiqueta, polaridad)
+        except Exception as e:
+            # The interaction itself is stored; a stale trend must not fail the write
+            logger.error("Could not update emotional trend for user %s: %s", usuario_id, e)
+        try:
+            self.vectores.agregar(usuario_id, documento if documento is not None else mensaje, etiqueta)
+        except Exception as e:
+            logger.error("Could not index memory for user %s: %s", usuario_id, e)
+
+        logger.info("✅ Interaction stored securely for user %s.", usuario_id)
 
     def recuperar(self, usuario_id: str) -> list:
         """Retrieves all stored interactions for a specific user."""
-        memoria_data = self._cargar_json()
-        usuario_memoria = [entry for entry in memoria_data if entry["usuario_id"] == usuario_id]
+        with tramo("memoria.recuperar"):
+            # Only this user's shard is read
+            memoria_data = self._cargar_json(self.fragmento(usuario_id))
+            usuario_memoria = [entry for entry in memoria_data if entry["usuario_id"] == usuario_id]
+
+            return [
+                {"etiqueta": entry["etiqueta"], "mensaje": self.descifrar(entry["mensaje_cifrado"])}
+                for entry in usuario_memoria
+            ]
 
-        return [
-            {"etiqueta": entry["etiqueta"], "mensaje": self.descifrar(entry["mensaje_cifrado"])}
-            for entry in usuario_memoria
-        ]
+    def recall_similar(self, usuario_id: str, texto: str, k: int = 5) -> list:
+        """
+        The user's `k` past memories most related to `texto`, best first, from
+        the embedding index (no decryption of the whole history).
+        """
+        return self.vectores.similares(usuario_id, texto, k)
 
     def listar_recuerdos(self, usuario_id: str) -> list:
         """Alias para recuperar, para compatibilidad con otras interfaces."""
@@ -87,19 +156,27 @@ class MemoriaSagrada:
 
     def _guardar_json(self, memoria_entry):
         """
-        Saves encrypted memory data to a JSON file securely.
-        Ensures stored interactions remain encrypted and accessible.
+        Saves encrypted memory data to the JSON file of the user's shard.
+        Writers of different shards do not wait for each other; writers of
+        the same shard, in this process or another, take turns.
         """
-        memoria_data = self._cargar_json()
-        memoria_data.append(memoria_entry)
-
-        with open(self.storage_file, "w", encoding="utf-8") as f:
-            json.dump(memoria_data, f, ensure_ascii=False, indent=4)
-
-    def _cargar_json(self) -> list:
-        """Loads stored encrypted memory data from JSON file."""
-        if os.path.exists(self.storage_file):
-            with open(self.storage_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+        indice = self.fragmento(memoria_entry["usuario_id"])
+        archivo = self.archivo_fragmento(indice)
+        with self._locks[indice], bloqueo_archivo(archivo):
+            memoria_data = self._cargar_json(indice)
+            memoria_data.append(memoria_entry)
+
+            # Written aside and swapped in, so readers (and backups) never see a half-written shard
+            with tramo("memoria.escribir_json"), escritura_atomica(archivo) as f:
+                json.dump(memoria_data, f, ensure_ascii=False, indent=4)
+
+    def _cargar_json(self, fragmento: Optional[int] = None) -> list:
+        """Loads stored encrypted memory data from one shard's JSON file, or from all of them."""
+        if fragmento is None:
+            return [entry for indice in range(self.fragmentos) for entry in self._cargar_json(indice)]
+        with self._locks[fragmento]:
+            archivo = self.archivo_fragmento(fragmento)
+            if os.path.exists(archivo):
+                with tramo("memoria.cargar_json"), open(archivo, "r", encoding="utf-8") as f:
+                    return json.load(f)
         return []
-
@@ -0,0 +1,146 @@
+# memoria_secure/reciente.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from core.documento import Documento
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Interaccion:
+    mensaje: str
+    etiqueta: str
+    analisis: Optional[Dict[str, Any]] = None  # Only for interactions seen by this process
+    ts: Optional[float] = None
+
+
+class MemoriaReciente:
+    """
+    Recent interactions per user, in process memory, in front of MemoriaSagrada.
+    Each user keeps a ring buffer of the last `por_usuario` interactions; at
+    most `max_usuarios` buffers are held and the least recently used one is
+    evicted. Writes go through to the encrypted store first, so the buffer is
+    always a suffix of what is on disk. A user's history is read and
+    decrypted from disk only the first time it is needed; a load never
+    installs a buffer while a write for that user is in flight, since the
+    record may already be on disk and would then be appended twice.
+    """
+    def __init__(self, memoria, por_usuario: int = 20, max_usuarios: int = 1000):
+        self.memoria = memoria
+        self.por_usuario = por_usuario
+        self.max_usuarios = max_usuarios
+        self._buffers: "OrderedDict[str, deque]" = OrderedDict()
+        # Writes seen per user while a disk load for that user is in flight
+        self._cargando: Dict[str, int] = {}
+        # Writes per user between taking their ticket and reaching the buffer
+        self._escribiendo: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def registrar(self, usuario_id: str, mensaje: str, etiqueta: str,
+                  analisis: Optional[Dict[str, Any]] = None, persistir: bool = True,
+                  polaridad: Optional[float] = None, documento: Optional[Documento] = None):
+        """
+        Store through to MemoriaSagrada, then append to the user's buffer if it
+        is loaded. `documento` is the message already preprocessed, if any.
+        """
+        if persistir:
+            with self._lock:
+                self._escribiendo[usuario_id] = self._escribiendo.get(usuario_id, 0) + 1
+            try:
+                self.memoria.guardar(usuario_id, mensaje, etiqueta=etiqueta, polaridad=polaridad, documento=documento)
+            except BaseException:
+                with self._lock:
+                    self._cerrar_escritura(usuario_id)
+                raise
+        interaccion = Interaccion(mensaje, etiqueta, analisis, time.time())
+        with self._lock:
+            if persistir:
+                self._cerrar_escritura(usuario_id)
+            if usuario_id in self._cargando:
+                # Tells the concurrent load that its disk snapshot may be stale
+                self._cargando[usuario_id] += 1
+            buffer = self._buffers.get(usuario_id)
+            if buffer is not None:
+                buffer.append(interaccion)
+                self._buffers.move_to_end(usuario_id)
+
+    def _cerrar_escritura(self, usuario_id: str):
+        # Caller holds self._lock
+        if self._escribiendo[usuario_id] == 1:
+            del self._escribiendo[usuario_id]
+        else:
+            self._escribiendo[usuario_id] -= 1
+
+    def recientes(self, usuario_id: str, n: Optional[int] = None) -> List[Interaccion]:
+        """The user's last `n` interactions (all buffered ones by default), oldest first."""
+        with self._lock:
+            buffer = self._buffers.get(usuario_id)
+            if buffer is not None:
+                self.aciertos += 1
+                self._buffers.move_to_end(usuario_id)
+                elementos = list(buffer)
+                return elementos[-n:] if n else elementos
+            self.fallos += 1
+        elementos = list(self._cargar(usuario_id))
+        return elementos[-n:] if n else elementos
+
+    def _cargar(self, usuario_id: str) -> deque:
+        for _ in range(3):
+            with self._lock:
+                version = self._cargando.setdefault(usuario_id, 0)
+            try:
+                historia = self.memoria.recuperar(usuario_id)
+            except BaseException:
+                with self._lock:
+                    self._cargando.pop(usuario_id, None)
+                raise
+            buffer = deque((Interaccion(r["mensaje"], r["etiqueta"]) for r in historia[-self.por_usuario:]),
+                           maxlen=self.por_usuario)
+            with self._lock:
+                if usuario_id in self._buffers:
+                    self._cargando.pop(usuario_id, None)
+                    return self._buffers[usuario_id]
+                if self._cargando.get(usuario_id, 0) == version and usuario_id not in self._escribiendo:
+                    self._cargando.pop(usuario_id, None)
+                    self._buffers[usuario_id] = buffer
+                    while len(self._buffers) > self.max_usuarios:
+                        self._buffers.popitem(last=False)
+                    return buffer
+            # Someone wrote while we were reading, or is still writing; read again
+        with self._lock:
+            self._cargando.pop(usuario_id, None)
+        return buffer
+
+    def precalentar(self, usuarios: Iterable[str]) -> threading.Thread:
+        """Load these users' buffers in a background thread."""
+        def cargar_todos():
+            for usuario_id in usuarios:
+                try:
+                    self.recientes(usuario_id)
+                except Exception as e:
+                    logger.warning("Could not pre-warm recent memory for %s: %s", usuario_id, e)
+
+        hilo = threading.Thread(target=cargar_todos, name="nudamu-precalentar", daemon=True)
+        hilo.start()
+        return hilo
+
+    def olvidar(self, usuario_id: str):
+        """Drop a user's buffer (the encrypted store is untouched)."""
+        with self._lock:
+            self._buffers.pop(usuario_id, None)
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def estadisticas(self) -> Dict[str, float]:
+        total = self.aciertos + self.fallos
+        return {"usuarios": len(self._buffers), "aciertos": self.aciertos, "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / total, 4) if total else 0.0}
@@ -0,0 +1,278 @@
+# memoria_secure/respaldo.py
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Any, Dict, List, Optional
+
+from memoria_secure.fragmentos import EscritorArreglo, huella_cola, leer_registros_desde, ruta_fragmento
+
+logger = logging.getLogger(__name__)
+
+FORMATO = 1
+MANIFIESTO = "manifiesto.json"
+
+
+def _sha256_archivo(ruta: str) -> Optional[str]:
+    if not os.path.exists(ruta):
+        return None
+    resumen = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 16), b""):
+            resumen.update(bloque)
+    return resumen.hexdigest()
+
+
+def cargar_manifiesto(directorio: str) -> Dict[str, Any]:
+    """The backup directory's manifest (an empty one if nothing was backed up yet)."""
+    ruta = os.path.join(directorio, MANIFIESTO)
+    if not os.path.exists(ruta):
+        return {"formato": FORMATO, "fragmentos": None, "respaldos": [], "estado": {}}
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _escribir_manifiesto(directorio: str, manifiesto: Dict[str, Any]):
+    ruta = os.path.join(directorio, MANIFIESTO)
+    with open(f"{ruta}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+    os.replace(f"{ruta}.tmp", ruta)
+
+
+def _copiar_segmento(memoria, ruta: str, desde: int, destino: str) -> Dict[str, Any]:
+    """Copy the records of one shard after byte `desde`, each re-encrypted as one line."""
+    resumen = hashlib.sha256()
+    registros = invalidos = 0
+    fin = desde
+    with open(f"{destino}.tmp", "w", encoding="utf-8") as f:
+        for registro, fin in leer_registros_desde(ruta, desde):
+            try:
+                memoria.descifrar_verificado(registro["mensaje_cifrado"])
+            except Exception:
+                invalidos += 1
+            linea = memoria.cifrar(json.dumps(registro, ensure_ascii=False)) + "\n"
+            f.write(linea)
+            resumen.update(linea.encode("utf-8"))
+            registros += 1
+    os.replace(f"{destino}.tmp", destino)
+    return {"registros": registros, "invalidos": invalidos, "sha256": resumen.hexdigest(), "fin": fin}
+
+
+def _copiar_lineas(ruta: str, previo: Optional[Dict[str, Any]], destino: str):
+    """
+    Copy the complete lines of an append-only file after the offset of the
+    last backup (all of them if it was rewritten). Returns the copy's entry,
+    or None when there was nothing new, and the file's new state.
+    """
+    if not os.path.exists(ruta):
+        return None, None
+    desde, base = 0, True
+    if previo and huella_cola(ruta, previo["desplazamiento"]) == previo["cola"]:
+        desde, base = previo["desplazamiento"], False
+    resumen = hashlib.sha256()
+    fin = desde
+    with open(ruta, "rb") as f, open(f"{destino}.tmp", "wb") as g:
+        f.seek(desde)
+        for linea in f:
+            if not linea.endswith(b"\n"):
+                break  # Still being written; the next backup takes it
+            g.write(linea)
+            resumen.update(linea)
+            fin += len(linea)
+    estado = {"desplazamiento": fin, "cola": huella_cola(ruta, fin)}
+    if fin == desde and not (base and previo):
+        os.remove(f"{destino}.tmp")
+        return None, estado
+    os.replace(f"{destino}.tmp", destino)
+    return {"archivo": os.path.basename(destino), "base": base, "sha256": resumen.hexdigest()}, estado
+
+
+def respaldar(memoria, directorio: str) -> Dict[str, Any]:
+    """
+    Back up the store into `directorio`, copying only what changed since the
+    last backup there. Shards are append-only, so each one is read from the
+    byte where the previous backup stopped (a fingerprint of the bytes just
+    before it tells whether the shard was rewritten, e.g. resharded, in which
+    case it is copied in full). Records are streamed one at a time: every
+    record's GCM tag is checked, then the whole record, user id and label
+    included, is encrypted again as one line of a segment file. Trend files
+    are small and copied whole when they change; the embedding index is
+    already encrypted line by line and is copied from its last offset.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    manifiesto = cargar_manifiesto(directorio)
+    completo = manifiesto["fragmentos"] != memoria.fragmentos or not manifiesto["respaldos"]
+    estado = {} if completo else manifiesto["estado"]
+    identificador = f"{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{len(manifiesto['respaldos']) + 1:04d}"
+    respaldo: Dict[str, Any] = {"id": identificador, "ts": time.time(), "completo": completo,
+                                "fragmentos": memoria.fragmentos, "segmentos": [], "tendencias": [], "vectores": []}
+    nuevo_estado: Dict[str, Any] = {}
+
+    for indice in range(memoria.fragmentos):
+        ruta = memoria.archivo_fragmento(indice)
+        previo = estado.get(str(indice), {})
+        desde, base = 0, True
+        if previo.get("desplazamiento") and huella_cola(ruta, previo["desplazamiento"]) == previo["cola"]:
+            desde, base = previo["desplazamiento"], False
+        elif previo.get("desplazamiento"):
+            logger.warning("Shard %s was rewritten since the last backup; copying it in full", ruta)
+
+        if os.path.exists(ruta):
+            archivo = f"{identificador}.{indice:03d}.seg"
+            copia = _copiar_segmento(memoria, ruta, desde, os.path.join(directorio, archivo))
+            # An empty base segment still matters: it drops a rewritten shard's older segments
+            if copia["registros"] or (base and previo.get("desplazamiento")):
+                respaldo["segmentos"].append({"fragmento": indice, "archivo": archivo, "base": base,
+                                              "registros": copia["registros"], "invalidos": copia["invalidos"],
+                                              "sha256": copia["sha256"]})
+                if copia["invalidos"]:
+                    logger.warning("%d records in %s failed GCM verification; backed up as they are",
+                                   copia["invalidos"], ruta)
+            else:
+                os.remove(os.path.join(directorio, archivo))
+            total = copia["registros"] + (0 if base else previo.get("registros", 0))
+            nuevo_estado[str(indice)] = {"registros": total, "desplazamiento": copia["fin"],
+                                         "cola": huella_cola(ruta, copia["fin"])}
+
+        # Encrypted trend aggregates of this shard
+        ruta_tendencias = ruta_fragmento(memoria.tendencias.archivo, indice, memoria.fragmentos)
+        huella = _sha256_archivo(ruta_tendencias)
+        if huella is not None and huella != previo.get("tendencias"):
+            archivo = f"{identificador}.{indice:03d}.tendencias.json"
+            shutil.copyfile(ruta_tendencias, os.path.join(directorio, archivo))
+            respaldo["tendencias"].append({"fragmento": indice, "archivo": archivo,
+                                           "sha256": _sha256_archivo(os.path.join(directorio, archivo))})
+        if huella is not None:
+            nuevo_estado.setdefault(str(indice), {})["tendencias"] = huella
+
+        ruta_vectores = ruta_fragmento(memoria.vectores.archivo, indice, memoria.fragmentos)
+        copia, estado_vectores = _copiar_lineas(ruta_vectores, previo.get("vectores"), os.path.join(
+            directorio, f"{identificador}.{indice:03d}.vectores.jsonl"))
+        if copia is not None:
+            respaldo["vectores"].append(dict(copia, fragmento=indice))
+        if estado_vectores is not None:
+            nuevo_estado.setdefault(str(indice), {})["vectores"] = estado_vectores
+
+    manifiesto["respaldos"].append(respaldo)
+    manifiesto.update(fragmentos=memoria.fragmentos, estado=nuevo_estado)
+    _escribir_manifiesto(directorio, manifiesto)
+    resumen = {"id": identificador, "completo": completo,
+               "registros": sum(s["registros"] for s in respaldo["segmentos"]),
+               "segmentos": len(respaldo["segmentos"]), "tendencias": len(respaldo["tendencias"])}
+    logger.info("Backup %s: %d records in %d segments", identificador, resumen["registros"], resumen["segmentos"])
+    return resumen
+
+
+def _cadena(manifiesto: Dict[str, Any], hasta: Optional[str]) -> List[Dict[str, Any]]:
+    respaldos = manifiesto["respaldos"]
+    if not respaldos:
+        raise ValueError("No backups in this directory")
+    fin = len(respaldos) - 1
+    if hasta is not None:
+        ids = [r["id"] for r in respaldos]
+        if hasta not in ids:
+            raise ValueError(f"Unknown backup id: {hasta}")
+        fin = ids.index(hasta)
+    inicio = max(i for i in range(fin + 1) if respaldos[i]["completo"])
+    return respaldos[inicio:fin + 1]
+
+
+def restaurar(memoria, directorio: str, hasta: Optional[str] = None, forzar: bool = False) -> Dict[str, Any]:
+    """
+    Rebuild the store of `memoria` (its storage_file and shard count) from the
+    backups in `directorio`, up to backup `hasta` (default: the latest).
+    Segments are streamed line by line; each line's GCM tag and each
+    segment's checksum are verified, and the shards are put in place only
+    once all of them were rebuilt. Existing files are kept unless `forzar`.
+    The trend and embedding index files are restored alongside.
+    """
+    manifiesto = cargar_manifiesto(directorio)
+    cadena = _cadena(manifiesto, hasta)
+    fragmentos = cadena[0]["fragmentos"]
+    if fragmentos != memoria.fragmentos:
+        raise ValueError(f"Backup has {fragmentos} shard(s); open the store with fragmentos={fragmentos} "
+                         "to restore it (and reshard afterwards if needed)")
+    rutas = [memoria.archivo_fragmento(i) for i in range(fragmentos)]
+    if not forzar and any(os.path.exists(r) for r in rutas):
+        raise FileExistsError(f"Store {memoria.storage_file} already has data; pass forzar to overwrite it")
+
+    escritores: List[EscritorArreglo] = []
+    registros = invalidos = 0
+    try:
+        for indice in range(fragmentos):
+            segmentos = [s for r in cadena for s in r["segmentos"] if s["fragmento"] == indice]
+            bases = [i for i, s in enumerate(segmentos) if s["base"]]
+            segmentos = segmentos[bases[-1]:] if bases else []
+            if not segmentos:
+                continue
+            escritor = EscritorArreglo(rutas[indice])
+            escritores.append(escritor)
+            for segmento in segmentos:
+                resumen = hashlib.sha256()
+                with open(os.path.join(directorio, segmento["archivo"]), "r", encoding="utf-8") as f:
+                    for linea in f:
+                        resumen.update(linea.encode("utf-8"))
+                        # Raises InvalidTag if the backup was altered
+                        registro = json.loads(memoria.descifrar_verificado(linea.rstrip("\n")))
+                        try:
+                            memoria.descifrar_verificado(registro["mensaje_cifrado"])
+                        except Exception:
+                            invalidos += 1
+                        escritor.escribir(registro)
+                        registros += 1
+                if resumen.hexdigest() != segmento["sha256"]:
+                    raise ValueError(f"Segment {segmento['archivo']} is incomplete or altered")
+            escritor.cerrar()
+    except BaseException:
+        for escritor in escritores:
+            if not escritor._f.closed:
+                escritor._f.close()
+            if os.path.exists(escritor.temporal):
+                os.remove(escritor.temporal)
+        raise
+
+    restaurados = {e.ruta for e in escritores}
+    for escritor in escritores:
+        os.replace(escritor.temporal, escritor.ruta)
+    for ruta in rutas:
+        if ruta not in restaurados and os.path.exists(ruta):
+            os.remove(ruta)  # forzar: the backup has no records for this shard
+
+    # Latest copy of each shard's trend file
+    tendencias: Dict[int, Dict[str, Any]] = {}
+    for respaldo in cadena:
+        for copia in respaldo["tendencias"]:
+            tendencias[copia["fragmento"]] = copia
+    for indice, copia in tendencias.items():
+        origen = os.path.join(directorio, copia["archivo"])
+        if _sha256_archivo(origen) != copia["sha256"]:
+            raise ValueError(f"Trend file {copia['archivo']} is altered")
+        shutil.copyfile(origen, ruta_fragmento(memoria.tendencias.archivo, indice, fragmentos))
+
+    # Embedding index: the last full copy of each shard's file and the deltas after it
+    for indice in range(fragmentos):
+        ruta = ruta_fragmento(memoria.vectores.archivo, indice, fragmentos)
+        copias = [c for r in cadena for c in r.get("vectores", []) if c["fragmento"] == indice]
+        bases = [i for i, c in enumerate(copias) if c["base"]]
+        if not bases:
+            if os.path.exists(ruta):
+                os.remove(ruta)
+            continue
+        copias = copias[bases[-1]:]
+        for copia in copias:
+            if _sha256_archivo(os.path.join(directorio, copia["archivo"])) != copia["sha256"]:
+                raise ValueError(f"Index file {copia['archivo']} is incomplete or altered")
+        with open(f"{ruta}.tmp", "wb") as g:
+            for copia in copias:
+                with open(os.path.join(directorio, copia["archivo"]), "rb") as f:
+                    shutil.copyfileobj(f, g)
+        os.replace(f"{ruta}.tmp", ruta)
+
+    if invalidos:
+        logger.warning("%d restored records fail GCM verification (they already did in the source store)",
+                       invalidos)
+    logger.info("Restored %d records from %d backup(s) in %s", registros, len(cadena), directorio)
+    return {"hasta": cadena[-1]["id"], "respaldos": len(cadena), "registros": registros, "invalidos": invalidos}
@@ -0,0 +1,234 @@
+# memoria_secure/tendencias.py
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from core.metricas import tramo
+from memoria_secure.fragmentos import bloqueo_archivo, escritura_atomica, ruta_fragmento
+
+logger = logging.getLogger(__name__)
+
+FORMATO = 1
+HORAS = 24  # Hourly buckets kept per user
+DIAS = 30   # Daily buckets kept per user
+
+# Polarity assumed for a label when the caller has no sentiment score
+POLARIDAD_ETIQUETA = {
+    "alegria": 1.0,
+    "serenidad": 0.5,
+    "neutral": 0.0,
+    "confusion": -0.25,
+    "tristeza": -1.0,
+}
+
+
+def _nuevo_agregado() -> Dict[str, Any]:
+    # Compact keys: this is what gets encrypted and written per user
+    return {"v": FORMATO, "n": 0, "c": {}, "s": 0.0, "w": 0.0, "t": None, "h": [], "d": []}
+
+
+def _sumar_cubeta(cubetas: List[list], inicio: int, etiqueta: str, polaridad: Optional[float], maximo: int):
+    """Add one record to the bucket starting at `inicio`: [inicio, n, polarity sum, polarity n, counts]."""
+    if cubetas and cubetas[-1][0] == inicio:
+        cubeta = cubetas[-1]
+    elif not cubetas or cubetas[-1][0] < inicio:
+        cubeta = [inicio, 0, 0.0, 0, {}]
+        cubetas.append(cubeta)
+        del cubetas[:-maximo]
+    else:
+        # Late record (clock skew, replay): its bucket is older than the newest one
+        cubeta = next((c for c in cubetas if c[0] == inicio), None)
+        if cubeta is None:
+            if inicio < cubetas[0][0] and len(cubetas) >= maximo:
+                return
+            cubeta = [inicio, 0, 0.0, 0, {}]
+            cubetas.append(cubeta)
+            cubetas.sort(key=lambda c: c[0])
+            del cubetas[:-maximo]
+    cubeta[1] += 1
+    if polaridad is not None:
+        cubeta[2] += polaridad
+        cubeta[3] += 1
+    cubeta[4][etiqueta] = cubeta[4].get(etiqueta, 0) + 1
+
+
+def _leer_cubetas(cubetas: List[list], desde: int, paso_s: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "inicio": datetime.fromtimestamp(c[0] * paso_s, timezone.utc).isoformat(),
+            "total": c[1],
+            "polaridad": round(c[2] / c[3], 4) if c[3] else None,
+            "conteos": dict(c[4]),
+        }
+        for c in cubetas if c[0] >= desde
+    ]
+
+
+class _Fragmento:
+    """Encrypted aggregates of the users of one store shard, and their file."""
+
+    def __init__(self, archivo: str):
+        self.archivo = archivo
+        self.cifrados: Dict[str, str] = {}
+        self.agregados: Dict[str, Dict[str, Any]] = {}
+        self.firma = None  # (inode, mtime_ns, size) of the file when it was last read
+        self.lock = threading.RLock()
+
+    def _firma_actual(self):
+        try:
+            info = os.stat(self.archivo)
+        except FileNotFoundError:
+            return None
+        return (info.st_ino, info.st_mtime_ns, info.st_size)
+
+    def sincronizar(self):
+        # Another process (or instance) may have written the file since we read it
+        firma = self._firma_actual()
+        if firma == self.firma:
+            return
+        if firma is None:
+            self.cifrados, self.agregados = {}, {}
+        else:
+            with open(self.archivo, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+            self.cifrados, self.agregados = datos.get("usuarios", {}), {}
+        self.firma = firma
+
+    def bloqueo(self):
+        """Held from sincronizar to escribir, so writers in other processes cannot interleave."""
+        return bloqueo_archivo(self.archivo)
+
+    def escribir(self):
+        with escritura_atomica(self.archivo) as f:
+            json.dump({"formato": FORMATO, "usuarios": self.cifrados}, f, separators=(",", ":"))
+        self.firma = self._firma_actual()
+
+
+class TendenciasEmocionales:
+    """
+    Running emotional aggregates per user, updated on every MemoriaSagrada.guardar
+    so a trend never needs a scan of the history: label counts, polarity
+    averaged with exponential decay (half-life `semivida_s`), and the last 24
+    hourly and 30 daily buckets. Each user's aggregate is a small JSON document
+    encrypted with the store's key; a file per store shard maps user ids to
+    those blobs. Only the user being updated is re-encrypted, and only their
+    shard's file rewritten.
+    """
+    def __init__(self, memoria, semivida_s: float = 7 * 86400, archivo: Optional[str] = None):
+        self.memoria = memoria
+        self.semivida_s = semivida_s
+        self._archivo = archivo
+        self._fragmentos: Dict[str, _Fragmento] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def archivo(self) -> str:
+        # Follows the store, which callers may point elsewhere after construction
+        if self._archivo:
+            return self._archivo
+        return os.path.splitext(self.memoria.storage_file)[0] + ".tendencias.json"
+
+    def _fragmento(self, indice: int) -> _Fragmento:
+        archivo = ruta_fragmento(self.archivo, indice, self.memoria.fragmentos)
+        with self._lock:
+            fragmento = self._fragmentos.get(archivo)
+            if fragmento is None:
+                fragmento = self._fragmentos[archivo] = _Fragmento(archivo)
+            return fragmento
+
+    def actualizar(self, usuario_id: str, etiqueta: str, polaridad: Optional[float] = None,
+                   ts: Optional[float] = None):
+        """Fold one stored interaction into the user's aggregate and persist it."""
+        ts = time.time() if ts is None else ts
+        if polaridad is None:
+            polaridad = POLARIDAD_ETIQUETA.get(etiqueta)
+        fragmento = self._fragmento(self.memoria.fragmento(usuario_id))
+        with tramo("memoria.tendencias"), fragmento.lock, fragmento.bloqueo():
+            fragmento.sincronizar()
+            agregado = self._agregado(fragmento, usuario_id)
+            self._sumar(agregado, etiqueta, polaridad, ts)
+            fragmento.cifrados[usuario_id] = self._cifrar(agregado)
+            fragmento.escribir()
+
+    def _sumar(self, agregado: Dict[str, Any], etiqueta: str, polaridad: Optional[float], ts: float):
+        agregado["n"] += 1
+        agregado["c"][etiqueta] = agregado["c"].get(etiqueta, 0) + 1
+        if polaridad is not None:
+            # Decay the running sums to `ts`; their ratio is the decayed mean
+            previo = agregado["t"]
+            factor = 0.5 ** (max(ts - previo, 0.0) / self.semivida_s) if previo is not None else 1.0
+            agregado["s"] = agregado["s"] * factor + polaridad
+            agregado["w"] = agregado["w"] * factor + 1.0
+        agregado["t"] = ts if agregado["t"] is None else max(agregado["t"], ts)
+        _sumar_cubeta(agregado["h"], int(ts // 3600), etiqueta, polaridad, HORAS)
+        _sumar_cubeta(agregado["d"], int(ts // 86400), etiqueta, polaridad, DIAS)
+
+    def tendencia(self, usuario_id: str, ahora: Optional[float] = None) -> Dict[str, Any]:
+        """The user's trend; constant work however long their history is."""
+        ahora = time.time() if ahora is None else ahora
+        fragmento = self._fragmento(self.memoria.fragmento(usuario_id))
+        with fragmento.lock:
+            fragmento.sincronizar()
+            agregado = self._agregado(fragmento, usuario_id)
+            conteos = dict(agregado["c"])
+            return {
+                "usuario_id": usuario_id,
+                "total": agregado["n"],
+                "conteos": conteos,
+                "dominante": max(conteos, key=conteos.get) if conteos else None,
+                "polaridad": round(agregado["s"] / agregado["w"], 4) if agregado["w"] else None,
+                "ultima": (datetime.fromtimestamp(agregado["t"], timezone.utc).isoformat()
+                           if agregado["t"] is not None else None),
+                "por_hora": _leer_cubetas(agregado["h"], int(ahora // 3600) - HORAS + 1, 3600),
+                "por_dia": _leer_cubetas(agregado["d"], int(ahora // 86400) - DIAS + 1, 86400),
+            }
+
+    def reconstruir(self) -> int:
+        """
+        Rebuild every aggregate from a full scan of the store, shard by shard
+        (labels only: the store has no timestamps, so old records land in the
+        counts and polarity but in no hourly or daily bucket). For stores
+        written before this existed.
+        """
+        usuarios = registros = 0
+        for indice in range(self.memoria.fragmentos):
+            fragmento = self._fragmento(indice)
+            with fragmento.lock, fragmento.bloqueo():
+                agregados: Dict[str, Dict[str, Any]] = {}
+                for registro in self.memoria._cargar_json(indice):
+                    agregado = agregados.setdefault(registro["usuario_id"], _nuevo_agregado())
+                    etiqueta = registro.get("etiqueta", "neutral")
+                    polaridad = POLARIDAD_ETIQUETA.get(etiqueta)
+                    agregado["n"] += 1
+                    agregado["c"][etiqueta] = agregado["c"].get(etiqueta, 0) + 1
+                    if polaridad is not None:
+                        agregado["s"] += polaridad
+                        agregado["w"] += 1.0
+                    registros += 1
+                fragmento.agregados = agregados
+                fragmento.cifrados = {u: self._cifrar(a) for u, a in agregados.items()}
+                fragmento.escribir()
+                usuarios += len(agregados)
+        logger.info("Rebuilt emotional trends for %d users from %d records", usuarios, registros)
+        return usuarios
+
+    def _cifrar(self, agregado: Dict[str, Any]) -> str:
+        return self.memoria.cifrar(json.dumps(agregado, separators=(",", ":")))
+
+    def _agregado(self, fragmento: _Fragmento, usuario_id: str) -> Dict[str, Any]:
+        agregado = fragmento.agregados.get(usuario_id)
+        if agregado is None:
+            cifrado = fragmento.cifrados.get(usuario_id)
+            agregado = _nuevo_agregado()
+            if cifrado is not None:
+                try:
+                    agregado = json.loads(self.memoria.descifrar(cifrado))
+                except ValueError:
+                    logger.error("Unreadable emotional trend for user %s; starting over", usuario_id)
+            fragmento.agregados[usuario_id] = agregado
+        return agregado
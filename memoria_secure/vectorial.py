@@ -0,0 +1,219 @@
+# memoria_secure/vectorial.py
+
+import base64
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from core.documento import Documento, como_documento
+from core.metricas import tramo
+from memoria_secure.fragmentos import bloqueo_archivo, escritura_atomica, leer_registros, ruta_fragmento
+
+logger = logging.getLogger(__name__)
+
+DIMENSION = 256
+_PESO_TRIGRAMA = 0.5
+
+
+def vectorizar(texto: Union[str, Documento], dimension: int = DIMENSION) -> np.ndarray:
+    """
+    Hashed bag-of-words embedding: each word (lemma when the document has
+    them) and its character trigrams are hashed into `dimension` signed
+    buckets, and the result is L2-normalized. Trigrams let inflections of the
+    same word (triste, tristeza) land close together. No model to load, and
+    the same text gives the same vector in every process.
+    """
+    documento = como_documento(texto)
+    vector = np.zeros(dimension, dtype=np.float32)
+    for palabra in documento.lemas or documento.tokens:
+        if len(palabra) < 3:
+            continue
+        relleno = f" {palabra} "
+        rasgos = [(palabra, 1.0)] + [(relleno[i:i + 3], _PESO_TRIGRAMA) for i in range(len(relleno) - 2)]
+        for rasgo, peso in rasgos:
+            h = zlib.crc32(rasgo.encode("utf-8"))
+            vector[h % dimension] += peso if (h // dimension) & 1 else -peso
+    norma = float(np.linalg.norm(vector))
+    return vector / norma if norma else vector
+
+
+class _IndiceUsuario:
+    """One user's vectors as rows of a matrix that grows by doubling, plus what each row points to."""
+
+    def __init__(self, dimension: int):
+        self.matriz = np.zeros((8, dimension), dtype=np.float32)
+        self.n = 0
+        self.recuerdos: List[Dict[str, Any]] = []
+
+    def agregar(self, vector: np.ndarray, recuerdo: Dict[str, Any]):
+        if self.n == len(self.matriz):
+            self.matriz = np.concatenate([self.matriz, np.zeros_like(self.matriz)])
+        self.matriz[self.n] = vector
+        self.n += 1
+        self.recuerdos.append(recuerdo)
+
+
+class _Fragmento:
+    def __init__(self, archivo: str):
+        self.archivo = archivo
+        self.hasta = 0  # Bytes of the file already applied to the loaded users
+        self.inodo = None  # A new inode means the file was replaced (rebuilt, restored, resharded)
+        self.lock = threading.RLock()
+
+
+class IndiceVectorial:
+    """
+    Embedding index over the secure memory. Each guardar appends one line to
+    the user's shard file: the vector (float16) together with the message and
+    its label, encrypted with the store's key. A user's lines are decrypted
+    into an in-memory matrix the first time they are queried (at most
+    `max_usuarios` users are kept, least recently used evicted); later
+    writes, from this process or another, are applied by reading only the
+    lines appended since.
+    """
+    def __init__(self, memoria, dimension: int = DIMENSION, max_usuarios: int = 256):
+        self.memoria = memoria
+        self.dimension = dimension
+        self.max_usuarios = max_usuarios
+        self._usuarios: "OrderedDict[str, _IndiceUsuario]" = OrderedDict()
+        self._fragmentos: Dict[str, _Fragmento] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def archivo(self) -> str:
+        raiz, extension = os.path.splitext(self.memoria.storage_file)
+        return f"{raiz}.vectores{extension}l"
+
+    def _fragmento(self, indice: int) -> _Fragmento:
+        archivo = ruta_fragmento(self.archivo, indice, self.memoria.fragmentos)
+        with self._lock:
+            fragmento = self._fragmentos.get(archivo)
+            if fragmento is None:
+                fragmento = self._fragmentos[archivo] = _Fragmento(archivo)
+            return fragmento
+
+    def _linea(self, usuario_id: str, vector: np.ndarray, mensaje: str, etiqueta: str, ts: float) -> str:
+        contenido = {"v": base64.b64encode(vector.astype(np.float16).tobytes()).decode(),
+                     "m": mensaje, "e": etiqueta, "t": ts}
+        cifrado = self.memoria.cifrar(json.dumps(contenido, ensure_ascii=False))
+        return json.dumps({"u": usuario_id, "d": cifrado}, ensure_ascii=False) + "\n"
+
+    def agregar(self, usuario_id: str, mensaje: Union[str, Documento], etiqueta: str,
+                ts: Optional[float] = None):
+        """Embed one stored memory and append it to the index (and to the user's matrix if loaded)."""
+        with tramo("memoria.vectores"):
+            vector = vectorizar(mensaje, self.dimension)
+            texto = mensaje.texto if isinstance(mensaje, Documento) else mensaje
+            linea = self._linea(usuario_id, vector, texto, etiqueta, time.time() if ts is None else ts)
+            fragmento = self._fragmento(self.memoria.fragmento(usuario_id))
+            with fragmento.lock:
+                # A long line is more than one write(); other processes must not interleave theirs
+                with bloqueo_archivo(fragmento.archivo), open(fragmento.archivo, "a", encoding="utf-8") as f:
+                    f.write(linea)
+                self._sincronizar(fragmento)
+
+    def _leer(self, fragmento: _Fragmento, desde: int, hasta: Optional[int] = None):
+        """(usuario_id, encrypted payload, end offset) of each complete line in [desde, hasta)."""
+        if not os.path.exists(fragmento.archivo):
+            return
+        with open(fragmento.archivo, "rb") as f:
+            f.seek(desde)
+            posicion = desde
+            for linea in f:
+                if not linea.endswith(b"\n") or (hasta is not None and posicion >= hasta):
+                    return  # A line still being written, or past the snapshot
+                posicion += len(linea)
+                entrada = json.loads(linea)
+                yield entrada["u"], entrada["d"], posicion
+
+    def _descifrar(self, cifrado: str):
+        contenido = json.loads(self.memoria.descifrar_verificado(cifrado))
+        vector = np.frombuffer(base64.b64decode(contenido["v"]), dtype=np.float16).astype(np.float32)
+        return vector, {"mensaje": contenido["m"], "etiqueta": contenido["e"], "ts": contenido["t"]}
+
+    def _sincronizar(self, fragmento: _Fragmento):
+        try:
+            inodo = os.stat(fragmento.archivo).st_ino
+        except FileNotFoundError:
+            inodo = None
+        if inodo != fragmento.inodo:
+            if fragmento.inodo is not None:
+                with self._lock:
+                    self._usuarios.clear()
+            fragmento.inodo, fragmento.hasta = inodo, 0
+        # Apply lines appended since the last read to the users already in memory
+        for usuario_id, cifrado, fin in self._leer(fragmento, fragmento.hasta):
+            indice = self._usuarios.get(usuario_id)
+            if indice is not None:
+                indice.agregar(*self._descifrar(cifrado))
+            fragmento.hasta = fin
+
+    def _indice(self, usuario_id: str) -> _IndiceUsuario:
+        fragmento = self._fragmento(self.memoria.fragmento(usuario_id))
+        with fragmento.lock:
+            self._sincronizar(fragmento)
+            with self._lock:
+                indice = self._usuarios.get(usuario_id)
+                if indice is not None:
+                    self._usuarios.move_to_end(usuario_id)
+                    return indice
+            indice = _IndiceUsuario(self.dimension)
+            for otro, cifrado, _ in self._leer(fragmento, 0, fragmento.hasta):
+                if otro == usuario_id:
+                    indice.agregar(*self._descifrar(cifrado))
+            with self._lock:
+                self._usuarios[usuario_id] = indice
+                while len(self._usuarios) > self.max_usuarios:
+                    self._usuarios.popitem(last=False)
+            return indice
+
+    def similares(self, usuario_id: str, texto: Union[str, Documento], k: int = 5,
+                  minimo: float = 0.0) -> List[Dict[str, Any]]:
+        """The user's `k` stored memories closest to `texto` (cosine similarity), best first."""
+        with tramo("memoria.similares"):
+            consulta = vectorizar(texto, self.dimension)
+            indice = self._indice(usuario_id)
+            fragmento = self._fragmento(self.memoria.fragmento(usuario_id))
+            with fragmento.lock:
+                puntuaciones = indice.matriz[:indice.n] @ consulta
+                recuerdos = indice.recuerdos
+            if not len(puntuaciones) or k <= 0:
+                return []
+            k = min(k, len(puntuaciones))
+            mejores = np.argpartition(-puntuaciones, k - 1)[:k]
+            mejores = mejores[np.argsort(-puntuaciones[mejores], kind="stable")]
+            return [dict(recuerdos[i], similitud=round(float(puntuaciones[i]), 4))
+                    for i in mejores if puntuaciones[i] > minimo]
+
+    def olvidar(self, usuario_id: str):
+        """Drop a user's matrix from memory (the index file is untouched)."""
+        with self._lock:
+            self._usuarios.pop(usuario_id, None)
+
+    def reconstruir(self) -> int:
+        """
+        Rebuild the index files from the store, streaming each shard (for
+        stores written before the index existed). Decrypts every message once.
+        """
+        total = 0
+        for indice in range(self.memoria.fragmentos):
+            fragmento = self._fragmento(indice)
+            with fragmento.lock, bloqueo_archivo(fragmento.archivo):
+                with escritura_atomica(fragmento.archivo) as f:
+                    for registro in leer_registros(self.memoria.archivo_fragmento(indice)):
+                        mensaje = self.memoria.descifrar(registro["mensaje_cifrado"])
+                        vector = vectorizar(mensaje, self.dimension)
+                        f.write(self._linea(registro["usuario_id"], vector, mensaje, registro["etiqueta"], 0.0))
+                        total += 1
+                fragmento.inodo, fragmento.hasta = None, 0
+        with self._lock:
+            self._usuarios.clear()
+        logger.info("Rebuilt the memory vector index: %d memories", total)
+        return total
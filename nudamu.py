@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+NuDaMu command-line tools.
+
+    python nudamu.py analyze mensajes.jsonl -o resultados.jsonl --workers 4
+    python nudamu.py serve --port 8000
+    python nudamu.py serve --port 8000 --prefork 4
+    python nudamu.py doctor --profile --salida perfil.json
+    python nudamu.py refragmentar --fragmentos 16
+    python nudamu.py respaldar /copias/nudamu
+    python nudamu.py restaurar /copias/nudamu --hasta 20261019T120000Z-0003
+    python nudamu.py entrenar --intervalo 300
+"""
+
+import argparse
+import json
+import sys
+import time
+
+
+def _cmd_analyze(args) -> int:
+    from core.corpus import analizar_corpus
+    resumen = analizar_corpus(
+        args.entrada,
+        args.salida,
+        workers=args.workers,
+        formato_entrada=args.formato_entrada,
+        formato_salida=args.formato_salida,
+        campo=args.campo,
+        tamano_lote=args.lote,
+        reanudar=args.reanudar,
+        limite=args.limite,
+    )
+    print(json.dumps(resumen), file=sys.stderr)
+    return 0
+
+
+def _cmd_serve(args) -> int:
+    import uvicorn  # type: ignore
+    from core.servidor import crear_app
+    if not args.prefork:
+        app = crear_app(max_concurrencia=args.concurrencia, max_cola=args.cola, timeout_s=args.timeout)
+        uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+        return 0
+
+    import os
+    import socket
+    from core.prefork import Prefork
+    if os.getenv("NUDAMU_ENTRENAR_S"):
+        # One trainer per worker would race on the checkpoint; the master's thread would not survive fork
+        print("NUDAMU_ENTRENAR_S is not supported with --prefork; run 'nudamu.py entrenar' "
+              "as a separate process instead", file=sys.stderr)
+        return 2
+    from core.servidor import _crear_motor
+
+    def inicializar():
+        # Models load here, once; workers inherit them copy-on-write
+        motor = _crear_motor(os.getenv("NUDAMU_MOTOR", "central"))
+        app = crear_app(motor, max_concurrencia=args.concurrencia, max_cola=args.cola, timeout_s=args.timeout)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((args.host, args.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return app, sock
+
+    def trabajo(estado, indice):
+        app, sock = estado
+        uvicorn.Server(uvicorn.Config(app, log_level="info")).run(sockets=[sock])
+
+    Prefork(inicializar, trabajo, workers=args.prefork).ejecutar(intervalo_informe=args.informe_memoria)
+    return 0
+
+
+def _cmd_doctor(args) -> int:
+    from benchmarks.comun import imprimir_tabla
+    from core import doctor
+    if not args.profile:
+        imprimir_tabla(doctor.verificar_dependencias())
+        return 0
+
+    mediciones = doctor.perfilar(args.solo, tracemalloc=not args.sin_tracemalloc, timeout_s=args.timeout)
+    informe = doctor.informe(mediciones)
+    imprimir_tabla([
+        {"componente": c["nombre"], "estado": c["estado"], "segundos": c["segundos"],
+         "rss_delta_mib": c["rss_delta_mib"], "pico_tracemalloc_mib": c["pico_tracemalloc_mib"] or "-",
+         "detalle": c["error"] or c["descripcion"]}
+        for c in informe["componentes"]
+    ])
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    if not args.comparar:
+        return 0
+    with open(args.comparar, "r", encoding="utf-8") as f:
+        anterior = json.load(f)
+    filas = doctor.comparar_informes(informe, anterior, umbral=args.umbral)
+    print()
+    imprimir_tabla(filas)
+    return 1 if any(f["regresion"] for f in filas) else 0
+
+
+def _cmd_refragmentar(args) -> int:
+    from memoria_secure.fragmentos import refragmentar
+    resumen = refragmentar(args.archivo, args.fragmentos, origen=args.desde, conservar=args.conservar)
+    print(json.dumps(resumen), file=sys.stderr)
+    if resumen["origen"] != resumen["destino"]:
+        print(f"Set NUDAMU_FRAGMENTOS={resumen['destino']} before starting NuDaMu again.", file=sys.stderr)
+    return 0
+
+
+def _memoria_desde_entorno(archivo: str):
+    import os
+    from dotenv import load_dotenv  # type: ignore
+    from memoria_secure.memoria import MemoriaSagrada
+    load_dotenv()
+    clave = os.getenv("NUDAMU_CRYPTO_KEY")
+    if not clave:
+        raise SystemExit("❌ NUDAMU_CRYPTO_KEY is required for commands that open the secure memory")
+    memoria = MemoriaSagrada(clave)
+    memoria.storage_file = archivo
+    return memoria
+
+
+def _cmd_respaldar(args) -> int:
+    from memoria_secure.respaldo import respaldar
+    print(json.dumps(respaldar(_memoria_desde_entorno(args.archivo), args.destino)), file=sys.stderr)
+    return 0
+
+
+def _cmd_restaurar(args) -> int:
+    from memoria_secure.respaldo import restaurar
+    resumen = restaurar(_memoria_desde_entorno(args.archivo), args.origen, hasta=args.hasta, forzar=args.forzar)
+    print(json.dumps(resumen), file=sys.stderr)
+    return 0
+
+
+def _cmd_entrenar(args) -> int:
+    from core.aprendizaje import EntrenadorEnLinea
+    entrenador = EntrenadorEnLinea(_memoria_desde_entorno(args.archivo), tamano_lote=args.lote)
+    if not args.intervalo:
+        print(json.dumps({"aprendidos": entrenador.paso()}), file=sys.stderr)
+        return 0
+    # Serving engines pick up each new checkpoint on their own
+    entrenador.iniciar(args.intervalo)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        entrenador.detener()
+    return 0
+
+
+def construir_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="nudamu", description="NuDaMu command-line tools")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    analyze = sub.add_parser("analyze", help="Analyze a JSONL/CSV corpus with LuoHeCentral.analisis_completo")
+    analyze.add_argument("entrada", help="Input JSONL or CSV file ('-' for stdin)")
+    analyze.add_argument("-o", "--salida", required=True, help="Output .jsonl file or .parquet directory")
+    analyze.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1, in-process)")
+    analyze.add_argument("--formato-entrada", choices=["jsonl", "csv"], help="Default: from the file extension")
+    analyze.add_argument("--formato-salida", choices=["jsonl", "parquet"], help="Default: from the output name")
+    analyze.add_argument("--campo", default="texto", help="Field/column holding the message text")
+    analyze.add_argument("--lote", type=int, default=64, help="Records per batch sent to a worker")
+    analyze.add_argument("--reanudar", action="store_true", help="Resume from the output checkpoint")
+    analyze.add_argument("--limite", type=int, help="Stop after this many records")
+    analyze.set_defaults(func=_cmd_analyze)
+
+    serve = sub.add_parser("serve", help="Serve the engine over HTTP (ASGI)")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--concurrencia", type=int, default=8, help="Requests processed at once")
+    serve.add_argument("--cola", type=int, default=64, help="Requests allowed to wait before 503")
+    serve.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    serve.add_argument("--prefork", type=int, default=0,
+                       help="Fork this many worker processes sharing models loaded once (default: single process)")
+    serve.add_argument("--informe-memoria", type=float, metavar="SEGUNDOS",
+                       help="With --prefork, log per-worker unique/shared memory at this interval")
+    serve.set_defaults(func=_cmd_serve)
+
+    doctor = sub.add_parser("doctor", help="Check optional dependencies; --profile measures startup cost")
+    doctor.add_argument("--profile", action="store_true",
+                        help="Import and initialize each component in isolation: time, RSS, tracemalloc peak")
+    doctor.add_argument("--solo", nargs="+", metavar="COMPONENTE", help="Profile only these components")
+    doctor.add_argument("--sin-tracemalloc", action="store_true", help="Skip the traced run (faster)")
+    doctor.add_argument("--timeout", type=float, default=600.0, help="Per-component time limit in seconds")
+    doctor.add_argument("--salida", help="Write the JSON report here")
+    doctor.add_argument("--comparar", metavar="INFORME", help="Earlier JSON report; exit 1 on startup regressions")
+    doctor.add_argument("--umbral", type=float, default=0.25, help="Relative growth counted as a regression")
+    doctor.set_defaults(func=_cmd_doctor)
+
+    refragmentar = sub.add_parser("refragmentar", help="Move the secure memory store to another shard count (offline)")
+    refragmentar.add_argument("--fragmentos", type=int, required=True, help="Target shard count (1 = single file)")
+    refragmentar.add_argument("--desde", type=int, help="Current shard count (default: detected from the files)")
+    refragmentar.add_argument("--archivo", default="secure_memoria.json", help="Store base file name")
+    refragmentar.add_argument("--conservar", action="store_true", help="Keep the old layout's files")
+    refragmentar.set_defaults(func=_cmd_refragmentar)
+
+    respaldar = sub.add_parser("respaldar", help="Incremental encrypted backup of the secure memory into a directory")
+    respaldar.add_argument("destino", help="Backup directory (created if missing)")
+    respaldar.add_argument("--archivo", default="secure_memoria.json", help="Store base file name")
+    respaldar.set_defaults(func=_cmd_respaldar)
+
+    restaurar = sub.add_parser("restaurar", help="Rebuild the secure memory from a backup directory")
+    restaurar.add_argument("origen", help="Backup directory")
+    restaurar.add_argument("--archivo", default="secure_memoria.json", help="Store base file name to write")
+    restaurar.add_argument("--hasta", metavar="ID", help="Restore up to this backup (default: the latest)")
+    restaurar.add_argument("--forzar", action="store_true", help="Overwrite an existing store")
+    restaurar.set_defaults(func=_cmd_restaurar)
+
+    entrenar = sub.add_parser("entrenar", help="Train the sentiment model online from new stored interactions")
+    entrenar.add_argument("--archivo", default="secure_memoria.json", help="Store base file name")
+    entrenar.add_argument("--lote", type=int, default=256, help="Examples per partial_fit mini-batch")
+    entrenar.add_argument("--intervalo", type=float, metavar="SEGUNDOS",
+                          help="Keep running, one pass every SEGUNDOS (default: a single pass)")
+    entrenar.set_defaults(func=_cmd_entrenar)
+    return parser
+
+
+def main(argv=None) -> int:
+    from core.bitacora import configurar
+    args = construir_parser().parse_args(argv)
+    configurar(consola=True)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,11 +11,14 @@ st.set_page_config(
     layout="wide"
 )
 
+from core.bitacora import configurar as configurar_bitacora
 from core.engine import NuDaMuEngine
 from core.utils.animaciones import RitualNuDaMu, RitualSpeed
 from memoria_secure.memoria import MemoriaSagrada
 from core.simbolos.mo_ming import obtener_significado_completo
 
+configurar_bitacora(archivo=os.getenv("NUDAMU_LOG", "nudamu.log"))
+
 LANGS = {"Español": "es", "English": "en", "中文": "zh"}
 RITUAL_SPEEDS = {
     "Slow": RitualSpeed.SLOW.value,    
@@ -48,12 +51,26 @@ def render_sidebar():
         st.session_state.ritual_speed = RITUAL_SPEEDS[speed_key]
         if st.button("🔍 View Recent Memories"):
             try:
-                recuerdos = st.session_state.memoria.listar_recuerdos(st.session_state.user_id)
+                # Served from the engine's in-memory recent buffer, not a full decrypt of the store
+                recuerdos = st.session_state.engine.recientes.recientes(st.session_state.user_id)
                 with st.expander("🧠 Memory Vault"):
                     for r in recuerdos:
-                        st.caption(r)
+                        st.caption({"etiqueta": r.etiqueta, "mensaje": r.mensaje})
             except Exception as e:
                 st.error(f"Memory access failed: {str(e)}")
+        if st.button("📈 Emotional Trend"):
+            try:
+                # Running aggregate kept by the store on every write; no history scan
+                tendencia = st.session_state.engine.memoria.tendencias.tendencia(st.session_state.user_id)
+                st.metric("Interactions", tendencia["total"])
+                if tendencia["polaridad"] is not None:
+                    st.metric("Polarity (decayed)", f"{tendencia['polaridad']:+.2f}")
+                if tendencia["conteos"]:
+                    st.bar_chart(tendencia["conteos"])
+                if tendencia["por_hora"]:
+                    st.line_chart({c["inicio"][11:16]: c["total"] for c in tendencia["por_hora"]})
+            except Exception as e:
+                st.error(f"Trend unavailable: {str(e)}")
 
 def render_main_interface():
     st.title("🌌 NuDaMu v2.1")
@@ -83,12 +100,16 @@ def process_input(user_input: str):
                         analisis = obtener_significado_completo(user_input, lang)
                         st.expander(f"📜 {user_input} Analysis").json(analisis)
                         return
-            response = st.session_state.engine.procesar(user_input, st.session_state.user_id)
             if user_input.startswith("///sombra"):
                 st.warning("Entering Shadow Realm...")
                 st.image("simbolos/imagenes/sombra.png", width=300)
             st.markdown("### 🔮 Response")
-            st.markdown(f"> {response}")
+            # Each section shows up as soon as the engine has it
+            marcador = st.empty()
+            response = ""
+            for seccion in st.session_state.engine.procesar_stream(user_input, st.session_state.user_id):
+                response += seccion
+                marcador.markdown(f"> {response}")
             if "🌌" in user_input:
                 st.balloons()
                 st.audio("simbolos/sonidos/eter.mp3")
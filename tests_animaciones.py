@@ -0,0 +1,53 @@
+import io
+import time
+import unittest
+from core.utils.animaciones import ArbolAnimacion, RitualNuDaMu, RitualSpeed # type: ignore
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+class StreamlitFalso:
+    def __init__(self):
+        self.bloques = []
+
+    def markdown(self, texto, unsafe_allow_html=False):
+        self.bloques.append(texto)
+
+class TestAnimaciones(unittest.TestCase):
+    """Tests for the non-blocking ritual animations."""
+
+    def test_console_returns_immediately_and_cancels(self):
+        salida = Terminal()
+        inicio = time.perf_counter()
+        animacion = ArbolAnimacion(RitualSpeed.SLOW).animate_console(salida)
+        self.assertLess(time.perf_counter() - inicio, 0.2)
+        self.assertTrue(animacion.activa)
+        animacion.cancelar()
+        self.assertFalse(animacion.activa)
+        self.assertLess(salida.getvalue().count("\x1b7"), len(ArbolAnimacion.ETAPAS))
+
+    def test_console_runs_to_completion(self):
+        salida = Terminal()
+        arbol = ArbolAnimacion(RitualSpeed.FAST)
+        arbol.speed = 0.01
+        arbol.animate_console(salida).esperar(2)
+        self.assertIn(ArbolAnimacion.ETAPAS[-1], salida.getvalue())
+        self.assertEqual(arbol.current_stage, len(ArbolAnimacion.ETAPAS))
+
+    def test_skipped_when_not_a_tty(self):
+        salida = io.StringIO()
+        self.assertIsNone(ArbolAnimacion().animate_console(salida))
+        self.assertEqual(salida.getvalue(), "")
+
+    def test_streamlit_is_rendered_by_css(self):
+        st = StreamlitFalso()
+        inicio = time.perf_counter()
+        self.assertIsNone(RitualNuDaMu(RitualSpeed.SLOW).invocacion(st))
+        self.assertLess(time.perf_counter() - inicio, 0.2)
+        self.assertEqual(len(st.bloques), 2)
+        self.assertIn("@keyframes", st.bloques[1])
+        self.assertIn(ArbolAnimacion.ETAPAS[-1], st.bloques[1])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
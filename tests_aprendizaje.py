@@ -0,0 +1,70 @@
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+from core.aprendizaje import EntrenadorEnLinea, SentimientoEnLinea, cargar_punto # type: ignore
+from memoria_secure.memoria import MemoriaSagrada # type: ignore
+
+CLAVE = "0123456789abcdef"
+SKLEARN = importlib.util.find_spec("sklearn") is not None
+
+FELICES = ["estoy muy feliz hoy", "qué alegría verte", "me siento feliz y contento", "un día lleno de alegría"]
+TRISTES = ["estoy muy triste hoy", "qué tristeza tan grande", "me siento triste y solo", "un día lleno de llanto"]
+
+class TestAprendizajeEnLinea(unittest.TestCase):
+    """Tests for the online sentiment learner fed from the secure memory."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.memoria = MemoriaSagrada(CLAVE, fragmentos=2)
+        self.memoria.storage_file = os.path.join(self.directorio, "memoria.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _guardar(self, repeticiones=5):
+        for i in range(repeticiones):
+            for texto in FELICES:
+                self.memoria.guardar(f"u{i}", texto, etiqueta="alegria")
+            for texto in TRISTES:
+                self.memoria.guardar(f"u{i}", texto, etiqueta="tristeza")
+
+    def test_unknown_labels_only_advance_the_cursor(self):
+        self.memoria.guardar("u1", "hola", etiqueta="conversacion")
+        entrenador = EntrenadorEnLinea(self.memoria)
+        self.assertEqual(entrenador.paso(), 0)
+        punto = cargar_punto(self.memoria)
+        self.assertIsNone(punto["clasificador"])
+        self.assertTrue(punto["cursor"])
+        self.assertIsNone(SentimientoEnLinea(self.memoria, revisar_s=0).sentimiento("hola"))
+
+    @unittest.skipUnless(SKLEARN, "scikit-learn required")
+    def test_learns_only_new_records_and_hot_swaps(self):
+        servido = SentimientoEnLinea(self.memoria, revisar_s=0)
+        entrenador = EntrenadorEnLinea(self.memoria, tamano_lote=8)
+        self._guardar()
+        self.assertEqual(entrenador.paso(), 40)
+        self.assertEqual(entrenador.paso(), 0)
+        modelo = servido.modelo()
+        self.assertEqual((modelo.version, modelo.vistos), (1, 40))
+        self.assertEqual(servido.sentimiento("hoy estoy feliz"), "positivo")
+        self.assertEqual(servido.sentimiento("hoy estoy triste"), "negativo")
+
+        self.memoria.guardar("u9", "me siento feliz", etiqueta="alegria")
+        self.assertEqual(EntrenadorEnLinea(self.memoria).paso(), 1)
+        self.assertEqual(servido.modelo().vistos, 41)
+        self.assertIsNot(servido.modelo(), modelo)
+
+    @unittest.skipUnless(SKLEARN, "scikit-learn required")
+    def test_checkpoint_is_encrypted(self):
+        self._guardar(1)
+        entrenador = EntrenadorEnLinea(self.memoria)
+        entrenador.paso()
+        with open(entrenador.archivo, encoding="utf-8") as f:
+            contenido = f.read()
+        self.assertNotIn("SGDClassifier", contenido)
+        self.assertNotIn("feliz", contenido)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+class TestBatch(unittest.TestCase):
+    """Tests for main.py's headless --batch mode."""
+
+    def ejecutar(self, *args, entrada=""):
+        with tempfile.TemporaryDirectory() as directorio:
+            # Run elsewhere so the session log does not land in the repo
+            entorno = dict(os.environ, PYTHONPATH=RAIZ)
+            entorno.pop("NUDAMU_CRYPTO_KEY", None)
+            proceso = subprocess.run(
+                [sys.executable, os.path.join(RAIZ, "main.py"), "--batch", *args],
+                input=entrada, capture_output=True, text=True, cwd=directorio, env=entorno, timeout=120
+            )
+        self.assertEqual(proceso.returncode, 0, proceso.stderr)
+        return [json.loads(l) for l in proceso.stdout.splitlines()], json.loads(proceso.stderr.splitlines()[-1])
+
+    def test_ordered_reproducible_output_without_key(self):
+        mensajes = "\n".join(["hola", "///sombra miedo", "quiero robar"] * 10) + "\n"
+        paralelo, resumen = self.ejecutar("--workers", "4", "--seed", "3", entrada=mensajes)
+        secuencial, _ = self.ejecutar("--workers", "1", "--seed", "3", entrada=mensajes)
+        self.assertEqual(resumen["procesados"], 30)
+        self.assertEqual([r["indice"] for r in paralelo], list(range(30)))
+        self.assertEqual([r["respuesta"] for r in paralelo], [r["respuesta"] for r in secuencial])
+        self.assertTrue(all(r["ms"] >= 0 for r in paralelo))
+        self.assertNotIn("🌱", "".join(r["respuesta"] for r in paralelo))
+
+    def test_jsonl_input_file(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+            f.write('{"texto": "///loto"}\n"hola"\n')
+        try:
+            resultados, _ = self.ejecutar(f.name, "--format", "jsonl")
+        finally:
+            os.remove(f.name)
+        self.assertEqual([r["entrada"] for r in resultados], ["///loto", "hola"])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,26 @@
+import unittest
+from benchmarks.suite import comparar, umbral_para # type: ignore
+
+UMBRALES = {"defecto": 0.25, "metricas": {"memoria.*": 0.4, "memoria.guardar_1m_ms": 1.0}}
+
+class TestSuiteBenchmarks(unittest.TestCase):
+    """Tests for the benchmark regression gate."""
+
+    def test_most_specific_threshold_wins(self):
+        self.assertEqual(umbral_para("central.procesar.p50_us", UMBRALES), 0.25)
+        self.assertEqual(umbral_para("memoria.recuperar_1k_ms", UMBRALES), 0.4)
+        self.assertEqual(umbral_para("memoria.guardar_1m_ms", UMBRALES), 1.0)
+
+    def test_direction_depends_on_metric_kind(self):
+        base = {"central.procesar.p50_us": 100.0, "central.procesar.ops_s": 1000.0, "solo_base_ms": 1.0}
+        filas = {f["metrica"]: f for f in comparar(
+            {"central.procesar.p50_us": 130.0, "central.procesar.ops_s": 1300.0}, base, UMBRALES)}
+        self.assertEqual(set(filas), {"central.procesar.p50_us", "central.procesar.ops_s"})
+        # Slower latency is a regression; a higher rate is an improvement
+        self.assertTrue(filas["central.procesar.p50_us"]["regresion"])
+        self.assertFalse(filas["central.procesar.ops_s"]["regresion"])
+        caida = comparar({"central.procesar.ops_s": 700.0}, base, UMBRALES)
+        self.assertTrue(caida[0]["regresion"])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
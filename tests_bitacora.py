@@ -0,0 +1,80 @@
+import json
+import logging
+import logging.handlers
+import queue
+import unittest
+from core.bitacora import FiltroRepeticiones, FormateadorJSON, ManejadorCola # type: ignore
+
+class Perezoso:
+    """Argument that counts how often it is rendered."""
+    def __init__(self):
+        self.veces = 0
+
+    def __str__(self):
+        self.veces += 1
+        return "valor"
+
+class TestBitacora(unittest.TestCase):
+    """Tests for the queued JSON logging pipeline."""
+
+    def setUp(self):
+        self.cola = queue.SimpleQueue()
+        self.manejador = ManejadorCola(self.cola)
+        self.filtro = FiltroRepeticiones(maximo=2, ventana_s=60)
+        self.manejador.addFilter(self.filtro)
+        self.logger = logging.getLogger("tests.bitacora")
+        self.logger.handlers[:] = [self.manejador]
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+
+    def registros(self):
+        salida = []
+        while not self.cola.empty():
+            salida.append(json.loads(FormateadorJSON().format(self.cola.get())))
+        return salida
+
+    def test_message_is_rendered_before_enqueueing(self):
+        """Arguments changed after the call do not alter the logged message."""
+        argumento = Perezoso()
+        estado = {"paso": 1}
+        self.logger.info("usuario %s en %s", argumento, estado, extra={"usuario_id": "u1"})
+        estado["paso"] = 2
+        self.assertEqual(argumento.veces, 1)
+        registro = self.registros()[0]
+        self.assertEqual(argumento.veces, 1)
+        self.assertEqual(registro["mensaje"], "usuario valor en {'paso': 1}")
+        self.assertEqual(registro["usuario_id"], "u1")
+        self.assertEqual(registro["nivel"], "INFO")
+
+    def test_filtered_records_are_never_rendered(self):
+        argumento = Perezoso()
+        for _ in range(5):
+            self.logger.error("fallo %s", argumento)
+        self.assertEqual(argumento.veces, 2)
+
+    def fallar(self):
+        self.logger.error("Decryption failed: %s", "bad tag")
+
+    def test_repeated_errors_are_rate_limited(self):
+        for _ in range(10):
+            self.fallar()
+        for _ in range(3):
+            self.logger.info("not limited")
+        registros = self.registros()
+        self.assertEqual(sum(r["nivel"] == "ERROR" for r in registros), 2)
+        self.assertEqual(sum(r["nivel"] == "INFO" for r in registros), 3)
+        # Once the window expires the next record reports how many were dropped
+        for estado in self.filtro._estado.values():
+            estado[0] -= 61
+        self.fallar()
+        self.assertEqual(self.registros()[0]["suprimidos"], 8)
+
+    def test_exceptions_are_serialized(self):
+        try:
+            raise ValueError("roto")
+        except ValueError:
+            self.logger.exception("fallo")
+        self.assertIn("ValueError: roto", self.registros()[0]["excepcion"])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
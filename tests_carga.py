@@ -0,0 +1,44 @@
+import random
+import unittest
+from benchmarks.carga import Carga, degradacion, mensaje # type: ignore
+
+class MotorQueCrece:
+    """Gets slower as it stores more history; fails on one message kind."""
+    def __init__(self):
+        self.historia = []
+
+    def procesar(self, texto, usuario_id, rng=None):
+        if texto.startswith("///eter"):
+            raise KeyError(texto)
+        self.historia.append((usuario_id, texto))
+        return str(len(self.historia))
+
+def ventanas(p50s):
+    return [{"peticiones": 1000 * (i + 1), "p50_ms": p} for i, p in enumerate(p50s)]
+
+class TestCarga(unittest.TestCase):
+    """Tests for the load generator and its degradation check."""
+
+    def test_message_mix(self):
+        rng = random.Random(0)
+        mensajes = [mensaje(rng, 0.3) for _ in range(2000)]
+        comandos = sum(m.startswith("///") for m in mensajes) / len(mensajes)
+        self.assertAlmostEqual(comandos, 0.3, delta=0.05)
+
+    def test_degradation_detected(self):
+        self.assertLess(degradacion(ventanas([9, 1.0, 1.1, 0.9, 1.0, 1.05, 1.0, 1.0, 0.95]))["ratio"], 1.3)
+        creciente = degradacion(ventanas([9, 1, 2, 3, 4, 5, 6, 7, 8]))
+        self.assertGreater(creciente["ratio"], 2)
+        self.assertGreater(creciente["pendiente_ms_por_1k"], 0.5)
+
+    def test_run_reports_windows_and_errors(self):
+        motor = MotorQueCrece()
+        carga = Carga(lambda: motor, usuarios=4, pausa_s=0.001)
+        filas = carga.ejecutar(duracion_s=0.6, intervalo_s=0.2)
+        self.assertEqual(len(filas), 3)
+        self.assertEqual(filas[-1]["peticiones"], len(motor.historia) + sum(carga.tipos_error.values()))
+        self.assertEqual(set(carga.tipos_error), {"KeyError"})
+        self.assertEqual({u for u, _ in motor.historia}, {f"carga-{i:04d}" for i in range(4)})
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,55 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from core.benyuanwen import NudamuBenyuanwen # type: ignore
+from core.catalogo import DIRECTORIO_CATALOGO, Catalogo, obtener_catalogo # type: ignore
+from core.qinggan import AnalizadorEmocional # type: ignore
+
+class TestCatalogo(unittest.TestCase):
+    """Tests for the shared, versioned response catalog."""
+
+    def test_instances_share_one_catalog(self):
+        primero, segundo = AnalizadorEmocional(), AnalizadorEmocional()
+        self.assertIs(primero.catalogo, segundo.catalogo)
+        self.assertIs(primero.respuestas, segundo.respuestas)
+        self.assertIs(NudamuBenyuanwen().catalogo, obtener_catalogo())
+        self.assertNotIn("respuestas", vars(primero))
+
+    def test_languages_load_lazily_and_strings_are_interned(self):
+        catalogo = Catalogo(DIRECTORIO_CATALOGO)
+        self.assertEqual(catalogo.cargadas(), ())
+        seccion = catalogo.seccion("es")
+        self.assertEqual(catalogo.cargadas(), ("es",))
+        self.assertIs(catalogo.seccion("es"), seccion)
+        respuesta = seccion.emociones["tristeza"].respuesta
+        self.assertIs(sys.intern(respuesta), respuesta)
+        self.assertIs(Catalogo(DIRECTORIO_CATALOGO).seccion("es").emociones["tristeza"].respuesta, respuesta)
+        self.assertFalse(hasattr(seccion.emociones["tristeza"], "__dict__"))
+        self.assertEqual(catalogo.seccion("fr").emociones, {})
+
+    def test_responses_keep_their_shape(self):
+        respuestas = obtener_catalogo().respuestas_emocionales()
+        self.assertEqual(list(respuestas), ["tristeza", "alegria", "serenidad", "confusion", "neutral"])
+        self.assertEqual(list(respuestas["tristeza"]), ["es", "zh", "en", "intensity", "advice"])
+        self.assertEqual(set(respuestas["tristeza"]["advice"]), {"es", "en"})
+        analisis = AnalizadorEmocional().analizar("me siento muy triste " * 10)
+        self.assertEqual(analisis["emotion"], "tristeza")
+        self.assertTrue(analisis["advice"]["es"].endswith("Tu extensa reflexión merece contemplación."))
+        analisis["advice"]["es"] = "cambiado"
+        self.assertNotEqual(AnalizadorEmocional().analizar("triste")["advice"]["es"], "cambiado")
+
+    def test_rejects_unknown_format(self):
+        directorio = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(directorio, "indice.json"), "w", encoding="utf-8") as f:
+                json.dump({"formato": 99}, f)
+            with self.assertRaises(ValueError):
+                Catalogo(directorio)
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from core.luohe_central import LuoHeCentral # type: ignore
+from core.identidad import ModosSimbolicos # type: ignore
+
+ENTRADAS = ["///sombra", "///guia algo", "///xyz", "hola", "quiero robar", "Paz y calma"] * 20
+
+class TestRngPorPeticion(unittest.TestCase):
+    """Each request carries its own random.Random, so results do not depend on threading."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.central = LuoHeCentral()
+
+    def _procesar(self, indice: int) -> str:
+        return self.central.procesar(ENTRADAS[indice], rng=random.Random(indice))
+
+    def test_seeded_requests_are_reproducible(self):
+        self.assertEqual(self._procesar(0), self._procesar(0))
+
+    def test_thread_pool_matches_sequential(self):
+        secuencial = [self._procesar(i) for i in range(len(ENTRADAS))]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            concurrente = list(pool.map(self._procesar, range(len(ENTRADAS))))
+        self.assertEqual(secuencial, concurrente)
+
+    def test_global_random_untouched(self):
+        """Components never draw from or reseed the module-level generator."""
+        random.seed(1234)
+        esperado = random.random()
+        random.seed(1234)
+        ModosSimbolicos().ejecutar("sombra", "", random.Random(5))
+        self.central.procesar("hola", rng=random.Random(5))
+        self.assertEqual(random.random(), esperado)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
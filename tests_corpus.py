@@ -0,0 +1,93 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from core.corpus import analizar_corpus # type: ignore
+
+try:
+    import pyarrow.parquet as pq # type: ignore
+except ImportError:
+    pq = None
+
+class TestCorpus(unittest.TestCase):
+    """Tests for the streaming `nudamu analyze` pipeline."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.entrada = os.path.join(self.directorio, "entrada.jsonl")
+        with open(self.entrada, "w", encoding="utf-8") as f:
+            for i in range(120):
+                texto = "///sombra miedo" if i % 3 == 0 else f"mensaje {i}: no quiero mentir"
+                f.write(json.dumps({"texto": texto}, ensure_ascii=False) + "\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _ruta(self, nombre: str) -> str:
+        return os.path.join(self.directorio, nombre)
+
+    def _leer(self, ruta: str) -> list:
+        with open(ruta, "r", encoding="utf-8") as f:
+            return [json.loads(linea) for linea in f]
+
+    def test_pool_matches_in_process(self):
+        analizar_corpus(self.entrada, self._ruta("uno.jsonl"), workers=1, tamano_lote=16)
+        analizar_corpus(self.entrada, self._ruta("dos.jsonl"), workers=2, tamano_lote=16)
+        uno = self._leer(self._ruta("uno.jsonl"))
+        self.assertEqual([r["indice"] for r in uno], list(range(120)))
+        self.assertEqual(uno, self._leer(self._ruta("dos.jsonl")))
+        self.assertEqual(uno[1]["analisis"]["etica"]["dilema"], "mentir")
+
+    def test_resume_from_checkpoint(self):
+        completo = self._ruta("completo.jsonl")
+        parcial = self._ruta("parcial.jsonl")
+        analizar_corpus(self.entrada, completo, tamano_lote=10)
+        analizar_corpus(self.entrada, parcial, tamano_lote=10, limite=35)
+        resumen = analizar_corpus(self.entrada, parcial, tamano_lote=10, reanudar=True)
+        self.assertEqual(resumen["procesados"], 85)
+        self.assertEqual(self._leer(completo), self._leer(parcial))
+
+    def test_csv_input(self):
+        entrada = self._ruta("entrada.csv")
+        with open(entrada, "w", encoding="utf-8") as f:
+            f.write("id,mensaje\n1,quiero robar\n2,\"hola, mundo\"\n")
+        salida = self._ruta("csv.jsonl")
+        analizar_corpus(entrada, salida, campo="mensaje")
+        resultados = self._leer(salida)
+        self.assertEqual(resultados[0]["analisis"]["etica"]["dilema"], "robar")
+        self.assertEqual(resultados[1]["analisis"]["texto"], "hola, mundo")
+
+    def test_invalid_jsonl_lines_become_error_rows(self):
+        entrada = self._ruta("mixta.jsonl")
+        with open(entrada, "w", encoding="utf-8") as f:
+            f.write('{"texto": "quiero robar"}\n{roto\n\n42\n["a"]\n"hola"\n')
+        salida = self._ruta("mixta_salida.jsonl")
+        analizar_corpus(entrada, salida, workers=1)
+        resultados = self._leer(salida)
+        self.assertEqual([r["indice"] for r in resultados], [0, 1, 2, 3, 4])
+        self.assertEqual([r.get("linea") for r in resultados], [None, 2, 4, 5, None])
+        self.assertEqual(resultados[0]["analisis"]["etica"]["dilema"], "robar")
+        self.assertIn("Invalid JSON", resultados[1]["error"])
+        self.assertIn("int", resultados[2]["error"])
+        self.assertEqual(resultados[4]["analisis"]["texto"], "hola")
+
+    def _leer_parquet(self, ruta: str) -> list:
+        filas = pq.read_table(ruta).to_pylist()
+        return sorted(filas, key=lambda fila: fila["indice"])
+
+    @unittest.skipUnless(pq, "pyarrow not installed")
+    def test_parquet_resume_and_fresh_run(self):
+        completo = self._ruta("completo.parquet")
+        parcial = self._ruta("parcial.parquet")
+        analizar_corpus(self.entrada, completo, tamano_lote=10)
+        analizar_corpus(self.entrada, parcial, tamano_lote=10, limite=35)
+        resumen = analizar_corpus(self.entrada, parcial, tamano_lote=10, reanudar=True)
+        self.assertEqual(resumen["procesados"], 85)
+        self.assertEqual(self._leer_parquet(completo), self._leer_parquet(parcial))
+        # A fresh run over the same directory replaces every part of the previous one
+        analizar_corpus(self.entrada, parcial, tamano_lote=10, limite=5)
+        self.assertEqual([f["indice"] for f in self._leer_parquet(parcial)], list(range(5)))
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
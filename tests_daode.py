@@ -0,0 +1,79 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from typing import Optional
+import core.utils.instantanea as instantanea # type: ignore
+from core.daode import EticaNuDaMu # type: ignore
+from core.reglas import AutomataReglas, FORMATO_PAQUETE, RepositorioEtico # type: ignore
+
+def _dilema(texto: str) -> dict:
+    return {"es": texto, "zh": texto, "en": texto, "philosophy": texto}
+
+class TestReglasEticas(unittest.TestCase):
+    """Tests for the compiled, hot-reloading ethics rule packs."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.cache = tempfile.mkdtemp()
+        self._cache_original = instantanea.DIRECTORIO_CACHE
+        instantanea.DIRECTORIO_CACHE = self.cache
+        self._escribir("base.json", {"mentir": _dilema("m"), "robar": _dilema("r")})
+
+    def tearDown(self):
+        instantanea.DIRECTORIO_CACHE = self._cache_original
+        shutil.rmtree(self.directorio, ignore_errors=True)
+        shutil.rmtree(self.cache, ignore_errors=True)
+
+    def _escribir(self, nombre: str, dilemas: dict, principios: Optional[dict] = None):
+        paquete = {"formato": FORMATO_PAQUETE, "nombre": nombre, "version": "1",
+                   "dilemas": dilemas, "principios": {"en": ["unity"]} if principios is None else principios}
+        with open(os.path.join(self.directorio, nombre), "w", encoding="utf-8") as f:
+            json.dump(paquete, f, ensure_ascii=False)
+
+    def test_automaton_priority_matches_dict_order(self):
+        """The first registered keyword wins, like the old linear scan."""
+        automata = AutomataReglas(["mentir", "robar", "tir"])
+        self.assertEqual(automata.primera("quiero robar y mentir"), 0)
+        self.assertEqual(automata.primera("voy a robarlo"), 1)
+        self.assertEqual(automata.primera("partir"), 2)
+        self.assertEqual(automata.primera("nada"), -1)
+
+    def test_evaluar_uses_packs(self):
+        etica = EticaNuDaMu(RepositorioEtico(self.directorio))
+        self.assertEqual(etica.evaluar("No quiero ROBAR")["dilema"], "robar")
+        self.assertIsNone(etica.evaluar("hello")["dilema"])
+
+    def test_hot_reload(self):
+        """A new pack on disk is picked up without recreating the evaluator."""
+        repo = RepositorioEtico(self.directorio, intervalo_recarga=0)
+        etica = EticaNuDaMu(repo)
+        self.assertIsNone(etica.evaluar("voy a dañar algo")["dilema"])
+        self._escribir("extra.json", {"dañar": _dilema("d")})
+        self.assertEqual(etica.evaluar("voy a dañar algo")["dilema"], "dañar")
+
+    def test_reload_without_en_principles_keeps_previous_rules(self):
+        repo = RepositorioEtico(self.directorio, intervalo_recarga=0)
+        etica = EticaNuDaMu(repo)
+        self._escribir("base.json", {"dañar": _dilema("d")}, principios={"es": ["unidad"]})
+        with self.assertLogs("core.reglas", level="ERROR"):
+            resultado = etica.evaluar("hello")
+        self.assertEqual(resultado["reflection"], "unity")
+        self.assertEqual(repo.reglas.temas, ["mentir", "robar"])
+
+    def test_snapshot_reused(self):
+        RepositorioEtico(self.directorio)
+        self.assertEqual(len(os.listdir(self.cache)), 1)
+        repo = RepositorioEtico(self.directorio)
+        self.assertEqual(repo.reglas.temas, ["mentir", "robar"])
+
+    def test_agregar_dilema_shared(self):
+        repo = RepositorioEtico(self.directorio)
+        EticaNuDaMu(repo).agregar_dilema("engañar", _dilema("e"))
+        self.assertEqual(EticaNuDaMu(repo).evaluar("engañar")["dilema"], "engañar")
+        with self.assertRaises(ValueError):
+            EticaNuDaMu(repo).agregar_dilema("x", {"es": "x"})
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
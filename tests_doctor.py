@@ -0,0 +1,34 @@
+import tempfile
+import unittest
+from core import doctor # type: ignore
+
+class TestDoctor(unittest.TestCase):
+    """Tests for the isolated startup profiler."""
+
+    def test_profiles_component_in_fresh_interpreter(self):
+        [medicion] = doctor.perfilar(["etica"])
+        self.assertEqual(medicion.estado, "ok", medicion.error)
+        self.assertGreater(medicion.segundos, 0)
+        self.assertGreater(medicion.rss_mib, 0)
+        self.assertIsNotNone(medicion.pico_tracemalloc_mib)
+
+    def test_missing_dependency_is_reported_not_raised(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            resultado = doctor._ejecutar_arnes("import paquete_que_no_existe", False, 60, directorio)
+        self.assertEqual(resultado["estado"], "falta")
+        self.assertIn("paquete_que_no_existe", resultado["error"])
+
+    def test_report_ranking_and_comparison(self):
+        anterior = doctor.informe([doctor.Medicion("a", "", segundos=1.0, rss_delta_mib=100),
+                                   doctor.Medicion("b", "", segundos=0.01, rss_delta_mib=1)])
+        actual = doctor.informe([doctor.Medicion("a", "", segundos=1.6, rss_delta_mib=100),
+                                 doctor.Medicion("b", "", segundos=0.02, rss_delta_mib=1.5),
+                                 doctor.Medicion("c", "", estado="falta")])
+        self.assertEqual([c["nombre"] for c in actual["componentes"]], ["a", "b", "c"])
+        filas = {f["componente"]: f for f in doctor.comparar_informes(actual, anterior)}
+        self.assertTrue(filas["a"]["regresion"])
+        # Doubling a 10 ms import is below the absolute floor
+        self.assertFalse(filas["b"]["regresion"])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,63 @@
+import random
+import unittest
+from unittest import mock
+import core.documento as modulo_documento # type: ignore
+from core.daode import EticaNuDaMu # type: ignore
+from core.documento import Documento, preparar, preparar_lote # type: ignore
+from core.enrutador import Modo, RegistroModos # type: ignore
+from core.identidad import ModosSimbolicos # type: ignore
+from core.luohe_central import LuoHeCentral # type: ignore
+from core.qinggan import AnalizadorEmocional # type: ignore
+
+class TestDocumento(unittest.TestCase):
+    """Tests for the shared per-message preprocessing stage."""
+
+    def test_fields(self):
+        documento = preparar("Hoy me siento MUY feliz, ¿sabes?")
+        self.assertEqual(documento.normalizado, "hoy me siento muy feliz, ¿sabes?")
+        self.assertEqual(documento.tokens, ("hoy", "me", "siento", "muy", "feliz", "sabes"))
+        self.assertEqual((documento.idioma, documento.escritura), ("es", "latin"))
+        self.assertIsNone(documento.lemas)
+        with self.assertRaises(AttributeError):
+            documento.texto = "otro"
+        self.assertEqual(preparar("我很快乐").idioma, "zh")
+        self.assertEqual(preparar("hello", idioma="es").idioma, "es")
+
+    def test_analyzers_accept_document_or_text(self):
+        emociones, etica = AnalizadorEmocional(), EticaNuDaMu()
+        for texto in ("No quiero ROBAR", "estoy triste hoy", "我很快乐"):
+            with self.subTest(texto=texto):
+                documento = preparar(texto)
+                self.assertEqual(emociones.analizar(documento), emociones.analizar(texto))
+                self.assertEqual(etica.evaluar(documento, rng=random.Random(1)),
+                                 etica.evaluar(texto, rng=random.Random(1)))
+
+    def test_text_prepared_once_per_message(self):
+        central = LuoHeCentral()
+        with mock.patch.object(modulo_documento, "_base", wraps=modulo_documento._base) as base:
+            central.procesar("hoy estoy triste y no sé por qué", rng=random.Random(0))
+        self.assertEqual(base.call_count, 1)
+
+    def test_batch_preparation_keeps_order_and_lemmas(self):
+        textos = [f"mensaje número {i} sobre la tristeza" for i in range(10)] + ["I am happy"]
+        documentos = list(preparar_lote(textos, tamano_lote=4))
+        self.assertEqual([d.texto for d in documentos], textos)
+        # Without a spaCy model the lemmas fall back to the tokens
+        for documento in documentos:
+            self.assertIsNotNone(documento.lemas)
+        analisis = LuoHeCentral().analisis_completo(documentos[0], random.Random(0))
+        self.assertEqual(analisis["palabras_clave"][:2], list(documentos[0].lemas[:2]))
+
+    def test_modes_get_documents_plugins_get_text(self):
+        vistos = []
+        propio = RegistroModos()
+        propio.registrar(Modo("doc", lambda d, rng: vistos.append(d) or "ok", documento=True))
+        propio.registrar(Modo("txt", lambda t, rng: vistos.append(t) or "ok"))
+        modos = ModosSimbolicos(propio)
+        modos.ejecutar("doc", "Hola")
+        modos.ejecutar("txt", preparar("Hola"))
+        self.assertIsInstance(vistos[0], Documento)
+        self.assertEqual(vistos[1], "Hola")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from core.enrutador import EnrutadorComandos, Modo, RegistroModos, registro # type: ignore
+from core.identidad import ModosSimbolicos # type: ignore
+from core.luohe_central import LuoHeCentral # type: ignore
+
+class TestEnrutador(unittest.TestCase):
+    """Tests for the `///<mode>` router and the mode registry."""
+
+    def setUp(self):
+        self.enrutador = EnrutadorComandos()
+
+    def test_builtin_commands_and_aliases(self):
+        cases = {
+            "///sombra miedo": ("sombra", "miedo"),
+            "///lotus semilla": ("loto", "semilla"),
+            "///ETER palabra": ("éter", "palabra"),
+            "///guia": ("guia", ""),
+        }
+        for texto, esperado in cases.items():
+            with self.subTest(texto=texto):
+                self.assertEqual(self.enrutador.detectar(texto), esperado)
+
+    def test_non_commands(self):
+        self.assertIsNone(self.enrutador.detectar("hola ///sombra"))
+        self.assertIsNone(self.enrutador.detectar("///desconocido texto"))
+        self.assertEqual(self.enrutador.separar("/// nada"), ("", " nada"))
+
+    def test_plugin_mode_registration(self):
+        """A mode registered on a separate registry is dispatched without touching the global one."""
+        propio = RegistroModos()
+        propio.registrar(Modo("eco", lambda texto, rng: texto.upper(), ("🔊",), alias=("echo",)))
+        modos = ModosSimbolicos(propio)
+        self.assertEqual(EnrutadorComandos(propio).detectar("///echo hola"), ("eco", "hola"))
+        self.assertEqual(modos.ejecutar("echo", "hola"), "🔊 HOLA 🔊")
+        self.assertIsNone(registro.resolver("eco"))
+
+    def test_central_routes_lotus(self):
+        respuesta = LuoHeCentral().procesar("///lotus semilla")
+        self.assertIn("loto", respuesta)
+        self.assertIn("'semilla...'", respuesta)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
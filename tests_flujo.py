@@ -0,0 +1,79 @@
+import random
+import unittest
+from core.luohe_central import LuoHeCentral # type: ignore
+from core.metricas import metricas # type: ignore
+from core.utils.flujo import medir_peticion, recortar, rellenar # type: ignore
+
+ENTRADAS = ["hoy estoy feliz", "estoy triste y solo", "quiero robar", "///sombra tengo miedo", "", "   ",
+            "¿cómo puedo meditar cada mañana sin distraerme con todo lo que pasa alrededor? " * 3]
+
+class TestFlujo(unittest.TestCase):
+    """Tests for streaming responses section by section."""
+
+    def test_rellenar_emits_each_field_as_its_stage_ends(self):
+        etapas = []
+        def campos():
+            etapas.append(1)
+            yield {"a": "uno"}
+            etapas.append(2)
+            yield {"a": "uno", "b": 2}
+            etapas.append(3)
+        trozos = rellenar("[{a}] {b:03d}!", campos())
+        self.assertEqual(next(trozos), "[uno")
+        self.assertEqual(etapas, [1])
+        self.assertEqual(list(trozos), ["] 002", "!"])
+        self.assertEqual(etapas, [1, 2, 3])
+
+    def test_recortar_matches_strip(self):
+        for trozos in (["  ", "\nhola", " ", "", "mundo  ", "\n"], ["   "], [], ["a", "\n\n", "b"]):
+            with self.subTest(trozos=trozos):
+                salida = list(recortar(iter(trozos)))
+                self.assertEqual("".join(salida), "".join(trozos).strip())
+                self.assertTrue(all(salida))
+
+    def test_stream_joins_to_procesar(self):
+        central = LuoHeCentral()
+        for indice, texto in enumerate(ENTRADAS):
+            with self.subTest(texto=texto):
+                secciones = list(central.procesar_stream(texto, rng=random.Random(indice)))
+                self.assertEqual("".join(secciones), central.procesar(texto, rng=random.Random(indice)))
+        self.assertGreater(len(list(central.procesar_stream("hoy estoy feliz", rng=random.Random(0)))), 1)
+
+    def test_error_after_output_is_appended(self):
+        central = LuoHeCentral()
+        central._generar_perspectiva = lambda documento: 1 / 0
+        secciones = list(central.procesar_stream("hoy estoy feliz", rng=random.Random(0)))
+        self.assertGreater(len(secciones), 1)
+        self.assertTrue(secciones[-1].startswith("\n\n⛔"))
+        self.assertEqual(central.procesar("hoy estoy feliz", rng=random.Random(0)), "".join(secciones))
+
+    def _peticiones(self, nombre: str) -> int:
+        histograma = metricas.histogramas.get(nombre)
+        return histograma.n if histograma is not None else 0
+
+    def test_stream_is_measured_even_when_dropped_early(self):
+        central = LuoHeCentral()
+        antes = self._peticiones("central.procesar")
+        list(central.procesar_stream("hoy estoy feliz", rng=random.Random(0)))
+        flujo = central.procesar_stream("hoy estoy feliz", rng=random.Random(0))
+        next(flujo)
+        flujo.close()
+        self.assertEqual(self._peticiones("central.procesar"), antes + 2)
+
+    def test_medir_peticion_ends_the_span_on_close(self):
+        cerrado = []
+        def trozos():
+            try:
+                yield "a"
+                yield "b"
+            finally:
+                cerrado.append(True)
+        antes = self._peticiones("tests.flujo")
+        flujo = medir_peticion("tests.flujo", trozos())
+        self.assertEqual(next(flujo), "a")
+        self.assertEqual(self._peticiones("tests.flujo"), antes)
+        flujo.close()
+        self.assertEqual((cerrado, self._peticiones("tests.flujo")), ([True], antes + 1))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from memoria_secure.fragmentos import distribuciones_presentes, leer_registros, refragmentar # type: ignore
+from memoria_secure.memoria import MemoriaSagrada # type: ignore
+
+CLAVE = "0123456789abcdef"
+
+def _escribir_desde_proceso(base, fragmentos, proceso, n):
+    memoria = MemoriaSagrada(CLAVE, fragmentos=fragmentos)
+    memoria.storage_file = base
+    for i in range(n):
+        memoria.guardar(f"p{proceso}", f"p{proceso}-{i}", etiqueta="alegria")
+
+class TestFragmentos(unittest.TestCase):
+    """Tests for the hash-sharded secure memory store and the re-shard tool."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.base = os.path.join(self.directorio, "memoria.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _memoria(self, fragmentos):
+        memoria = MemoriaSagrada(CLAVE, fragmentos=fragmentos)
+        memoria.storage_file = self.base
+        return memoria
+
+    def test_reads_touch_only_the_users_shard(self):
+        memoria = self._memoria(4)
+        for i in range(40):
+            memoria.guardar(f"u{i % 8}", f"mensaje {i}", etiqueta="neutral")
+        self.assertEqual([r["mensaje"] for r in memoria.recuperar("u3")], [f"mensaje {i}" for i in range(3, 40, 8)])
+        for indice in range(4):
+            with open(memoria.archivo_fragmento(indice), encoding="utf-8") as f:
+                self.assertTrue(all(memoria.fragmento(r["usuario_id"]) == indice for r in json.load(f)))
+        self.assertFalse(os.path.exists(self.base))
+        self.assertEqual(len(memoria._cargar_json()), 40)
+
+    def test_concurrent_writers_lose_nothing(self):
+        memoria = self._memoria(4)
+
+        def escribir(usuario):
+            for i in range(10):
+                memoria.guardar(usuario, f"{usuario}-{i}", etiqueta="neutral")
+
+        hilos = [threading.Thread(target=escribir, args=(f"u{n}",)) for n in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        for n in range(8):
+            self.assertEqual(len(memoria.recuperar(f"u{n}")), 10)
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs fork")
+    def test_concurrent_processes_lose_nothing(self):
+        contexto = multiprocessing.get_context("fork")
+        for fragmentos in (1, 2):
+            base = os.path.join(self.directorio, f"procesos{fragmentos}.json")
+            procesos = [contexto.Process(target=_escribir_desde_proceso, args=(base, fragmentos, p, 25))
+                        for p in range(4)]
+            for proceso in procesos:
+                proceso.start()
+            for proceso in procesos:
+                proceso.join()
+                self.assertEqual(proceso.exitcode, 0)
+            memoria = MemoriaSagrada(CLAVE, fragmentos=fragmentos)
+            memoria.storage_file = base
+            for p in range(4):
+                self.assertEqual([r["mensaje"] for r in memoria.recuperar(f"p{p}")], [f"p{p}-{i}" for i in range(25)])
+                self.assertEqual(memoria.tendencias.tendencia(f"p{p}")["total"], 25)
+                self.assertEqual(len(memoria.vectores._indice(f"p{p}").recuerdos), 25)
+            self.assertEqual([n for n in os.listdir(self.directorio) if n.endswith(".tmp")], [])
+
+    def test_streaming_reader_handles_small_buffers(self):
+        import memoria_secure.fragmentos as fragmentos
+        memoria = self._memoria(1)
+        for i in range(5):
+            memoria.guardar("u", "mensaje {largo} " * 20 + str(i), etiqueta="neutral")
+        bloque, fragmentos._BLOQUE = fragmentos._BLOQUE, 7
+        try:
+            registros = list(leer_registros(self.base))
+        finally:
+            fragmentos._BLOQUE = bloque
+        with open(self.base, encoding="utf-8") as f:
+            self.assertEqual(registros, json.load(f))
+        with open(self.base, "w", encoding="utf-8") as f:
+            f.write('[{"usuario_id": "u"}, {"usuario')
+        with self.assertRaises(ValueError):
+            list(leer_registros(self.base))
+
+    def test_reshard_up_and_down_keeps_everything(self):
+        memoria = self._memoria(1)
+        for i in range(30):
+            memoria.guardar(f"u{i % 6}", f"mensaje{i}", etiqueta="alegria" if i % 2 else "tristeza")
+        antes = {f"u{n}": memoria.recuperar(f"u{n}") for n in range(6)}
+        tendencia = memoria.tendencias.tendencia("u1")
+
+        resumen = refragmentar(self.base, 5)
+        self.assertEqual((resumen["origen"], resumen["registros"]), (1, 30))
+        self.assertEqual(distribuciones_presentes(self.base), [5])
+        fragmentada = self._memoria(5)
+        self.assertEqual({u: fragmentada.recuperar(u) for u in antes}, antes)
+        self.assertEqual(fragmentada.tendencias.tendencia("u1")["conteos"], tendencia["conteos"])
+        self.assertEqual(resumen["vectores"], 30)
+        self.assertEqual(fragmentada.recall_similar("u1", "mensaje7", k=1)[0]["mensaje"], "mensaje7")
+
+        refragmentar(self.base, 3)
+        self.assertEqual(distribuciones_presentes(self.base), [3])
+        refragmentar(self.base, 1)
+        self.assertEqual(distribuciones_presentes(self.base), [1])
+        self.assertEqual({u: self._memoria(1).recuperar(u) for u in antes}, antes)
+        self.assertEqual([n for n in os.listdir(self.directorio) if n.endswith(".tmp")], [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import random
+import time
+import unittest
+from fastapi.testclient import TestClient # type: ignore
+from core.luohe_central import LuoHeCentral # type: ignore
+from core.metricas import Histograma, PerfiladorMuestreo, RegistroMetricas, metricas # type: ignore
+from core.servidor import crear_app # type: ignore
+
+class TestMetricas(unittest.TestCase):
+    """Tests for stage timing spans, histograms and the metrics endpoints."""
+
+    def test_histogram_percentiles(self):
+        h = Histograma()
+        for i in range(1, 1001):
+            h.observar(i / 1e5)  # 10µs .. 10ms, uniform
+        self.assertEqual(h.n, 1000)
+        self.assertAlmostEqual(h.percentil(0.5), 0.005, delta=0.0015)
+        self.assertAlmostEqual(h.percentil(0.99), 0.0099, delta=0.003)
+
+    def test_disabled_registry_records_nothing(self):
+        registro = RegistroMetricas(habilitado=False)
+        with registro.peticion("p"), registro.tramo("t"):
+            pass
+        self.assertEqual(registro.instantanea()["tramos"], {})
+
+    def test_slow_request_keeps_stage_breakdown_and_stacks(self):
+        registro = RegistroMetricas(umbral_lento_s=0.02, perfilador=PerfiladorMuestreo(intervalo_s=0.002))
+        avisos = []
+        registro.al_lento.append(avisos.append)
+        with registro.peticion("lenta"):
+            with registro.tramo("rapido"):
+                pass
+            with registro.tramo("dormir"):
+                time.sleep(0.05)
+        with registro.peticion("rapida"):
+            pass
+        self.assertEqual(len(avisos), 1)
+        informe = avisos[0]
+        self.assertEqual([t["tramo"] for t in informe["tramos"]], ["rapido", "dormir"])
+        self.assertTrue(any("test_slow_request" in linea for p in informe["pilas"] for linea in p["pila"]))
+        self.assertEqual(registro.instantanea()["tramos"]["lenta"]["n"], 1)
+
+    def test_pipeline_stages_exposed_over_http(self):
+        metricas.reiniciar()
+        LuoHeCentral().procesar("hoy estoy feliz", "u", random.Random(0))
+        with TestClient(crear_app(LuoHeCentral())) as cliente:
+            texto = cliente.get("/metricas")
+            instantanea = cliente.get("/metricas.json").json()
+        self.assertTrue(texto.headers["content-type"].startswith("text/plain"))
+        self.assertIn('nudamu_tramo_segundos_count{tramo="central.emociones"}', texto.text)
+        self.assertIn('le="+Inf"', texto.text)
+        self.assertGreaterEqual(instantanea["tramos"]["central.procesar"]["n"], 1)
+        self.assertIn("p99_ms", instantanea["tramos"]["central.etica"])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
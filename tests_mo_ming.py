@@ -0,0 +1,73 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import core.utils.instantanea as instantanea # type: ignore
+from core.simbolos import mo_ming # type: ignore
+from core.simbolos.nombres import CatalogoNombres, NombreSagrado, cargar_catalogo # type: ignore
+
+class TestNombresSagrados(unittest.TestCase):
+    """Tests for the indexed, file-backed sacred-name catalog."""
+
+    def test_lookups(self):
+        self.assertTrue(mo_ming.es_nombre_sagrado("道"))
+        self.assertTrue(mo_ming.es_nombre_sagrado("Verdad", "es"))
+        self.assertFalse(mo_ming.es_nombre_sagrado("Verdad", "zh"))
+        self.assertEqual(mo_ming.obtener_elementos("天"), ["fuego", "madera"])
+        self.assertEqual(mo_ming.obtener_elementos("nadie"), [])
+        self.assertEqual([n.caracter for n in mo_ming.buscar_por_pronunciacion("TRUTH")], ["Verdad"])
+        self.assertEqual({n.caracter for n in mo_ming.buscar_por_elemento("fuego")}, {"天", "Verdad"})
+
+    def test_meaning(self):
+        significado = mo_ming.obtener_significado_completo("道", "en")
+        self.assertEqual(significado["significado"], "The Way — natural order of all things")
+        self.assertEqual(significado["profundidad"], "Nivel 9")
+
+    def test_language_of_text_without_letters_is_unknown(self):
+        for texto in ("", "   ", "123", "😀", "42 😀 !!"):
+            with self.subTest(texto=texto):
+                self.assertEqual(mo_ming.detectar_idioma(texto), "desconocido")
+        self.assertEqual(mo_ming.detectar_idioma("hello my friend 123"), "inglés")
+        self.assertEqual(mo_ming.detectar_idioma("你好 123"), "chino")
+
+    def test_precomputed_resonance_matches_seeded_rng(self):
+        """Precomputed values equal the historical per-name seeded computation."""
+        rng = random.Random("道")
+        esperado = {
+            "paz": round(rng.uniform(0.7, 0.9), 2),
+            "claridad": round(rng.uniform(0.5, 0.8), 2),
+            "poder": round(rng.uniform(0.3, 0.6), 2)
+        }
+        self.assertEqual(mo_ming.calcular_resonancia("道"), esperado)
+
+    def test_duplicate_character_is_logged(self):
+        nombres = [NombreSagrado("Luz", {}, {}, [], idioma="es", significados={"en": "Light"}),
+                   NombreSagrado("Luz", {}, {}, [], idioma="pt", significados={"en": "Glow"})]
+        with self.assertLogs("core.simbolos.nombres", level="WARNING") as registro:
+            catalogo = CatalogoNombres(nombres)
+        self.assertEqual(len(catalogo), 1)
+        self.assertTrue(catalogo.en_idioma("Luz", "es"))
+        self.assertIn("'Luz'", registro.output[0])
+
+    def test_snapshot_rebuilt_when_file_changes(self):
+        directorio = tempfile.mkdtemp()
+        original = instantanea.DIRECTORIO_CACHE
+        instantanea.DIRECTORIO_CACHE = os.path.join(directorio, "cache")
+        try:
+            ruta = os.path.join(directorio, "nombres.tsv")
+            cabecera = "caracter\tidioma\tpronunciacion\telementos\tprofundidad\tzh\tes\ten\n"
+            with open(ruta, "w", encoding="utf-8") as f:
+                f.write(cabecera + "水\tzh\tzh:shuǐ\tagua\tNivel 5\t水\tAgua\tWater\n")
+            self.assertIn("水", cargar_catalogo(ruta))
+            with open(ruta, "w", encoding="utf-8") as f:
+                f.write(cabecera + "火\tzh\tzh:huǒ\tfuego\tNivel 6\t火\tFuego\tFire\n")
+            catalogo = cargar_catalogo(ruta)
+            self.assertNotIn("水", catalogo)
+            self.assertEqual(catalogo.obtener("火").significados["en"], "Fire")
+        finally:
+            instantanea.DIRECTORIO_CACHE = original
+            shutil.rmtree(directorio, ignore_errors=True)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,45 @@
+import gc
+import os
+import signal
+import time
+import unittest
+from core.prefork import Prefork, leer_memoria # type: ignore
+
+def _cargar_modelo():
+    # Stand-in for loaded model weights: ~20 MiB of objects built once in the master
+    return [bytes(1024) for _ in range(20_000)]
+
+def _trabajo(estado, indice):
+    time.sleep(30)
+
+@unittest.skipUnless(hasattr(os, "fork") and os.path.exists("/proc/self/smaps"), "Linux fork and /proc required")
+class TestPrefork(unittest.TestCase):
+    """Tests for the prefork launcher."""
+
+    def setUp(self):
+        self.pool = Prefork(_cargar_modelo, _trabajo, workers=2)
+        self.pool.iniciar()
+
+    def tearDown(self):
+        self.pool.detener(timeout=2)
+        gc.unfreeze()
+
+    def test_workers_share_inherited_state(self):
+        informe = self.pool.informe_memoria()
+        self.assertEqual([t["worker"] for t in informe["workers"]], [0, 1])
+        for trabajador in informe["workers"]:
+            # The model pages stay shared with the master instead of being copied
+            self.assertGreater(trabajador["compartido_kib"], 15_000)
+            self.assertLess(trabajador["unico_kib"], trabajador["compartido_kib"])
+        self.assertIn("unico_kib", leer_memoria(os.getpid()))
+
+    def test_crashed_worker_is_restarted(self):
+        pid = next(p for p, i in self.pool.workers.items() if i == 1)
+        os.kill(pid, signal.SIGKILL)
+        self.pool.supervisar(duracion=1.0)
+        self.assertEqual(sorted(self.pool.workers.values()), [0, 1])
+        self.assertNotIn(pid, self.pool.workers)
+        self.assertEqual(self.pool.reinicios, {1: 1})
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,102 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from memoria_secure.memoria import MemoriaSagrada # type: ignore
+from memoria_secure.reciente import MemoriaReciente # type: ignore
+
+class MemoriaContada(MemoriaSagrada):
+    """Counts full reads of a user's history."""
+    lecturas = 0
+
+    def recuperar(self, usuario_id):
+        self.lecturas += 1
+        return super().recuperar(usuario_id)
+
+class MemoriaPausada(MemoriaSagrada):
+    """Holds each write right after it reaches disk until `continuar` is set."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.escrito = threading.Event()
+        self.continuar = threading.Event()
+
+    def guardar(self, *args, **kwargs):
+        super().guardar(*args, **kwargs)
+        self.escrito.set()
+        self.continuar.wait(5)
+
+class TestMemoriaReciente(unittest.TestCase):
+    """Tests for the per-user recent interaction buffer."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.memoria = MemoriaContada("0123456789abcdef")
+        self.memoria.storage_file = os.path.join(self.directorio, "memoria.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def test_writes_through_and_serves_from_memory(self):
+        for i in range(5):
+            self.memoria.guardar("u1", f"antiguo {i}", etiqueta="neutral")
+        recientes = MemoriaReciente(self.memoria, por_usuario=3)
+        self.assertEqual([r.mensaje for r in recientes.recientes("u1")], ["antiguo 2", "antiguo 3", "antiguo 4"])
+        recientes.registrar("u1", "nuevo", "alegria", analisis={"respuesta": "ok"})
+        ultimos = recientes.recientes("u1", 2)
+        self.assertEqual([r.mensaje for r in ultimos], ["antiguo 4", "nuevo"])
+        self.assertEqual(ultimos[-1].analisis, {"respuesta": "ok"})
+        # One disk read for the first access only; the write reached the store
+        self.assertEqual(self.memoria.lecturas, 1)
+        self.assertEqual(MemoriaSagrada.recuperar(self.memoria, "u1")[-1]["mensaje"], "nuevo")
+
+    def test_lru_eviction_across_users(self):
+        recientes = MemoriaReciente(self.memoria, max_usuarios=2)
+        for usuario in ("a", "b", "a", "c"):
+            recientes.recientes(usuario)
+        self.assertEqual(len(recientes), 2)
+        lecturas = self.memoria.lecturas
+        recientes.recientes("a")
+        self.assertEqual(self.memoria.lecturas, lecturas)
+        recientes.recientes("b")
+        self.assertEqual(self.memoria.lecturas, lecturas + 1)
+
+    def test_prewarm_in_background(self):
+        self.memoria.guardar("u2", "hola", etiqueta="neutral")
+        recientes = MemoriaReciente(self.memoria)
+        recientes.precalentar(["u2"]).join(5)
+        self.assertEqual([r.mensaje for r in recientes.recientes("u2")], ["hola"])
+        self.assertEqual(recientes.estadisticas()["aciertos"], 1)
+
+    def test_load_during_write_does_not_duplicate(self):
+        memoria = MemoriaPausada("0123456789abcdef")
+        memoria.storage_file = os.path.join(self.directorio, "pausada.json")
+        recientes = MemoriaReciente(memoria)
+        escritor = threading.Thread(target=recientes.registrar, args=("u3", "hola", "neutral"))
+        escritor.start()
+        self.assertTrue(memoria.escrito.wait(5))
+        # The load reads the record from disk and finishes before the writer reaches the buffer
+        self.assertEqual([r.mensaje for r in recientes.recientes("u3")], ["hola"])
+        memoria.continuar.set()
+        escritor.join(5)
+        self.assertEqual([r.mensaje for r in recientes.recientes("u3")], ["hola"])
+        recientes.registrar("u3", "adios", "neutral")
+        self.assertEqual([r.mensaje for r in recientes.recientes("u3")], ["hola", "adios"])
+
+    def test_cli_turns_are_stored_under_their_emotion(self):
+        from main import NuDaMuSession
+        sesion = NuDaMuSession("0123456789abcdef", user_id="cli")
+        sesion.recientes = MemoriaReciente(self.memoria)
+        sesion.recientes.recientes("cli")  # What the session's pre-warm does
+        sesion.interaction_count = 1
+        with contextlib.redirect_stdout(io.StringIO()):
+            sesion._process_input("me siento muy triste")
+            sesion._process_input("///sombra miedo")
+        guardados = MemoriaSagrada.recuperar(self.memoria, "cli")
+        self.assertEqual([(r["mensaje"], r["etiqueta"]) for r in guardados], [("me siento muy triste", "tristeza")])
+        self.assertEqual([r.etiqueta for r in sesion.recientes.recientes("cli")], ["tristeza", "modo"])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
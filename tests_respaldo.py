@@ -0,0 +1,99 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from memoria_secure.fragmentos import refragmentar # type: ignore
+from memoria_secure.memoria import MemoriaSagrada # type: ignore
+from memoria_secure.respaldo import cargar_manifiesto, respaldar, restaurar # type: ignore
+
+CLAVE = "0123456789abcdef"
+
+class TestRespaldo(unittest.TestCase):
+    """Tests for incremental encrypted backup and restore of the secure memory."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.copias = os.path.join(self.directorio, "copias")
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _memoria(self, nombre="memoria.json", fragmentos=4):
+        memoria = MemoriaSagrada(CLAVE, fragmentos=fragmentos)
+        memoria.storage_file = os.path.join(self.directorio, nombre)
+        return memoria
+
+    def _contenido(self, memoria):
+        return {f"u{n}": memoria.recuperar(f"u{n}") for n in range(6)}
+
+    def test_incremental_backups_copy_only_the_delta(self):
+        memoria = self._memoria()
+        for i in range(30):
+            memoria.guardar(f"u{i % 6}", f"mensaje {i} ñ", etiqueta="neutral")
+        primero = respaldar(memoria, self.copias)
+        self.assertEqual((primero["completo"], primero["registros"]), (True, 30))
+        memoria.guardar("u1", "nuevo", etiqueta="alegria")
+        memoria.guardar("u2", "otro", etiqueta="tristeza")
+        segundo = respaldar(memoria, self.copias)
+        self.assertEqual((segundo["completo"], segundo["registros"]), (False, 2))
+        self.assertEqual(respaldar(memoria, self.copias)["registros"], 0)
+
+        restaurada = self._memoria("restaurada.json")
+        resumen = restaurar(restaurada, self.copias)
+        self.assertEqual((resumen["registros"], resumen["invalidos"]), (32, 0))
+        self.assertEqual(self._contenido(restaurada), self._contenido(memoria))
+        self.assertEqual(restaurada.tendencias.tendencia("u1")["conteos"], {"neutral": 5, "alegria": 1})
+        self.assertEqual(restaurada.recall_similar("u1", "nuevo", k=1)[0]["mensaje"], "nuevo")
+
+    def test_point_in_time_restore(self):
+        memoria = self._memoria()
+        memoria.guardar("u0", "antes", etiqueta="neutral")
+        primero = respaldar(memoria, self.copias)
+        memoria.guardar("u0", "despues", etiqueta="neutral")
+        respaldar(memoria, self.copias)
+        restaurada = self._memoria("restaurada.json")
+        restaurar(restaurada, self.copias, hasta=primero["id"])
+        self.assertEqual([r["mensaje"] for r in restaurada.recuperar("u0")], ["antes"])
+        self.assertEqual([r["mensaje"] for r in restaurada.recall_similar("u0", "antes")], ["antes"])
+        with self.assertRaises(FileExistsError):
+            restaurar(restaurada, self.copias)
+        restaurar(restaurada, self.copias, forzar=True)
+        self.assertEqual([r["mensaje"] for r in restaurada.recuperar("u0")], ["antes", "despues"])
+        self.assertEqual(restaurada.recall_similar("u0", "despues", k=1)[0]["mensaje"], "despues")
+
+    def test_segments_are_encrypted_and_tampering_is_detected(self):
+        memoria = self._memoria(fragmentos=1)
+        memoria.guardar("u_secreto", "hola", etiqueta="alegria")
+        respaldar(memoria, self.copias)
+        segmento = cargar_manifiesto(self.copias)["respaldos"][0]["segmentos"][0]["archivo"]
+        ruta = os.path.join(self.copias, segmento)
+        with open(ruta, encoding="utf-8") as f:
+            linea = f.read()
+        self.assertNotIn("u_secreto", linea)
+        cifrado = json.loads(linea)
+        cifrado["ciphertext"] = ("B" if cifrado["ciphertext"][0] == "A" else "A") + cifrado["ciphertext"][1:]
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(json.dumps(cifrado) + "\n")
+        restaurada = self._memoria("restaurada.json", fragmentos=1)
+        with self.assertRaises(Exception):
+            restaurar(restaurada, self.copias)
+        self.assertFalse(os.path.exists(restaurada.storage_file))
+        self.assertEqual([n for n in os.listdir(self.directorio) if n.endswith(".tmp")], [])
+
+    def test_reshard_starts_a_new_full_backup(self):
+        memoria = self._memoria(fragmentos=2)
+        for i in range(10):
+            memoria.guardar(f"u{i % 6}", f"m{i}", etiqueta="neutral")
+        respaldar(memoria, self.copias)
+        refragmentar(memoria.storage_file, 3)
+        memoria = self._memoria(fragmentos=3)
+        memoria.guardar("u5", "tras refragmentar", etiqueta="neutral")
+        segundo = respaldar(memoria, self.copias)
+        self.assertEqual((segundo["completo"], segundo["registros"]), (True, 11))
+        restaurada = self._memoria("restaurada.json", fragmentos=3)
+        restaurar(restaurada, self.copias)
+        self.assertEqual(self._contenido(restaurada), self._contenido(memoria))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from fastapi.testclient import TestClient # type: ignore
+from core.luohe_central import LuoHeCentral # type: ignore
+from core.servidor import crear_app # type: ignore
+from memoria_secure.memoria import MemoriaSagrada # type: ignore
+
+class MotorLento:
+    """Engine stand-in whose calls block until released."""
+    def __init__(self):
+        self.liberar = threading.Event()
+
+    def procesar(self, texto, usuario_id, rng=None):
+        self.liberar.wait(5)
+        return texto
+
+class MotorRegistrado:
+    """Engine stand-in that records which entry points were called."""
+    def __init__(self):
+        self.procesados = []
+        self.calentado = False
+
+    def procesar(self, texto, usuario_id, rng=None):
+        self.procesados.append(usuario_id)
+        return texto
+
+    def calentar(self):
+        self.calentado = True
+
+class TestServidor(unittest.TestCase):
+    """Tests for the ASGI front-end using the in-process test client."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.memoria = MemoriaSagrada("0123456789abcdef")
+        self.memoria.storage_file = os.path.join(self.directorio, "memoria.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def test_procesar_is_reproducible_with_seed(self):
+        with TestClient(crear_app(LuoHeCentral(), self.memoria)) as cliente:
+            cuerpo = {"texto": "///sombra", "usuario_id": "u1", "semilla": 7}
+            primera = cliente.post("/procesar", json=cuerpo).json()
+            segunda = cliente.post("/procesar", json=cuerpo).json()
+        self.assertEqual(primera["respuesta"], segunda["respuesta"])
+        self.assertEqual(primera["usuario_id"], "u1")
+
+    def test_lote_modos_y_memoria(self):
+        self.memoria.guardar("u2", "hola", etiqueta="neutral")
+        with TestClient(crear_app(LuoHeCentral(), self.memoria)) as cliente:
+            lote = cliente.post("/procesar_lote", json={"items": [{"texto": "quiero robar"}, {"texto": "///loto"}]})
+            self.assertEqual(lote.status_code, 200)
+            self.assertEqual(len(lote.json()), 2)
+            self.assertIn("unity of existence", lote.json()[0]["respuesta"])
+            modos = {m["modo"] for m in cliente.get("/modos").json()}
+            self.assertTrue({"sombra", "loto"} <= modos)
+            recuerdos = cliente.get("/memoria/u2").json()["recuerdos"]
+            self.assertEqual(recuerdos, [{"etiqueta": "neutral", "mensaje": "hola"}])
+            tendencia = cliente.get("/tendencias/u2").json()
+            self.assertEqual((tendencia["total"], tendencia["conteos"]), (1, {"neutral": 1}))
+            similares = cliente.get("/recuerdos/u2/similares", params={"texto": "hola", "k": 3}).json()
+            self.assertEqual(similares["recuerdos"][0]["mensaje"], "hola")
+
+    def test_startup_warms_without_processing_a_request(self):
+        motor = MotorRegistrado()
+        with TestClient(crear_app(motor, self.memoria)):
+            pass
+        self.assertTrue(motor.calentado)
+        self.assertEqual(motor.procesados, [])
+
+    def test_timeout_returns_504(self):
+        motor = MotorLento()
+        with TestClient(crear_app(motor, self.memoria, timeout_s=0.2)) as cliente:
+            inicio = time.perf_counter()
+            respuesta = cliente.post("/procesar", json={"texto": "lento"})
+            motor.liberar.set()
+        self.assertEqual(respuesta.status_code, 504)
+        self.assertLess(time.perf_counter() - inicio, 2)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,93 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from memoria_secure.memoria import MemoriaSagrada # type: ignore
+from memoria_secure.tendencias import TendenciasEmocionales # type: ignore
+
+CLAVE = "0123456789abcdef"
+
+def _actualizar_desde_proceso(archivo, n):
+    memoria = MemoriaSagrada(CLAVE)
+    memoria.storage_file = archivo
+    for _ in range(n):
+        memoria.tendencias.actualizar("compartido", "alegria")
+
+class TestTendenciasEmocionales(unittest.TestCase):
+    """Tests for the per-user running emotional aggregates."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.memoria = MemoriaSagrada(CLAVE)
+        self.memoria.storage_file = os.path.join(self.directorio, "memoria.json")
+        self.tendencias = self.memoria.tendencias
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def test_guardar_updates_counts_and_polarity(self):
+        self.memoria.guardar("u1", "feliz", etiqueta="alegria")
+        self.memoria.guardar("u1", "triste", etiqueta="tristeza", polaridad=-0.5)
+        self.memoria.guardar("u2", "hola", etiqueta="neutral")
+        tendencia = self.tendencias.tendencia("u1")
+        self.assertEqual(tendencia["total"], 2)
+        self.assertEqual(tendencia["conteos"], {"alegria": 1, "tristeza": 1})
+        self.assertAlmostEqual(tendencia["polaridad"], 0.25, places=3)
+        self.assertEqual(sum(c["total"] for c in tendencia["por_hora"]), 2)
+        self.assertEqual(self.tendencias.tendencia("nadie")["total"], 0)
+
+    def test_polarity_decays_with_half_life(self):
+        tendencias = TendenciasEmocionales(self.memoria, semivida_s=3600,
+                                           archivo=os.path.join(self.directorio, "t.json"))
+        tendencias.actualizar("u", "tristeza", ts=0.0)
+        tendencias.actualizar("u", "alegria", ts=3600.0)
+        # The older record weighs half: (-0.5 + 1) / 1.5
+        self.assertAlmostEqual(tendencias.tendencia("u", ahora=3600.0)["polaridad"], 1 / 3, places=3)
+
+    def test_buckets_are_bounded(self):
+        tendencias = TendenciasEmocionales(self.memoria, archivo=os.path.join(self.directorio, "t.json"))
+        for hora in range(100):
+            tendencias.actualizar("u", "neutral", ts=hora * 3600.0)
+        tendencia = tendencias.tendencia("u", ahora=99 * 3600.0)
+        self.assertEqual(tendencia["total"], 100)
+        self.assertEqual(len(tendencia["por_hora"]), 24)
+        self.assertEqual(len(tendencia["por_dia"]), 5)
+
+    def test_stored_encrypted_and_reloaded(self):
+        self.memoria.guardar("u1", "feliz", etiqueta="alegria")
+        with open(self.tendencias.archivo, encoding="utf-8") as f:
+            contenido = f.read()
+        self.assertNotIn("alegria", contenido)
+        self.assertIn("u1", json.loads(contenido)["usuarios"])
+        otra = MemoriaSagrada(CLAVE)
+        otra.storage_file = self.memoria.storage_file
+        self.assertEqual(otra.tendencias.tendencia("u1")["conteos"], {"alegria": 1})
+        # A write from the other instance is picked up here
+        otra.guardar("u1", "calma", etiqueta="serenidad")
+        self.assertEqual(self.tendencias.tendencia("u1")["total"], 2)
+
+    def test_reconstruir_from_existing_store(self):
+        self.memoria.guardar("u1", "a", etiqueta="alegria")
+        self.memoria.guardar("u1", "b", etiqueta="alegria")
+        os.remove(self.tendencias.archivo)
+        self.assertEqual(self.tendencias.tendencia("u1")["total"], 0)
+        self.assertEqual(self.tendencias.reconstruir(), 1)
+        tendencia = self.tendencias.tendencia("u1")
+        self.assertEqual((tendencia["total"], tendencia["polaridad"]), (2, 1.0))
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs fork")
+    def test_concurrent_processes_keep_every_update(self):
+        contexto = multiprocessing.get_context("fork")
+        procesos = [contexto.Process(target=_actualizar_desde_proceso, args=(self.memoria.storage_file, 25))
+                    for _ in range(4)]
+        for proceso in procesos:
+            proceso.start()
+        for proceso in procesos:
+            proceso.join()
+            self.assertEqual(proceso.exitcode, 0)
+        self.assertEqual(self.tendencias.tendencia("compartido")["total"], 100)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+from core.simbolos.traduccion import CacheSQLite, MarianBackend, StubBackend, TablaFrasesBackend, Traductor # type: ignore
+
+class _TokenizadorFalso:
+    def __init__(self, par):
+        self.par = par
+
+    def __call__(self, textos, **opciones):
+        return {"textos": textos}
+
+    def batch_decode(self, generados, skip_special_tokens=True):
+        return [f"[{self.par}] {t}" for t in generados]
+
+class _ModeloFalso:
+    def generate(self, textos):
+        return textos
+
+class MarianFalso(MarianBackend):
+    """MarianBackend over stand-in models, recording which language pairs were loaded."""
+    def __init__(self):
+        super().__init__(tamano_lote=2)
+        self.pares = []
+
+    def _modelo(self, origen, destino):
+        self.pares.append(f"{origen}-{destino}")
+        return _TokenizadorFalso(f"{origen}-{destino}"), _ModeloFalso()
+
+class TestTraduccion(unittest.TestCase):
+    """Tests for translation backends and the shared SQLite cache, all offline."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.ruta = os.path.join(self.directorio, "cache.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def test_batch_only_sends_misses(self):
+        backend = StubBackend()
+        traductor = Traductor(backend, CacheSQLite(self.ruta))
+        self.assertEqual(traductor.translate_many(["a", "b", "a"], "zh-cn"), ["[zh-cn] a", "[zh-cn] b", "[zh-cn] a"])
+        traductor.translate_many(["a", "c"], "zh-cn")
+        self.assertEqual(backend.llamadas, 2)
+        self.assertEqual(backend.textos_traducidos, 3)
+        self.assertEqual(traductor.estadisticas()["aciertos"], 1)
+
+    def test_cache_shared_across_instances(self):
+        """A second worker over the same file never calls its backend for known texts."""
+        Traductor(StubBackend(), CacheSQLite(self.ruta)).translate_many(["hola", "paz"], "en")
+        otro = StubBackend()
+        self.assertEqual(Traductor(otro, CacheSQLite(self.ruta)).translate("paz", "en"), "[en] paz")
+        self.assertEqual(otro.llamadas, 0)
+
+    def test_phrase_table_with_fallback(self):
+        respaldo = StubBackend()
+        tabla = TablaFrasesBackend(respaldo, entradas=[{"es": "La calma", "en": "Calm", "zh": "平静"}])
+        self.assertEqual(tabla.translate_many(["La calma", "otro"], "zh-cn"), ["平静", "[zh-cn] otro"])
+        self.assertEqual(respaldo.textos_traducidos, 1)
+        self.assertEqual(TablaFrasesBackend(entradas=[]).translate("sin tabla", "en"), "sin tabla")
+
+    def test_marian_groups_mixed_batch_by_language(self):
+        backend = MarianFalso()
+        textos = ["¿Dónde está la biblioteca de la ciudad?", "今天天气很好",
+                  "The weather is lovely this afternoon", "Gracias por todo tu apoyo"]
+        self.assertEqual(backend.translate_many(textos, "en"), [
+            "[es-en] ¿Dónde está la biblioteca de la ciudad?", "[zh-en] 今天天气很好",
+            "The weather is lovely this afternoon", "[es-en] Gracias por todo tu apoyo",
+        ])
+        self.assertEqual(sorted(backend.pares), ["es-en", "zh-en"])
+        self.assertEqual(backend.translate_many(["今天天气很好"], "en", origen="es"), ["[es-en] 今天天气很好"])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import unittest
+from core.documento import preparar # type: ignore
+from memoria_secure.memoria import MemoriaSagrada # type: ignore
+from memoria_secure.vectorial import vectorizar # type: ignore
+
+CLAVE = "0123456789abcdef"
+
+class TestIndiceVectorial(unittest.TestCase):
+    """Tests for semantic recall of past memories through the embedding index."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.memoria = self._memoria()
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _memoria(self):
+        memoria = MemoriaSagrada(CLAVE, fragmentos=2)
+        memoria.storage_file = os.path.join(self.directorio, "memoria.json")
+        return memoria
+
+    def test_similar_memories_rank_first(self):
+        self.memoria.guardar("u1", "Hoy me siento muy triste por mi familia", etiqueta="tristeza")
+        self.memoria.guardar("u1", "El proyecto del trabajo salió perfecto", etiqueta="alegria")
+        self.memoria.guardar("u1", "Quiero aprender a meditar cada mañana", etiqueta="serenidad")
+        self.memoria.guardar("u2", "Estoy triste por mi familia", etiqueta="tristeza")
+        similares = self.memoria.recall_similar("u1", "tristeza por la familia", k=2)
+        self.assertEqual(similares[0]["mensaje"], "Hoy me siento muy triste por mi familia")
+        self.assertEqual(similares[0]["etiqueta"], "tristeza")
+        self.assertLessEqual(len(similares), 2)
+        self.assertEqual(self.memoria.recall_similar("nadie", "familia"), [])
+
+    def test_guardar_embeds_the_callers_document(self):
+        """The caller's preprocessed message is indexed as it is, not prepared again."""
+        documento = preparar("corriendo")
+        lematizado = type(documento)(documento.texto, documento.normalizado, documento.tokens,
+                                     documento.escritura, documento.idioma, documento.confianza, lemas=("correr",))
+        self.memoria.guardar("u1", "corriendo", etiqueta="neutral", documento=lematizado)
+        similares = self.memoria.recall_similar("u1", "correr")
+        self.assertEqual(similares[0]["mensaje"], "corriendo")
+        self.assertAlmostEqual(similares[0]["similitud"], 1.0, places=2)
+
+    def test_writes_are_visible_without_a_reload(self):
+        self.memoria.guardar("u1", "primer recuerdo", etiqueta="neutral")
+        self.assertEqual(len(self.memoria.recall_similar("u1", "recuerdo")), 1)
+        self.memoria.guardar("u1", "segundo recuerdo", etiqueta="neutral")
+        self.assertEqual(len(self.memoria.recall_similar("u1", "recuerdo")), 2)
+        # Another instance (process) writing to the same store
+        self._memoria().guardar("u1", "tercer recuerdo", etiqueta="neutral")
+        self.assertEqual(len(self.memoria.recall_similar("u1", "recuerdo", k=10)), 3)
+
+    def test_index_is_encrypted_and_rebuildable(self):
+        self.memoria.guardar("u1", "secreto muy personal", etiqueta="neutral")
+        for nombre in os.listdir(self.directorio):
+            if ".vectores" in nombre:
+                with open(os.path.join(self.directorio, nombre), encoding="utf-8") as f:
+                    self.assertNotIn("secreto", f.read())
+        self.assertEqual(self.memoria.vectores.reconstruir(), 1)
+        self.assertEqual(self.memoria.recall_similar("u1", "secreto", k=1)[0]["mensaje"], "secreto muy personal")
+
+    def test_vectors_are_normalized_and_stable(self):
+        vector = vectorizar("la misma frase")
+        self.assertAlmostEqual(float((vector ** 2).sum()), 1.0, places=5)
+        self.assertTrue((vector == vectorizar("la misma frase")).all())
+        self.assertFalse(vectorizar("").any())
+
+if __name__ == "__main__":
+    unittest.main()
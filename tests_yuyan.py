@@ -0,0 +1,70 @@
+import unittest
+from benchmarks.bench_yuyan import MUESTRAS # type: ignore
+from core.yuyan import _SEMILLAS, detectar_idioma, histograma_escrituras, identificar # type: ignore
+from core.qinggan import AnalizadorEmocional # type: ignore
+from core.daode import EticaNuDaMu # type: ignore
+
+class TestYuyan(unittest.TestCase):
+    """Tests for the shared language identification component."""
+
+    def test_script_languages(self):
+        """Non-Latin scripts resolve from the histogram alone."""
+        cases = {
+            "我很难过": "zh",
+            "こんにちは世界": "ja",
+            "안녕하세요": "ko",
+            "Привет мир": "ru",
+        }
+        for texto, esperado in cases.items():
+            with self.subTest(texto=texto):
+                self.assertEqual(detectar_idioma(texto), esperado)
+
+    def test_latin_ngram_fallback(self):
+        """Unaccented Latin text outside the seed profiles is told apart by character trigrams."""
+        cases = {
+            "no puedo dormir por las noches": "es",
+            "el perro ladra toda la noche": "es",
+            "mi jefe no me deja en paz": "es",
+            "the dog barks all night": "en",
+            "I forgot to call my mother": "en",
+            "¿Cómo estás?": "es",
+        }
+        for texto, esperado in cases.items():
+            with self.subTest(texto=texto):
+                self.assertEqual(detectar_idioma(texto), esperado)
+
+    def test_thin_latin_evidence_falls_back(self):
+        """Single words and mixed-language text fall back to the accent heuristic."""
+        for texto in ("yes", "no", "ok", "I am fine, gracias"):
+            with self.subTest(texto=texto):
+                self.assertEqual(identificar(texto).codigo, "en")
+                self.assertEqual(identificar(texto).confianza, 0.0)
+        self.assertEqual(detectar_idioma("sí"), "es")
+
+    def test_benchmark_samples_are_held_out(self):
+        """Accuracy is measured on text the profiles were not built from."""
+        semillas = " ".join(_SEMILLAS.values())
+        for _, texto in MUESTRAS:
+            if len(texto.split()) < 3:
+                continue  # Single common words are in any text
+            with self.subTest(texto=texto):
+                self.assertNotIn(texto.lower().strip("¿?!."), semillas)
+
+    def test_empty_defaults_to_english(self):
+        resultado = identificar("1234 !!")
+        self.assertEqual(resultado.codigo, "en")
+        self.assertEqual(resultado.confianza, 0.0)
+
+    def test_histogram_weights_cjk(self):
+        histograma = histograma_escrituras("ok 道")
+        self.assertEqual(histograma, {"latin": 2, "han": 3})
+
+    def test_analyzers_share_detector(self):
+        """Analyzers agree with the shared detector and accept a precomputed language."""
+        texto = "Mentir es fácil"
+        self.assertEqual(EticaNuDaMu().detectar_idioma(texto), detectar_idioma(texto))
+        analisis = AnalizadorEmocional().analizar(texto, "zh")
+        self.assertEqual(analisis["language"], "zh")
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)